@@ -0,0 +1,291 @@
+"""
+Pipeline Benchmark
+
+This module measures how PortfolioDataProcessor and DashboardGenerator scale.
+
+A seeded synthetic portfolio generator produces frames with the FRL_Portfolio schema
+(any number of rows and quarters, NAV rolled forward from quarter to quarter). Every
+pipeline stage is timed separately and its tracemalloc peak recorded, and results are
+written as JSON so runs can be compared over time.
+
+Usage:
+    python benchmark.py --preset quick
+    python benchmark.py --rows 10000 1000000 --quarters 8 400 --output results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_processor import PortfolioDataProcessor
+from dashboard_generator import DashboardGenerator
+from run_metrics import RunMetrics
+
+
+PRESETS = {
+    'quick': {'rows': [10_000, 100_000], 'quarters': [8, 40]},
+    'full': {'rows': [10_000, 100_000, 1_000_000, 10_000_000], 'quarters': [8, 40, 400]},
+}
+
+# Share of securities per asset class, roughly matching the sample workbook
+ASSET_CLASS_WEIGHTS = {
+    'Private Equity': 0.18, 'Real Assets': 0.17, 'Hedge Funds': 0.16, 'Credit Funds': 0.15,
+    'Real Estate': 0.14, 'Equities': 0.07, 'Derivatives': 0.06, 'Cash': 0.025,
+    'Sovereigns/Treasuries': 0.007, 'CMBS': 0.004, 'Agencies': 0.004, 'Corporate Bonds': 0.004,
+    'Preferreds': 0.003, 'ABS': 0.003, 'Munis': 0.003, 'CLOs': 0.0025, 'RMBS': 0.0015,
+}
+
+AGGREGATION_STAGES = (
+    'get_composition_by_asset_class', 'get_time_series_data', 'get_asset_class_trends',
+    'calculate_performance_metrics', 'get_performance_by_asset_class', 'get_quarterly_performance',
+)
+
+# Excel's sheet limit; larger scenarios skip the workbook load stage
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def generate_synthetic_portfolio(n_rows, n_quarters, seed=0, n_entities=12, end_date='2025-09-30'):
+    """
+    Return a synthetic FRL_Portfolio frame of about n_rows rows over n_quarters.
+
+    Each security holds one position per quarter; End_NAV rolls forward as
+    Beg_NAV + Contributions - Distributions + Net_Investment_Income + FX_Gain_Loss
+    and becomes the next quarter's Beg_NAV.
+    """
+    rng = np.random.default_rng(seed)
+    n_securities = max(1, -(-n_rows // n_quarters))
+    dates = pd.date_range(end=end_date, periods=n_quarters, freq=pd.offsets.QuarterEnd())
+
+    classes = np.array(list(ASSET_CLASS_WEIGHTS))
+    weights = np.array(list(ASSET_CLASS_WEIGHTS.values()))
+    security_class = rng.choice(classes, size=n_securities, p=weights / weights.sum())
+    security_entity = np.char.add('Entity_', np.char.zfill(
+        rng.integers(1, n_entities + 1, size=n_securities).astype(str), 2))
+    width = len(str(n_securities))
+    security_names = np.char.add('security_', np.char.zfill(np.arange(1, n_securities + 1).astype(str), width))
+
+    shape = (n_quarters, n_securities)
+    beg = np.empty(shape)
+    end = np.empty(shape)
+    nav = rng.lognormal(mean=15, sigma=1.5, size=n_securities)
+    contributions = np.where(rng.random(shape) < 0.3, rng.exponential(0.02, shape), 0.0)
+    distributions = np.where(rng.random(shape) < 0.3, rng.exponential(0.02, shape), 0.0)
+    income = rng.normal(0.012, 0.01, shape)
+    fx = rng.normal(0.0, 0.03, shape)
+    for q in range(n_quarters):
+        beg[q] = 0.0 if q == 0 else nav
+        contributions[q] *= nav
+        distributions[q] *= nav
+        income[q] *= nav
+        fx[q] *= nav
+        if q == 0:
+            # First quarter: the position is funded by its initial contribution
+            contributions[q] = nav
+            income[q] = 0.0
+            fx[q] = 0.0
+            distributions[q] = 0.0
+        nav = np.maximum(beg[q] + contributions[q] - distributions[q] + income[q] + fx[q], 0.0)
+        end[q] = nav
+        fx[q] = end[q] - (beg[q] + contributions[q] - distributions[q] + income[q])
+
+    df = pd.DataFrame({
+        'Date': np.repeat(dates.to_numpy(), n_securities),
+        'Entity': np.tile(security_entity, n_quarters),
+        'Security': np.tile(security_names, n_quarters),
+        'Asset_Class': np.tile(security_class, n_quarters),
+        'Beg_NAV': beg.ravel(),
+        'Contributions': contributions.ravel(),
+        'Distributions': distributions.ravel(),
+        'FX_Gain_Loss': fx.ravel(),
+        'Net_Investment_Income': income.ravel(),
+        'End_NAV': end.ravel(),
+    })
+    return df.iloc[:n_rows].reset_index(drop=True)
+
+
+def write_workbook(df, path, sheet_name=PortfolioDataProcessor.SHEET_NAME):
+    """Write a synthetic frame to an .xlsx workbook with the expected sheet name."""
+    df.to_excel(path, sheet_name=sheet_name, index=False, engine='openpyxl')
+
+
+def _measure(func, track_memory):
+    """Run func() and return (result, wall seconds, cpu seconds, tracemalloc peak bytes)."""
+    if track_memory:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    result = func()
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    peak = tracemalloc.get_traced_memory()[1] - baseline if track_memory else None
+    return result, wall, cpu, peak
+
+
+def _run_stages(workbook_path, df, output_path, engine, cache_dir, track_memory):
+    """
+    Run the pipeline once, measuring each stage.
+
+    Loads from workbook_path when df is None, otherwise injects df in place
+    of load_data. The security drilldown is exported and its sidecar shards
+    written as separate stages; save_dashboard writes the page that loads
+    them (and rewrites the shards, as a real run does). Returns (stage
+    records, generated HTML size in bytes, total sidecar shard size in bytes).
+    """
+    stages = []
+
+    def record(stage, func, rows=None):
+        result, wall, cpu, peak = _measure(func, track_memory)
+        stages.append({'stage': stage, 'wall_seconds': wall, 'cpu_seconds': cpu,
+                       'peak_bytes': peak, 'rows': rows})
+        return result
+
+    if track_memory:
+        tracemalloc.start()
+    try:
+        # The benchmark takes its own measurements; a quiet RunMetrics keeps progress output off stdout
+        metrics = RunMetrics(echo=False)
+        processor = PortfolioDataProcessor(workbook_path, engine=engine, use_cache=False, cache_dir=cache_dir,
+                                           metrics=metrics)
+        if df is None:
+            record('load_data', processor.load_data)
+            stages[-1]['rows'] = len(processor.df)
+        else:
+            processor.df = df
+
+        rows = len(processor.df)
+        record('classify_investments', processor.classify_investments, rows=rows)
+        record('validate_nav', processor.validate_nav, rows=rows)
+        for stage in AGGREGATION_STAGES:
+            record(stage, getattr(processor, stage), rows=rows)
+        data = record('export_to_json', processor.export_to_json, rows=rows)
+        drilldown = record('export_security_drilldown', processor.export_security_drilldown, rows=rows)
+
+        generator = DashboardGenerator(data, metrics=metrics, drilldown=drilldown)
+        drilldown_base = record('save_drilldown_files', lambda: generator.save_drilldown_files(output_path),
+                                rows=len(drilldown))
+        html = record('generate_html', lambda: generator.generate_html(drilldown_base=drilldown_base))
+        record('save_dashboard', lambda: generator.save_dashboard(output_path))
+    finally:
+        if track_memory:
+            tracemalloc.stop()
+    shard_dir = os.path.splitext(output_path)[0] + '_files'
+    shard_bytes = sum(os.path.getsize(os.path.join(shard_dir, name)) for name in os.listdir(shard_dir))
+    return stages, len(html.encode('utf-8')), shard_bytes
+
+
+def run_scenario(n_rows, n_quarters, seed=0, engine='stream', track_memory=True,
+                 max_workbook_rows=200_000, work_dir=None):
+    """
+    Benchmark every pipeline stage for one synthetic portfolio size.
+
+    Timings come from an untraced run; when track_memory is set, a second run
+    under tracemalloc supplies each stage's peak (tracing slows Python code
+    several-fold, so the two are never taken from the same run).
+    """
+    scenario = {'rows': n_rows, 'quarters': n_quarters, 'seed': seed, 'engine': engine}
+    df = generate_synthetic_portfolio(n_rows, n_quarters, seed=seed)
+    scenario['rows'] = len(df)
+    scenario['securities'] = int(df['Security'].nunique())
+
+    work_dir = work_dir or tempfile.mkdtemp(prefix='dashboard_bench_')
+    workbook_path = os.path.join(work_dir, f'synthetic_{n_rows}_{n_quarters}.xlsx')
+    output_path = os.path.join(work_dir, f'synthetic_{n_rows}_{n_quarters}.html')
+    cache_dir = os.path.join(work_dir, 'cache')
+
+    # Writing the workbook is setup, not a pipeline stage
+    limit = min(max_workbook_rows, EXCEL_MAX_ROWS)
+    if len(df) <= limit:
+        write_workbook(df, workbook_path)
+        scenario['workbook_bytes'] = os.path.getsize(workbook_path)
+        df = None
+        skipped = None
+    else:
+        # Too large for a workbook (or for a reasonable write time): inject the frame
+        skipped = {'stage': 'load_data', 'skipped': True, 'reason': f'more than {limit} rows'}
+
+    stages, scenario['html_bytes'], scenario['drilldown_bytes'] = _run_stages(
+        workbook_path, None if df is None else df.copy(), output_path, engine, cache_dir, track_memory=False)
+    if track_memory:
+        traced, _, _ = _run_stages(workbook_path, df, output_path, engine, cache_dir, track_memory=True)
+        for stage, traced_stage in zip(stages, traced):
+            stage['peak_bytes'] = traced_stage['peak_bytes']
+
+    scenario['stages'] = ([skipped] if skipped else []) + stages
+    return scenario
+
+
+def _git_revision():
+    """Current git commit of the repository, if available."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmarks(rows, quarters, seed=0, engine='stream', track_memory=True, max_workbook_rows=200_000):
+    """Run every rows x quarters scenario and return the machine-readable report."""
+    report = {
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'git_revision': _git_revision(),
+        },
+        'config': {'rows': rows, 'quarters': quarters, 'seed': seed, 'engine': engine,
+                   'track_memory': track_memory, 'max_workbook_rows': max_workbook_rows},
+        'scenarios': []
+    }
+    with tempfile.TemporaryDirectory(prefix='dashboard_bench_') as work_dir:
+        for n_quarters in quarters:
+            for n_rows in rows:
+                print(f"Benchmarking {n_rows:,} rows x {n_quarters} quarters...", file=sys.stderr)
+                scenario = run_scenario(n_rows, n_quarters, seed=seed, engine=engine,
+                                        track_memory=track_memory, max_workbook_rows=max_workbook_rows,
+                                        work_dir=work_dir)
+                report['scenarios'].append(scenario)
+    report['finished'] = datetime.now().isoformat(timespec='seconds')
+    return report
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard pipeline on synthetic portfolios.")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick')
+    parser.add_argument('--rows', type=int, nargs='+', help='row counts to test (overrides preset)')
+    parser.add_argument('--quarters', type=int, nargs='+', help='quarter counts to test (overrides preset)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engine', choices=PortfolioDataProcessor.ENGINES, default='stream')
+    parser.add_argument('--max-workbook-rows', type=int, default=200_000,
+                        help='largest scenario that is written to .xlsx to time load_data')
+    parser.add_argument('--no-memory', action='store_true', help='skip tracemalloc peak tracking')
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON report path ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    rows = args.rows or PRESETS[args.preset]['rows']
+    quarters = args.quarters or PRESETS[args.preset]['quarters']
+    report = run_benchmarks(rows, quarters, seed=args.seed, engine=args.engine,
+                            track_memory=not args.no_memory, max_workbook_rows=args.max_workbook_rows)
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Benchmark report written to: {args.output}", file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    main()
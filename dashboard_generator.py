@@ -4,947 +4,268 @@ Dashboard Generator
 This module generates an HTML dashboard with visuals
 """
 
+import gzip
+import html
 import json
+import os
+import re
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from urllib.parse import quote
 from data_processor import PortfolioDataProcessor
+from dashboard_template import get_dashboard_template
+from payload_codec import encode_payload, payload_script_literal, table_records
+from run_metrics import RunMetrics, instrumented
+from tabular_readers import INPUT_EXTENSIONS
+
+
+# Input files picked up when a batch is pointed at a directory
+BATCH_INPUT_EXTENSIONS = INPUT_EXTENSIONS
+
+# NAV validation checks as labelled on the Overview tab, and the exceptions listed there
+NAV_CHECK_LABELS = {
+    'roll_forward': 'Roll-forward (Beg NAV + flows + income = End NAV)',
+    'continuity': 'Continuity (Beg NAV = prior quarter End NAV)',
+    'quarter_gap': 'Missing quarters between reports',
+    'opening_balance': 'Opening balance without prior history',
+    'duplicate': 'Duplicate quarter for a position'
+}
+NAV_EXCEPTIONS_SHOWN = 25
+
+# Export sections left out of the embedded payload: each ships as a shard (like the
+# drilldown) that the page loads when the chart showing it is first drawn
+DEFERRED_SECTIONS = {'taxonomy_rollups': 'taxonomy'}
 
 
 class DashboardGenerator:
     """Generate an interactive HTML dashboard for portfolio analysis."""
     
-    def __init__(self, data):
-        """Initialize with processed data."""
+    def __init__(self, data, metrics=None, payload_compression='auto', drilldown=None):
+        """
+        Initialize with processed data (and optionally a shared RunMetrics).
+
+        payload_compression ('auto', 'on' or 'off') controls deflate compression
+        of the embedded data blocks; see payload_codec. drilldown is the output
+        of PortfolioDataProcessor.export_security_drilldown() (None hides the
+        security drilldown).
+        """
         self.data = data
+        self.metrics = metrics or RunMetrics()
+        self.payload_compression = payload_compression
+        self.drilldown = drilldown or {}
+        
+    def drilldown_keys(self):
+        """Return a stable, file-name-safe shard key for every drilldown asset class."""
+        return {asset_class: f"{i:02d}-" + re.sub(r'[^a-z0-9]+', '_', asset_class.lower()).strip('_')
+                for i, asset_class in enumerate(self.drilldown)}
+    
+    def deferred_keys(self):
+        """Return {section: shard key} for the exported sections loaded on demand (see DEFERRED_SECTIONS)."""
+        return {section: key for section, key in DEFERRED_SECTIONS.items() if section in self.data}
+    
+    def page_data(self):
+        """The export without its deferred sections: what the page's main payload holds."""
+        deferred = self.deferred_keys()
+        return {name: value for name, value in self.data.items() if name not in deferred}
+    
+    def _shards(self):
+        """Return {shard key: data} for every drilldown asset class and deferred section."""
+        keys = self.drilldown_keys()
+        shards = {keys[asset_class]: shard for asset_class, shard in self.drilldown.items()}
+        for section, key in self.deferred_keys().items():
+            shards[key] = {section: self.data[section]}
+        return shards
+    
+    def drilldown_scripts(self):
+        """Return {shard key: JavaScript} for the sidecar files that register each shard."""
+        return {key: f"registerDrilldownShard({json.dumps(key)}, "
+                     f"{payload_script_literal(self._drilldown_payload(shard))});\n"
+                for key, shard in self._shards().items()}
+    
+    def _drilldown_payload(self, shard):
+        """Encode one shard's tables (compressed unless compression is 'off')."""
+        # Shards are decoded only when opened, so deflating them costs nothing at page load
+        compression = 'on' if self.payload_compression == 'auto' else self.payload_compression
+        return encode_payload(shard, compression)
+    
+    def _drilldown_values(self, drilldown_base):
+        """Template values for the drilldown config and (when inline) its deferred data blocks."""
+        keys = self.drilldown_keys()
+        sections = self.deferred_keys()
+        if not keys and not sections:
+            return {'drilldown_config': '{"mode":"none","shards":{},"sections":{}}', 'drilldown_shards': ''}
+        if drilldown_base is not None:
+            config = {'mode': 'sidecar', 'base': drilldown_base, 'shards': keys, 'sections': sections}
+            return {'drilldown_config': payload_script_literal(config), 'drilldown_shards': ''}
+        # Inline shards are JSON blocks the browser does not execute; each is parsed on first use
+        blocks = ''.join(
+            f'<script type="application/json" id="drilldown-{key}">'
+            f'{payload_script_literal(self._drilldown_payload(shard))}</script>\n'
+            for key, shard in self._shards().items()
+        )
+        config = {'mode': 'inline', 'shards': keys, 'sections': sections}
+        return {'drilldown_config': payload_script_literal(config), 'drilldown_shards': blocks}
+    
+    def template_values(self, embed_payload=True, drilldown_base=None):
+        """
+        Return the per-dashboard values of the template's named slots.
         
-    def generate_html(self):
+        embed_payload=False leaves the data out of the page, which then
+        fetches it from the dashboard server's JSON API. drilldown_base is the
+        URL prefix of sidecar shard files; None embeds the shards in the page.
+        """
+        metadata = self.data['metadata']
+        return {
+            'data_period': metadata['data_period'],
+            'generated_date': metadata['generated_date'],
+            'alternatives_records': f"{metadata['alternatives_records']:,}",
+            'metric_cards': self._generate_metric_cards(),
+            'composition_table': self._generate_composition_table(),
+            'performance_table': self._generate_performance_table(),
+            'twr_table': self._generate_twr_table(),
+            'irr_table': self._generate_irr_table(),
+            'unclassified_notice': self._generate_unclassified_notice(),
+            'nav_validation_table': self._generate_nav_validation_table(),
+            'payload': (payload_script_literal(encode_payload(self.page_data(), self.payload_compression))
+                        if embed_payload else 'null'),
+            **self._drilldown_values(drilldown_base)
+        }
+    
+    def iter_html(self, embed_payload=True, drilldown_base=None):
+        """Yield the dashboard HTML in chunks from the cached, precompiled template."""
+        return get_dashboard_template().iter_render(self.template_values(embed_payload, drilldown_base))
+    
+    @instrumented()
+    def generate_html(self, embed_payload=True, drilldown_base=None):
         """Generate the complete HTML dashboard."""
-        
-        html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Fortitude Re - Alternatives Portfolio Dashboard</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Oxygen', 'Ubuntu', 'Cantarell', sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-            min-height: 100vh;
-        }}
-        
-        .dashboard-container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            overflow: hidden;
-        }}
-        
-        .header {{
-            background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-            font-weight: 700;
-        }}
-        
-        .header p {{
-            font-size: 1.1em;
-            opacity: 0.9;
-        }}
-        
-        .nav-tabs {{
-            display: flex;
-            background: #f8f9fa;
-            border-bottom: 2px solid #dee2e6;
-            padding: 0 40px;
-        }}
-        
-        .nav-tab {{
-            padding: 20px 30px;
-            cursor: pointer;
-            border-bottom: 3px solid transparent;
-            font-weight: 600;
-            color: #6c757d;
-            transition: all 0.3s ease;
-        }}
-        
-        .nav-tab:hover {{
-            color: #495057;
-            background: #e9ecef;
-        }}
-        
-        .nav-tab.active {{
-            color: #2a5298;
-            border-bottom-color: #2a5298;
-            background: white;
-        }}
-        
-        .content {{
-            padding: 40px;
-        }}
-        
-        .tab-content {{
-            display: none;
-        }}
-        
-        .tab-content.active {{
-            display: block;
-            animation: fadeIn 0.5s;
-        }}
-        
-        @keyframes fadeIn {{
-            from {{ opacity: 0; transform: translateY(10px); }}
-            to {{ opacity: 1; transform: translateY(0); }}
-        }}
-        
-        .metrics-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 40px;
-        }}
-        
-        .metric-card {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 25px;
-            border-radius: 15px;
-            box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-            transition: transform 0.3s ease;
-        }}
-        
-        .metric-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 6px 20px rgba(0,0,0,0.15);
-        }}
-        
-        .metric-card h3 {{
-            font-size: 0.9em;
-            opacity: 0.9;
-            margin-bottom: 10px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }}
-        
-        .metric-card .value {{
-            font-size: 2em;
-            font-weight: 700;
-            margin-bottom: 5px;
-        }}
-        
-        .metric-card .subtext {{
-            font-size: 0.85em;
-            opacity: 0.8;
-        }}
-        
-        .chart-container {{
-            background: white;
-            border-radius: 15px;
-            padding: 30px;
-            margin-bottom: 30px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-        }}
-        
-        .chart-container h2 {{
-            color: #2a5298;
-            margin-bottom: 20px;
-            font-size: 1.5em;
-        }}
-        
-        .chart-wrapper {{
-            position: relative;
-            height: 400px;
-        }}
-        
-        .data-table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-            background: white;
-            border-radius: 10px;
-            overflow: hidden;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-        }}
-        
-        .data-table thead {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-        }}
-        
-        .data-table th {{
-            padding: 15px;
-            text-align: left;
-            font-weight: 600;
-            text-transform: uppercase;
-            font-size: 0.85em;
-            letter-spacing: 0.5px;
-        }}
-        
-        .data-table td {{
-            padding: 15px;
-            border-bottom: 1px solid #e9ecef;
-        }}
-        
-        .data-table tbody tr:hover {{
-            background: #f8f9fa;
-        }}
-        
-        .data-table tbody tr:last-child td {{
-            border-bottom: none;
-        }}
-        
-        .positive {{
-            color: #28a745;
-            font-weight: 600;
-        }}
-        
-        .negative {{
-            color: #dc3545;
-            font-weight: 600;
-        }}
-        
-        .footer {{
-            background: #f8f9fa;
-            padding: 20px 40px;
-            text-align: center;
-            color: #6c757d;
-            border-top: 1px solid #dee2e6;
-        }}
-        
-        .grid-2 {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(360px, 1fr));
-            gap: 30px;
-        }}
-        
-        
-        .info-box {{
-            background: #e7f3ff;
-            border-left: 4px solid #2a5298;
-            padding: 20px;
-            margin-bottom: 30px;
-            border-radius: 5px;
-        }}
-        
-        .info-box h3 {{
-            color: #2a5298;
-            margin-bottom: 10px;
-        }}
-        
-        .info-box ul {{
-            margin-left: 20px;
-            color: #495057;
-        }}
-        
-        .info-box li {{
-            margin: 8px 0;
-        }}
-    </style>
-</head>
-<body>
-    <div class="dashboard-container">
-        <!-- Header -->
-        <div class="header">
-            <h1>Fortitude Re - Alternatives Portfolio Dashboard</h1>
-            <p>Comprehensive Analysis & Performance Tracking</p>
-            <p style="font-size: 0.9em; margin-top: 10px;">
-                Data Period: {self.data['metadata']['data_period']} | 
-                Generated: {self.data['metadata']['generated_date']}
-            </p>
-        </div>
-        
-        <!-- Navigation Tabs -->
-        <div class="nav-tabs">
-            <div class="nav-tab active" onclick="showTab('overview')">Overview</div>
-            <div class="nav-tab" onclick="showTab('composition')">Composition</div>
-            <div class="nav-tab" onclick="showTab('performance')">Performance</div>
-            <div class="nav-tab" onclick="showTab('trends')">Trends</div>
-        </div>
-        
-        <!-- Main Content -->
-        <div class="content">
-            <!-- Overview Tab -->
-            <div id="overview" class="tab-content active">
-                <div class="info-box">
-                    <h3>📊 Dashboard Overview</h3>
+        return ''.join(self.iter_html(embed_payload, drilldown_base))
+    
+    def _records(self, name):
+        """Rows of one exported column table as dicts (empty if the table is absent)."""
+        table = self.data.get(name)
+        return table_records(table) if table is not None else []
+    
+    def _generate_unclassified_notice(self):
+        """Generate the warning box for asset classes missing from the taxonomy (empty if none)."""
+        unclassified = self.data['metadata'].get('unclassified_asset_classes') or {}
+        if not unclassified:
+            return ''
+        items = ''.join(f"<li><strong>{html.escape(name)}:</strong> {count:,} records</li>"
+                        for name, count in unclassified.items())
+        return f"""
+                <div class="info-box" style="border-left-color: #dc3545;">
+                    <h3>⚠️ Unclassified Asset Classes</h3>
                     <ul>
-                        <li><strong>Purpose:</strong> Track and analyze Fortitude Re's Alternatives quarterly portfolio performance and composition</li>
-                        <li><strong>Alternatives Defined:</strong> Private Equity, Real Assets, Hedge Funds, Credit Funds, and Real Estate</li>
-                        <li><strong>Coverage:</strong> {self.data['metadata']['alternatives_records']:,} investment records</li>
-                        <li><strong>Update Frequency:</strong> Quarterly (easily refreshable with new quarterly data)</li>
+                        <li>These asset classes are missing from the taxonomy mapping and are excluded from Alternatives:</li>
+                        {items}
                     </ul>
                 </div>
-                
-                <h2 style="color: #2a5298; margin-bottom: 20px;">Quarterly Metrics Summary</h2>
-                <div class="metrics-grid">
-                    {self._generate_metric_cards()}
-                </div>
-                
-                <div class="grid-2">
-                    <div class="chart-container">
-                        <h2>Total End NAV Trend: Alts vs Non-Alts</h2>
-                        <div class="chart-wrapper">
-                            <canvas id="navComparisonChart"></canvas>
-                        </div>
-                    </div>
-                    
-                    <div class="chart-container">
-                        <h2>Quarterly Return Performance</h2>
-                        <div class="chart-wrapper">
-                            <canvas id="quarterlyReturnChart"></canvas>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- Composition Tab -->
-            <div id="composition" class="tab-content">
-                <h2 style="color: #2a5298; margin-bottom: 20px;">Portfolio Composition Analysis</h2>
-                
-                <div class="grid-2">
-                    <div class="chart-container">
-                        <h2>Alternatives by Asset Class (Current)</h2>
-                        <div class="chart-wrapper">
-                            <canvas id="compositionPieChart"></canvas>
-                        </div>
-                    </div>
-                    
-                    <div class="chart-container">
-                        <h2>Asset Class Distribution (NAV)</h2>
-                        <div class="chart-wrapper">
-                            <canvas id="compositionBarChart"></canvas>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="chart-container">
-                    <h2>Detailed Composition Breakdown</h2>
-                    {self._generate_composition_table()}
-                </div>
-            </div>
-            
-            <!-- Performance Tab -->
-            <div id="performance" class="tab-content">
-                <h2 style="color: #2a5298; margin-bottom: 20px;">Performance Analysis</h2>
-                
-                <div class="chart-container">
-                    <h2>Returns by Asset Class (Most Recent Quarter)</h2>
-                    <div class="chart-wrapper">
-                        <canvas id="performanceChart"></canvas>
-                    </div>
-                </div>
-                
-                <div class="chart-container">
-                    <h2>Quarterly Performance Metrics</h2>
-                    <div class="chart-wrapper">
-                        <canvas id="incomeYieldChart"></canvas>
-                    </div>
-                </div>
-                
-                <div class="chart-container">
-                    <h2>Performance Details by Asset Class</h2>
-                    {self._generate_performance_table()}
-                </div>
-            </div>
-            
-            <!-- Trends Tab -->
-            <div id="trends" class="tab-content">
-                <h2 style="color: #2a5298; margin-bottom: 20px;">Historical Trends</h2>
-                
-                <div class="chart-container">
-                    <h2>NAV Growth by Asset Class Over Time</h2>
-                    <div class="chart-wrapper">
-                        <canvas id="trendsLineChart"></canvas>
-                    </div>
-                </div>
-                
-                <div class="chart-container">
-                    <h2>Cash Flow Analysis: Contributions vs Distributions</h2>
-                    <div class="chart-wrapper">
-                        <canvas id="cashFlowChart"></canvas>
-                    </div>
+                """
+    
+    def _generate_unavailable_notice(self, section):
+        """Generate the info box shown instead of a section the data could not support (None if available)."""
+        reason = (self.data['metadata'].get('unavailable_sections') or {}).get(section)
+        if reason is None:
+            return None
+        return f"""
+                <div class="info-box">
+                    <ul>
+                        <li><strong>Not available for this dashboard:</strong> {html.escape(reason)}, which the
+                            chunked (--memory-limit) engine does not keep.</li>
+                    </ul>
                 </div>
-                
-                <div class="chart-container">
-                    <h2>Investment Income Trends</h2>
-                    <div class="chart-wrapper">
-                        <canvas id="incomeChart"></canvas>
-                    </div>
+                """
+    
+    def _generate_partial_notice(self, section):
+        """Generate the info box above a section that covers only part of the history (empty if complete)."""
+        note = (self.data['metadata'].get('partial_sections') or {}).get(section)
+        if note is None:
+            return ''
+        return f"""
+                <div class="info-box" style="border-left-color: #ffc107;">
+                    <ul>
+                        <li><strong>Partial coverage:</strong> {html.escape(note)}.</li>
+                    </ul>
                 </div>
-            </div>
-        </div>
-        
-        <!-- Footer -->
-        <div class="footer">
-            <p><strong>Fortitude Re - Alternatives Portfolio Dashboard</strong></p>
-            <p>Data sourced from FRL_Portfolio dataset.</p>
-            <p>To update with new quarterly data, run: python run_dashboard.py</p>
-        </div>
-    </div>
-
-    <script>
-        // Embedded data
-        const dashboardData = {json.dumps(self.data)};
-        
-        // Tab switching functionality
-        function showTab(tabName) {{
-            // Hide all tabs
-            document.querySelectorAll('.tab-content').forEach(tab => {{
-                tab.classList.remove('active');
-            }});
-            
-            // Remove active from all nav tabs
-            document.querySelectorAll('.nav-tab').forEach(tab => {{
-                tab.classList.remove('active');
-            }});
-            
-            // Show selected tab
-            document.getElementById(tabName).classList.add('active');
-            event.target.classList.add('active');
-        }}
-        
-        // Format currency
-        function formatCurrency(value) {{
-            if (value >= 1e9) return '$' + (value/1e9).toFixed(2) + 'B';
-            if (value >= 1e6) return '$' + (value/1e6).toFixed(1) + 'M';
-            if (value >= 1e3) return '$' + (value/1e3).toFixed(1) + 'K';
-            return '$' + value.toFixed(0);
-        }}
-        
-        // Format percentage
-        function formatPercent(value) {{
-            return value.toFixed(2) + '%';
-        }}
-        
-        // Chart.js default configuration
-        Chart.defaults.font.family = "-apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Oxygen', 'Ubuntu', 'Cantarell', sans-serif";
-        Chart.defaults.font.size = 12;
-        Chart.defaults.color = '#495057';
-        
-        // Color palette
-        const colors = {{
-            primary: ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#43e97b'],
-            gradient: [
-                'rgba(102, 126, 234, 0.8)',
-                'rgba(118, 75, 162, 0.8)',
-                'rgba(240, 147, 251, 0.8)',
-                'rgba(79, 172, 254, 0.8)',
-                'rgba(67, 233, 123, 0.8)'
-            ]
-        }};
-        
-        // Initialize all charts
-        function initializeCharts() {{
-            createNAVComparisonChart();
-            createQuarterlyReturnChart();
-            createCompositionPieChart();
-            createCompositionBarChart();
-            createPerformanceChart();
-            createIncomeYieldChart();
-            createTrendsLineChart();
-            createCashFlowChart();
-            createIncomeChart();
-        }}
-        
-        // NAV Comparison Chart
-        function createNAVComparisonChart() {{
-            // Pull time-series data for Alts 
-            const altsData = dashboardData.alternatives_timeseries;
-            
-            const nonAltsData = dashboardData.non_alternatives_timeseries;
-            
-            // Create a new Chart.js line chart inside the HTML element <canvas id="navComparisonChart">
-            new Chart(document.getElementById('navComparisonChart'), {{
-            
-                // Line chart
-                type: 'line',
-                
-                // Data that will be plotted on the chart
-                data: {{
-                
-                    // Labels are the dates along the x-axis (quarterly dates)
-                    labels: altsData.map(d => d.Date),
-                    
-                    // Plot two datasets: Alts vs Non-Alts
-                    datasets: [
-                        {{
-                            label: 'Alternatives',
-                            
-                            // End NAV values for Alts is Y-axis Values
-                            data: altsData.map(d => d.End_NAV),
-                            borderColor: '#667eea',
-                            backgroundColor: 'rgba(102, 126, 234, 0.1)',
-                            borderWidth: 3,
-                            fill: true,
-                            tension: 0.4
-                        }},
-                        {{
-                            label: 'Non-Alternatives',
-                            data: nonAltsData.map(d => d.End_NAV),
-                            borderColor: '#764ba2',
-                            backgroundColor: 'rgba(118, 75, 162, 0.1)',
-                            borderWidth: 3,
-                            fill: true,
-                            tension: 0.4
-                        }}
-                    ]
-                }},
-                // Options = Appearance and user-interaction settings
-                options: {{
-                
-                    // Responsive = Resize window = true
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{
-                            position: 'top',
-                            labels: {{
-                                font: {{ size: 14, weight: 'bold' }},
-                                padding: 15
-                            }}
-                        }},
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    return context.dataset.label + ': ' + formatCurrency(context.parsed.y);
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        y: {{
-                            beginAtZero: true,
-                            ticks: {{
-                                callback: function(value) {{
-                                    return formatCurrency(value);
-                                }}
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-        }}
-        
-        // Quarterly Return Chart
-        function createQuarterlyReturnChart() {{
-            const data = dashboardData.quarterly_performance;
-            
-            new Chart(document.getElementById('quarterlyReturnChart'), {{
-                type: 'bar',
-                data: {{
-                    labels: data.map(d => d.Date),
-                    datasets: [{{
-                        label: 'Quarterly Return %',
-                        data: data.map(d => d.Return_Pct),
-                        backgroundColor: data.map(d => d.Return_Pct >= 0 ? 'rgba(67, 233, 123, 0.8)' : 'rgba(255, 99, 132, 0.8)'),
-                        borderColor: data.map(d => d.Return_Pct >= 0 ? '#43e97b' : '#ff6384'),
-                        borderWidth: 2
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{ display: false }},
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    return 'Return: ' + formatPercent(context.parsed.y);
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        y: {{
-                            ticks: {{
-                                callback: function(value) {{
-                                    return value.toFixed(1) + '%';
-                                }}
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-        }}
-        
-        // Composition Pie Chart
-        function createCompositionPieChart() {{
-            const data = dashboardData.composition;
-            
-            new Chart(document.getElementById('compositionPieChart'), {{
-                type: 'doughnut',
-                data: {{
-                    labels: data.map(d => d.Asset_Class),
-                    datasets: [{{
-                        data: data.map(d => d.Total_NAV),
-                        backgroundColor: colors.gradient,
-                        borderWidth: 3,
-                        borderColor: '#ffffff'
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{
-                            position: 'right',
-                            labels: {{
-                                padding: 15,
-                                font: {{ size: 12 }}
-                            }}
-                        }},
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    const label = context.label;
-                                    const value = context.parsed;
-                                    const total = context.dataset.data.reduce((a, b) => a + b, 0);
-                                    const percentage = ((value / total) * 100).toFixed(1);
-                                    return label + ': ' + formatCurrency(value) + ' (' + percentage + '%)';
-                                }}
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-        }}
-        
-        // Composition Bar Chart
-        function createCompositionBarChart() {{
-            const data = dashboardData.composition;
-            
-            new Chart(document.getElementById('compositionBarChart'), {{
-                type: 'bar',
-                data: {{
-                    labels: data.map(d => d.Asset_Class),
-                    datasets: [{{
-                        label: 'Total NAV',
-                        data: data.map(d => d.Total_NAV),
-                        backgroundColor: colors.gradient,
-                        borderColor: colors.primary,
-                        borderWidth: 2
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    indexAxis: 'y',
-                    plugins: {{
-                        legend: {{ display: false }},
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    return 'NAV: ' + formatCurrency(context.parsed.x);
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        x: {{
-                            beginAtZero: true,
-                            ticks: {{
-                                callback: function(value) {{
-                                    return formatCurrency(value);
-                                }}
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-        }}
-        
-        // Performance Chart
-        function createPerformanceChart() {{
-            const data = dashboardData.performance_by_asset_class;
-            
-            new Chart(document.getElementById('performanceChart'), {{
-                type: 'bar',
-                data: {{
-                    labels: data.map(d => d.Asset_Class),
-                    datasets: [{{
-                        label: 'Return %',
-                        data: data.map(d => d.Return_Pct),
-                        backgroundColor: colors.gradient,
-                        borderColor: colors.primary,
-                        borderWidth: 2
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{ display: false }},
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    return 'Return: ' + formatPercent(context.parsed.y);
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        y: {{
-                            ticks: {{
-                                callback: function(value) {{
-                                    return value.toFixed(1) + '%';
-                                }}
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-        }}
-        
-        // Income Yield Chart
-        function createIncomeYieldChart() {{
-            const data = dashboardData.quarterly_performance;
-            
-            new Chart(document.getElementById('incomeYieldChart'), {{
-                type: 'line',
-                data: {{
-                    labels: data.map(d => d.Date),
-                    datasets: [
-                        {{
-                            label: 'Quarterly Return %',
-                            data: data.map(d => d.Return_Pct),
-                            borderColor: '#667eea',
-                            backgroundColor: 'rgba(102, 126, 234, 0.1)',
-                            borderWidth: 3,
-                            yAxisID: 'y',
-                            tension: 0.4
-                        }},
-                        {{
-                            label: 'Income Yield %',
-                            data: data.map(d => d.Income_Yield),
-                            borderColor: '#43e97b',
-                            backgroundColor: 'rgba(67, 233, 123, 0.1)',
-                            borderWidth: 3,
-                            yAxisID: 'y',
-                            tension: 0.4
-                        }}
-                    ]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{
-                            position: 'top',
-                            labels: {{
-                                padding: 15,
-                                font: {{ size: 14, weight: 'bold' }}
-                            }}
-                        }},
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    return context.dataset.label + ': ' + formatPercent(context.parsed.y);
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        y: {{
-                            ticks: {{
-                                callback: function(value) {{
-                                    return value.toFixed(1) + '%';
-                                }}
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-        }}
-        
-        // Trends Line Chart
-        function createTrendsLineChart() {{
-            const data = dashboardData.asset_class_trends;
-            const assetClasses = [...new Set(data.map(d => d.Asset_Class))];
-            
-            const datasets = assetClasses.map((ac, idx) => {{
-                const classData = data.filter(d => d.Asset_Class === ac);
-                return {{
-                    label: ac,
-                    data: classData.map(d => ({{ x: d.Date, y: d.End_NAV }})),
-                    borderColor: colors.primary[idx % colors.primary.length],
-                    backgroundColor: colors.gradient[idx % colors.gradient.length],
-                    borderWidth: 3,
-                    tension: 0.4,
-                    fill: false
-                }};
-            }});
-            
-            new Chart(document.getElementById('trendsLineChart'), {{
-                type: 'line',
-                data: {{ datasets: datasets }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{
-                            position: 'top',
-                            labels: {{
-                                padding: 10,
-                                font: {{ size: 12, weight: 'bold' }}
-                            }}
-                        }},
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    return context.dataset.label + ': ' + formatCurrency(context.parsed.y);
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        x: {{
-                            type: 'category',
-                            title: {{ display: true, text: 'Quarter' }}
-                        }},
-                        y: {{
-                            beginAtZero: true,
-                            ticks: {{
-                                callback: function(value) {{
-                                    return formatCurrency(value);
-                                }}
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-        }}
+                """
+    
+    def _generate_nav_validation_table(self):
+        """Generate HTML for the NAV validation summary and its largest exceptions."""
+        notice = self._generate_unavailable_notice('nav_validation')
+        if notice is not None:
+            return notice
+        summary_rows = ""
+        for item in self._records('nav_validation'):
+            status_class = 'negative' if item['Exceptions'] else 'positive'
+            summary_rows += f"""
+            <tr>
+                <td><strong>{NAV_CHECK_LABELS.get(item['Check'], item['Check'])}</strong></td>
+                <td>{item['Checked']:,}</td>
+                <td class="{status_class}">{item['Exceptions']:,}</td>
+                <td>${item['Max_Abs_Difference']/1e6:.2f}M</td>
+            </tr>
+            """
         
-        // Cash Flow Chart
-        function createCashFlowChart() {{
-            const data = dashboardData.quarterly_performance;
-            
-            new Chart(document.getElementById('cashFlowChart'), {{
-                type: 'bar',
-                data: {{
-                    labels: data.map(d => d.Date),
-                    datasets: [
-                        {{
-                            label: 'Contributions',
-                            data: data.map(d => d.Contributions),
-                            backgroundColor: 'rgba(67, 233, 123, 0.8)',
-                            borderColor: '#43e97b',
-                            borderWidth: 2
-                        }},
-                        {{
-                            label: 'Distributions',
-                            data: data.map(d => -d.Distributions),
-                            backgroundColor: 'rgba(255, 99, 132, 0.8)',
-                            borderColor: '#ff6384',
-                            borderWidth: 2
-                        }}
-                    ]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{
-                            position: 'top',
-                            labels: {{
-                                padding: 15,
-                                font: {{ size: 14, weight: 'bold' }}
-                            }}
-                        }},
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    return context.dataset.label + ': ' + formatCurrency(Math.abs(context.parsed.y));
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        y: {{
-                            ticks: {{
-                                callback: function(value) {{
-                                    return formatCurrency(Math.abs(value));
-                                }}
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-        }}
+        exceptions = sorted(self._records('nav_exceptions'),
+                            key=lambda item: -abs(item['Difference'] or 0))[:NAV_EXCEPTIONS_SHOWN]
+        exception_rows = ""
+        for item in exceptions:
+            position = ' / '.join(html.escape(str(item[key])) for key in ('Entity', 'Security') if key in item)
+            expected = '&mdash;' if item['Expected'] is None else f"${item['Expected']/1e6:.2f}M"
+            actual = '&mdash;' if item['Actual'] is None else f"${item['Actual']/1e6:.2f}M"
+            difference = '&mdash;' if item['Difference'] is None else f"${item['Difference']/1e6:.2f}M"
+            exception_rows += f"""
+            <tr>
+                <td>{NAV_CHECK_LABELS.get(item['Check'], item['Check'])}</td>
+                <td>{item['Date']}</td>
+                <td>{position}</td>
+                <td>{html.escape(str(item.get('Asset_Class', '')))}</td>
+                <td>{expected}</td>
+                <td>{actual}</td>
+                <td class="negative">{difference}</td>
+            </tr>
+            """
         
-        // Income Chart
-        function createIncomeChart() {{
-            const data = dashboardData.quarterly_performance;
-            
-            new Chart(document.getElementById('incomeChart'), {{
-                type: 'line',
-                data: {{
-                    labels: data.map(d => d.Date),
-                    datasets: [{{
-                        label: 'Net Investment Income',
-                        data: data.map(d => d.Net_Investment_Income),
-                        borderColor: '#667eea',
-                        backgroundColor: 'rgba(102, 126, 234, 0.2)',
-                        borderWidth: 3,
-                        fill: true,
-                        tension: 0.4
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{
-                            position: 'top',
-                            labels: {{
-                                padding: 15,
-                                font: {{ size: 14, weight: 'bold' }}
-                            }}
-                        }},
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    return 'Income: ' + formatCurrency(context.parsed.y);
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        y: {{
-                            beginAtZero: true,
-                            ticks: {{
-                                callback: function(value) {{
-                                    return formatCurrency(value);
-                                }}
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-        }}
+        table = self._generate_partial_notice('nav_validation') + f"""
+        <table class="data-table">
+            <thead>
+                <tr>
+                    <th>Check</th>
+                    <th>Records Checked</th>
+                    <th>Exceptions</th>
+                    <th>Largest Difference</th>
+                </tr>
+            </thead>
+            <tbody>
+                {summary_rows}
+            </tbody>
+        </table>
+        """
+        if exception_rows:
+            table += f"""
+        <h2 style="margin-top: 25px;">Largest Exceptions</h2>
+        <table class="data-table">
+            <thead>
+                <tr>
+                    <th>Check</th>
+                    <th>Quarter</th>
+                    <th>Position</th>
+                    <th>Asset Class</th>
+                    <th>Expected</th>
+                    <th>Reported</th>
+                    <th>Difference</th>
+                </tr>
+            </thead>
+            <tbody>
+                {exception_rows}
+            </tbody>
+        </table>
+        """
         
-        // Initialize charts when page loads
-        window.addEventListener('load', initializeCharts);
-    </script>
-</body>
-</html>
-"""
-        return html
+        return table
     
     def _generate_metric_cards(self):
         """Generate HTML for metric cards."""
@@ -980,12 +301,12 @@ class DashboardGenerator:
     
     def _generate_composition_table(self):
         """Generate HTML table for composition data."""
-        composition = self.data['composition']
+        composition = self._records('composition')
         
         rows = ""
         for item in composition:
             rows += f"""
-            <tr>
+            <tr data-asset-class="{html.escape(item['Asset_Class'])}">
                 <td><strong>{item['Asset_Class']}</strong></td>
                 <td>${item['Total_NAV']/1e9:.3f}B</td>
                 <td>{item['Percentage']:.1f}%</td>
@@ -1013,7 +334,7 @@ class DashboardGenerator:
     
     def _generate_performance_table(self):
         """Generate HTML table for performance data."""
-        performance = self.data['performance_by_asset_class']
+        performance = self._records('performance_by_asset_class')
         
         rows = ""
         for item in performance:
@@ -1049,30 +370,243 @@ class DashboardGenerator:
         
         return table
     
-    def save_dashboard(self, output_path):
-        """Save the dashboard to an HTML file."""
-        html = self.generate_html()
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
-        print(f"\nDashboard saved successfully to: {output_path}")
+    def _generate_twr_table(self):
+        """Generate HTML table for the chain-linked time-weighted returns."""
+        horizons = ['YTD', '1Y', '3Y', '5Y', 'ITD']
+        
+        def cell(value):
+            if value is None:
+                return '<td>&mdash;</td>'
+            return_class = 'positive' if value >= 0 else 'negative'
+            return f'<td class="{return_class}">{value:.2f}%</td>'
+        
+        rows = ""
+        for item in self._records('time_weighted_returns'):
+            cells = ''.join(cell(item[f'Return_{name}']) for name in horizons)
+            cells += ''.join(cell(item[f'Annualized_{name}']) for name in ('3Y', '5Y', 'ITD'))
+            rows += f"""
+            <tr>
+                <td><strong>{item['Asset_Class']}</strong></td>
+                <td>{item['Inception']}</td>
+                {cells}
+            </tr>
+            """
+        
+        table = f"""
+        <table class="data-table">
+            <thead>
+                <tr>
+                    <th>Asset Class</th>
+                    <th>First Quarter</th>
+                    <th>YTD</th>
+                    <th>1 Year</th>
+                    <th>3 Years</th>
+                    <th>5 Years</th>
+                    <th>Inception</th>
+                    <th>3Y Annualized</th>
+                    <th>5Y Annualized</th>
+                    <th>Inception Annualized</th>
+                </tr>
+            </thead>
+            <tbody>
+                {rows}
+            </tbody>
+        </table>
+        """
+        
+        return table
+    
+    def _generate_irr_table(self):
+        """Generate HTML table for the money-weighted returns (IRR) and multiples."""
+        notice = self._generate_unavailable_notice('money_weighted_returns')
+        if notice is not None:
+            return notice
+        rows = ""
+        for item in self._records('money_weighted_returns'):
+            if item['IRR'] is None:
+                irr_cell = '<td>&mdash;</td>'
+            else:
+                return_class = 'positive' if item['IRR'] >= 0 else 'negative'
+                irr_cell = f'<td class="{return_class}">{item["IRR"]:.2f}%</td>'
+            multiples = ''.join('<td>&mdash;</td>' if item[name] is None else f'<td>{item[name]:.2f}x</td>'
+                                for name in ('TVPI', 'DPI', 'RVPI'))
+            rows += f"""
+            <tr>
+                <td><strong>{item['Asset_Class']}</strong></td>
+                <td>${item['Paid_In']/1e6:.1f}M</td>
+                <td>${item['Distributed']/1e6:.1f}M</td>
+                <td>${item['NAV']/1e6:.1f}M</td>
+                {irr_cell}
+                {multiples}
+            </tr>
+            """
+        
+        table = f"""
+        <table class="data-table">
+            <thead>
+                <tr>
+                    <th>Asset Class</th>
+                    <th>Paid-In</th>
+                    <th>Distributed</th>
+                    <th>NAV</th>
+                    <th>IRR</th>
+                    <th>TVPI</th>
+                    <th>DPI</th>
+                    <th>RVPI</th>
+                </tr>
+            </thead>
+            <tbody>
+                {rows}
+            </tbody>
+        </table>
+        """
+        
+        return table
+    
+    @instrumented()
+    def save_dashboard(self, output_path, gzip_copy=False):
+        """
+        Save the dashboard to an HTML file.
+        
+        gzip_copy=True also writes output_path + '.gz'. Drilldown shards and
+        deferred sections go to a <name>_files folder next to the page and are
+        loaded on demand.
+        """
+        drilldown_base = None
+        if self.drilldown or self.deferred_keys():
+            drilldown_base = self.save_drilldown_files(output_path)
+        chunks = self.iter_html(drilldown_base=drilldown_base)
+        if gzip_copy:
+            chunks = list(chunks)
+        # Stream the template chunks straight to a temporary file instead of building one
+        # string, then rename it over the output so a browser reload never sees a partial page
+        _atomic_write_text(output_path, chunks)
+        self.metrics.log(f"\nDashboard saved successfully to: {output_path}")
+        if gzip_copy:
+            gz_path = write_gzip_copy(output_path, chunks)
+            self.metrics.log(f"Compressed copy saved to: {gz_path}")
+
+
+    def save_drilldown_files(self, output_path):
+        """
+        Write one sidecar script per drilldown shard next to output_path.
+        
+        Returns the shard URL prefix relative to the page. Shards from an
+        earlier build that no longer exist are removed.
+        """
+        stem = os.path.splitext(os.path.basename(output_path))[0]
+        folder = os.path.join(os.path.dirname(os.path.abspath(output_path)), f"{stem}_files")
+        os.makedirs(folder, exist_ok=True)
+        scripts = self.drilldown_scripts()
+        for key, script in scripts.items():
+            _atomic_write_text(os.path.join(folder, f"{key}.js"), [script])
+        for name in os.listdir(folder):
+            if name.endswith('.js') and name[:-len('.js')] not in scripts:
+                os.remove(os.path.join(folder, name))
+        return quote(f"{stem}_files") + '/'
+
+
+def _atomic_write_text(path, chunks):
+    """Write text chunks to path via a temporary file and rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.dashboard-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.writelines(chunks)
+        # mkstemp creates owner-only files; published pages should stay world-readable
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_gzip_copy(output_path, chunks):
+    """Write the page chunks to output_path + '.gz' atomically (reproducible: no embedded mtime)."""
+    gz_path = output_path + '.gz'
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(gz_path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            with gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=9, mtime=0) as gz:
+                for chunk in chunks:
+                    gz.write(chunk.encode('utf-8'))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, gz_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return gz_path
+
+
+def write_run_report(metrics, metrics_json=None, metrics_prom=None):
+    """Write the run report as JSON and/or a Prometheus textfile, if paths are given."""
+    if metrics_json:
+        metrics.write_json(metrics_json)
+        print(f"Run metrics written to: {metrics_json}")
+    if metrics_prom:
+        metrics.write_prometheus(metrics_prom)
+        print(f"Prometheus metrics written to: {metrics_prom}")
 
 
 def main(file_path: str = "FRL_Portfolio - Interview Use.xlsx",
-         output_path: str = "alternatives_dashboard.html"):
+         output_path: str = "alternatives_dashboard.html",
+         metrics_json: str = None,
+         metrics_prom: str = None,
+         track_memory: bool = False,
+         profile_stages=None,
+         payload_compression: str = 'auto',
+         gzip_copy: bool = False,
+         taxonomy: str = None,
+         engine: str = None,
+         memory_limit: int = None,
+         sheet_name: str = None,
+         date_range: tuple = None,
+         compact: bool = False,
+         copy_free: bool = False):
+    """
+    Build the dashboard for one portfolio file (Excel, CSV or Parquet).
+    
+    metrics_json / metrics_prom write the per-stage run report; track_memory
+    adds tracemalloc peaks and profile_stages opts stages in to cProfile.
+    payload_compression ('auto', 'on', 'off') applies to the embedded data;
+    gzip_copy also writes a .gz copy of the page.
+    taxonomy is the path of an asset class mapping file (default: taxonomy.json).
+    engine picks the Excel reader ('openpyxl' or 'stream'); memory_limit
+    (bytes) reads the workbook with the chunked engine instead, for
+    workbooks too large to load whole. sheet_name overrides the Excel
+    worksheet and date_range ((start, end)) keeps only the quarters inside it.
+    compact stores the dimension columns as categoricals to save memory and
+    copy_free keeps alts_df / non_alts_df as slices of df instead of copies.
+    """
     print("=" * 60)
     print("Fortitude Re - Alternatives Portfolio Dashboard Generator")
     print("=" * 60)
 
-    print(f"\nUsing portfolio file: {file_path}")
-    processor = PortfolioDataProcessor(file_path)
-    processor.load_data()
-    processor.classify_investments()
+    metrics = RunMetrics(track_memory=track_memory, profile_stages=profile_stages)
+    try:
+        print(f"\nUsing portfolio file: {file_path}")
+        processor = PortfolioDataProcessor(file_path, track_memory=track_memory, metrics=metrics,
+                                           taxonomy=taxonomy, sheet_name=sheet_name, date_range=date_range,
+                                           compact=compact, copy_free=copy_free,
+                                           **engine_options(engine, memory_limit))
+        processor.load_data()
+        processor.classify_investments()
 
-    data = processor.export_to_json()
+        data = processor.export_to_json()
+        drilldown = processor.export_security_drilldown()
 
-    print("\nGenerating dashboard...")
-    generator = DashboardGenerator(data)
-    generator.save_dashboard(output_path)
+        print("\nGenerating dashboard...")
+        generator = DashboardGenerator(data, metrics=metrics, payload_compression=payload_compression,
+                                       drilldown=drilldown)
+        generator.save_dashboard(output_path, gzip_copy=gzip_copy)
+    except BaseException:
+        metrics.finish(success=False)
+        write_run_report(metrics, metrics_json, metrics_prom)
+        raise
+    metrics.finish(success=True)
+    write_run_report(metrics, metrics_json, metrics_prom)
 
     print("\n" + "=" * 60)
     print("Dashboard generation complete!")
@@ -1081,6 +615,193 @@ def main(file_path: str = "FRL_Portfolio - Interview Use.xlsx",
     print("=" * 60)
 
 
+def engine_options(engine=None, memory_limit=None):
+    """PortfolioDataProcessor options for engine, or for the chunked engine when memory_limit is set."""
+    if memory_limit:
+        return {'engine': 'chunked', 'memory_limit': memory_limit}
+    return {'engine': engine} if engine else {}
+
+
+def refresh(file_path: str = "FRL_Portfolio - Interview Use.xlsx",
+            output_path: str = "alternatives_dashboard.html",
+            state_path: str = None,
+            metrics_json: str = None,
+            metrics_prom: str = None):
+    """Incrementally refresh the saved aggregates with new quarters and regenerate the dashboard."""
+    print("=" * 60)
+    print("Fortitude Re - Alternatives Portfolio Dashboard Refresh")
+    print("=" * 60)
+
+    metrics = RunMetrics(name='dashboard_refresh')
+    try:
+        print(f"\nUsing portfolio file: {file_path}")
+        processor = PortfolioDataProcessor(file_path, metrics=metrics)
+        processor.load_data()
+        processor.refresh(state_path)
+
+        data = processor.export_to_json()
+        drilldown = processor.export_security_drilldown()
+
+        print("\nGenerating dashboard...")
+        generator = DashboardGenerator(data, metrics=metrics, drilldown=drilldown)
+        generator.save_dashboard(output_path)
+    except BaseException:
+        metrics.finish(success=False)
+        write_run_report(metrics, metrics_json, metrics_prom)
+        raise
+    metrics.finish(success=True)
+    write_run_report(metrics, metrics_json, metrics_prom)
+
+
+def _collect_batch_inputs(source):
+    """
+    Resolve a batch source into a list of (input_path, output_name) pairs.
+    
+    source is either a directory (every workbook, CSV or Parquet file in it) or a manifest file
+    listing one workbook per line, optionally followed by ",output_name".
+    """
+    if os.path.isdir(source):
+        names = sorted(n for n in os.listdir(source)
+                       if n.lower().endswith(BATCH_INPUT_EXTENSIONS) and not n.startswith('~$'))
+        entries = [(os.path.join(source, n), None) for n in names]
+    else:
+        base_dir = os.path.dirname(os.path.abspath(source))
+        entries = []
+        with open(source, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                path, _, output_name = (part.strip() for part in line.partition(','))
+                if not os.path.isabs(path):
+                    path = os.path.join(base_dir, path)
+                entries.append((path, output_name or None))
+    
+    # Default output names follow the workbook name; de-duplicate clashes
+    resolved, seen = [], set()
+    for path, output_name in entries:
+        if not output_name:
+            output_name = os.path.splitext(os.path.basename(path))[0] + '_dashboard.html'
+        stem, ext = os.path.splitext(output_name)
+        candidate, n = output_name, 2
+        while candidate in seen:
+            candidate = f"{stem}_{n}{ext}"
+            n += 1
+        seen.add(candidate)
+        resolved.append((path, candidate))
+    return resolved
+
+
+def _generate_one(file_path, output_path, taxonomy=None, engine=None, memory_limit=None, sheet_name=None,
+                  date_range=None, compact=False, copy_free=False):
+    """Build one dashboard and return its per-stage timings (runs in a worker process)."""
+    result = {'input': file_path, 'output': output_path, 'status': 'ok', 'timings': {}}
+    started = time.perf_counter()
+    # Workers run concurrently, so keep their progress messages out of the console
+    metrics = RunMetrics(name=os.path.basename(file_path), echo=False)
+    try:
+        processor = PortfolioDataProcessor(file_path, metrics=metrics, taxonomy=taxonomy, sheet_name=sheet_name,
+                                           date_range=date_range, compact=compact, copy_free=copy_free,
+                                           **engine_options(engine, memory_limit))
+        processor.load_data()
+        processor.classify_investments()
+        data = processor.export_to_json()
+        drilldown = processor.export_security_drilldown()
+        DashboardGenerator(data, metrics=metrics, drilldown=drilldown).save_dashboard(output_path)
+        result['records'] = data['metadata']['total_records']
+        metrics.finish(success=True)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+        metrics.finish(success=False)
+    for record in metrics.stages:
+        if record['parent'] is None:
+            result['timings'][record['stage']] = record['wall_seconds']
+    result['timings']['total'] = time.perf_counter() - started
+    return result
+
+
+def generate_batch(source, output_dir="dashboards", workers=None, summary_path=None, taxonomy=None,
+                   engine=None, memory_limit=None, sheet_name=None, date_range=None, compact=False,
+                   copy_free=False):
+    """
+    Generate one dashboard per workbook listed in a directory or manifest.
+    
+    Workbooks are processed across a pool of `workers` processes (default:
+    CPU count). A failing workbook is recorded in the summary and does not
+    stop the rest of the batch. The summary is written as JSON to
+    summary_path (default: batch_summary.json inside output_dir). taxonomy
+    is the asset class mapping file every workbook is classified with;
+    engine, memory_limit (bytes, per worker), sheet_name, date_range,
+    compact and copy_free apply to every input as in main().
+    """
+    inputs = _collect_batch_inputs(source)
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = summary_path or os.path.join(output_dir, 'batch_summary.json')
+    workers = max(1, workers or os.cpu_count() or 1)
+    
+    print("=" * 60)
+    print(f"Batch dashboard generation: {len(inputs)} workbook(s), {workers} worker(s)")
+    print("=" * 60)
+    
+    started = time.perf_counter()
+    jobs = [(path, os.path.join(output_dir, name)) for path, name in inputs]
+    results = []
+    if workers == 1:
+        for path, output_path in jobs:
+            results.append(_generate_one(path, output_path, taxonomy, engine, memory_limit, sheet_name,
+                                         date_range, compact, copy_free))
+            _print_batch_result(results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_generate_one, path, output_path, taxonomy, engine, memory_limit,
+                                   sheet_name, date_range, compact, copy_free): (path, output_path)
+                       for path, output_path in jobs}
+            for future in as_completed(futures):
+                path, output_path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker itself died (e.g. out of memory); record it and carry on
+                    result = {'input': path, 'output': output_path, 'status': 'failed',
+                              'error': f"{type(e).__name__}: {e}", 'timings': {}}
+                results.append(result)
+                _print_batch_result(result)
+    
+    order = {path: i for i, (path, _) in enumerate(jobs)}
+    results.sort(key=lambda r: order.get(r['input'], len(order)))
+    failed = [r for r in results if r['status'] != 'ok']
+    summary = {
+        'generated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'source': source,
+        'workers': workers,
+        'wall_time': time.perf_counter() - started,
+        'succeeded': len(results) - len(failed),
+        'failed': len(failed),
+        'results': results
+    }
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    
+    print("\n" + "=" * 60)
+    print(f"Batch complete: {summary['succeeded']} succeeded, {summary['failed']} failed "
+          f"in {summary['wall_time']:.1f}s")
+    print(f"Summary written to: {summary_path}")
+    print("=" * 60)
+    return summary
+
+
+def _print_batch_result(result):
+    """Print a one-line status for a finished batch item."""
+    name = os.path.basename(result['input'])
+    total = result['timings'].get('total')
+    elapsed = f"{total:.2f}s" if total is not None else "-"
+    if result['status'] == 'ok':
+        print(f"  OK      {name} ({elapsed}) -> {result['output']}")
+    else:
+        print(f"  FAILED  {name} ({elapsed}): {result['error']}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,301 @@
+"""
+Dashboard Server
+
+This module serves the dashboard from a local HTTP server instead of a static file.
+
+The workbook is parsed once and the loaded PortfolioDataProcessor stays in memory. The
+page shell and one JSON endpoint per dashboard section are rendered on first request and
+cached together with a strong ETag, so reloading the page or switching views is answered
+from memory (or with 304 Not Modified when the browser already holds the response).
+Security drilldown shards and the taxonomy rollups are separate scripts the page requests
+only when they are first shown.
+POST /api/reload re-runs the pipeline, e.g. after the workbook was replaced. It needs the
+reload token printed at startup (X-Reload-Token header), and requests sent from another
+origin are refused, so a web page open in the same browser cannot trigger reloads. Each
+reload starts a fresh run report, so the recorded stages do not grow with uptime.
+"""
+
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import webbrowser
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from dashboard_generator import DashboardGenerator
+from data_processor import PortfolioDataProcessor
+from payload_codec import encode_payload
+from run_metrics import RunMetrics
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8050
+
+# JSON endpoints (/api/<name>) and the export_to_json keys each one returns
+SECTIONS = {
+    'metadata': ['metadata'],
+    'key_metrics': ['key_metrics'],
+    'composition': ['composition'],
+    'timeseries': ['alternatives_timeseries', 'non_alternatives_timeseries'],
+    'trends': ['asset_class_trends', 'rolling_risk'],
+    'performance': ['performance_by_asset_class', 'time_weighted_returns', 'money_weighted_returns'],
+    'quarterly': ['quarterly_performance'],
+    'snapshots': ['snapshots', 'snapshot_metrics'],
+    'taxonomy': ['taxonomy_rollups'],
+    'validation': ['nav_validation', 'nav_exceptions']
+}
+
+_HTML = 'text/html; charset=utf-8'
+_JSON = 'application/json'
+_JAVASCRIPT = 'text/javascript; charset=utf-8'
+
+# Request header carrying DashboardApp.reload_token on POST /api/reload
+RELOAD_TOKEN_HEADER = 'X-Reload-Token'
+
+
+class DashboardApp:
+    """In-memory dashboard data and the cached responses rendered from it."""
+
+    def __init__(self, file_path, processor_options=None, payload_compression='auto', metrics=None,
+                 reload_token=None):
+        """
+        Initialize the app for one workbook (nothing is loaded until load()).
+
+        processor_options are passed on to PortfolioDataProcessor.
+        reload_token is the secret POST /api/reload must present (a random
+        one is generated if not given).
+        """
+        self.file_path = file_path
+        self.processor_options = dict(processor_options or {})
+        self.payload_compression = payload_compression
+        self.metrics = metrics or RunMetrics(name='dashboard_server')
+        self.reload_token = reload_token or secrets.token_urlsafe(24)
+        self.processor = None
+        self.data = None
+        self.drilldown = None
+        self._responses = {}
+        # Paths being rendered -> Event set when done; generation counts loads
+        self._pending = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Run the pipeline and drop every cached response (and the previous run's metrics)."""
+        self.metrics.reset()
+        processor = PortfolioDataProcessor(self.file_path, metrics=self.metrics, **self.processor_options)
+        processor.load_data()
+        processor.classify_investments()
+        data = processor.export_to_json()
+        drilldown = processor.export_security_drilldown()
+        with self._lock:
+            self.processor = processor
+            self.data = data
+            self.drilldown = drilldown
+            self._responses.clear()
+            self._generation += 1
+        return self
+
+    def routes(self, generator=None):
+        """Return the GET paths the app answers."""
+        generator = generator or self._generator()
+        keys = [*generator.drilldown_keys().values(), *generator.deferred_keys().values()]
+        shards = [f'/drilldown/{key}.js' for key in keys]
+        return ['/', '/api', '/api/dashboard', '/api/payload'] + [f'/api/{name}' for name in SECTIONS] + shards
+
+    def response(self, path):
+        """
+        Return the cached (body, content_type, etag) for path, or None if unknown.
+
+        Rendering runs outside the app lock, so building the page does not hold
+        up requests for other paths; concurrent requests for the same path wait
+        for the one render. A response rendered from data that a reload has
+        since replaced is returned but not cached.
+        """
+        if path == '/index.html':
+            path = '/'
+        while True:
+            with self._lock:
+                cached = self._responses.get(path)
+                if cached is not None:
+                    return cached
+                pending = self._pending.get(path)
+                if pending is None:
+                    pending = self._pending[path] = threading.Event()
+                    generation, generator = self._generation, self._generator()
+                    break
+            pending.wait()
+        try:
+            rendered = self._render(path, generator)
+            if rendered is None:
+                return None
+            body, content_type = rendered
+            etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            cached = (body, content_type, etag)
+            with self._lock:
+                if self._generation == generation:
+                    self._responses[path] = cached
+            return cached
+        finally:
+            with self._lock:
+                if self._pending.get(path) is pending:
+                    del self._pending[path]
+            pending.set()
+
+    def _render(self, path, generator):
+        """Render the body and content type for path from generator's data (None if unknown)."""
+        data = generator.data
+        if path == '/':
+            html = generator.generate_html(embed_payload=False, drilldown_base='drilldown/')
+            return html.encode('utf-8'), _HTML
+        if path.startswith('/drilldown/') and path.endswith('.js'):
+            script = generator.drilldown_scripts().get(path[len('/drilldown/'):-len('.js')])
+            return (script.encode('utf-8'), _JAVASCRIPT) if script is not None else None
+        if path == '/api':
+            return self._json({'endpoints': self.routes(generator)[1:]}), _JSON
+        if path == '/api/dashboard':
+            return self._json(data), _JSON
+        if path == '/api/payload':
+            return self._json(encode_payload(generator.page_data(), self.payload_compression)), _JSON
+        if path.startswith('/api/') and path[len('/api/'):] in SECTIONS:
+            keys = SECTIONS[path[len('/api/'):]]
+            return self._json({key: data[key] for key in keys}), _JSON
+        return None
+
+    def reload_allowed(self, token):
+        """True if token matches reload_token."""
+        return token is not None and hmac.compare_digest(token.encode('utf-8'), self.reload_token.encode('utf-8'))
+
+    def _generator(self):
+        """A DashboardGenerator over the loaded data."""
+        return DashboardGenerator(self.data, metrics=self.metrics, payload_compression=self.payload_compression,
+                                  drilldown=self.drilldown)
+
+    @staticmethod
+    def _json(value):
+        """Encode a response body as compact JSON."""
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+class DashboardRequestHandler(BaseHTTPRequestHandler):
+    """Serve DashboardApp responses with ETag / If-None-Match revalidation."""
+
+    server_version = 'AlternativesDashboard/1.0'
+
+    @property
+    def app(self):
+        """The DashboardApp attached to the server."""
+        return self.server.app
+
+    def do_GET(self):
+        """Serve a cached page or JSON section."""
+        self._send_cached(include_body=True)
+
+    def do_HEAD(self):
+        """Like GET without the body."""
+        self._send_cached(include_body=False)
+
+    def do_POST(self):
+        """POST /api/reload re-runs the pipeline and invalidates the cache."""
+        if urlsplit(self.path).path != '/api/reload':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        if not self._same_origin():
+            self.send_error(HTTPStatus.FORBIDDEN, explain="Cross-origin reload requests are refused")
+            return
+        if not self.app.reload_allowed(self.headers.get(RELOAD_TOKEN_HEADER)):
+            self.send_error(HTTPStatus.FORBIDDEN, explain=f"Missing or wrong {RELOAD_TOKEN_HEADER} header")
+            return
+        try:
+            self.app.load()
+        except Exception as e:
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, explain=f"{type(e).__name__}: {e}")
+            return
+        body = DashboardApp._json({'reloaded': True, 'metadata': self.app.data['metadata']})
+        self._send(HTTPStatus.OK, body, _JSON, etag=None, include_body=True)
+
+    def _same_origin(self):
+        """False if the request's Origin (or, without one, its Referer) names another host than Host."""
+        source = self.headers.get('Origin') or self.headers.get('Referer')
+        if not source:
+            # Not sent by a browser page (e.g. curl)
+            return True
+        if source == 'null':
+            return False
+        return urlsplit(source).netloc == self.headers.get('Host', '')
+
+    def _send_cached(self, include_body):
+        """Answer from the app's response cache, with 304 when the ETag still matches."""
+        cached = self.app.response(urlsplit(self.path).path)
+        if cached is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body, content_type, etag = cached
+        if self._etag_matches(etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return
+        self._send(HTTPStatus.OK, body, content_type, etag, include_body)
+
+    def _etag_matches(self, etag):
+        """True if the request's If-None-Match lists etag (or '*')."""
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        candidates = [tag.strip() for tag in header.split(',')]
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        return '*' in candidates or etag in [tag[2:] if tag.startswith('W/') else tag for tag in candidates]
+
+    def _send(self, status, body, content_type, etag, include_body):
+        """Write a complete response."""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        # Browsers may keep the response but must revalidate it (cheap 304s)
+        self.send_header('Cache-Control', 'no-cache')
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Print one access-log line per request (kept out of the run metrics, which would grow forever)."""
+        print(f"{self.address_string()} - {format % args}")
+
+
+def create_server(app, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Return a threading HTTP server bound to host:port that serves app."""
+    server = ThreadingHTTPServer((host, port), DashboardRequestHandler)
+    server.daemon_threads = True
+    server.app = app
+    return server
+
+
+def serve(file_path, host=DEFAULT_HOST, port=DEFAULT_PORT, open_browser=True,
+          processor_options=None, payload_compression='auto'):
+    """Load the workbook once and serve the dashboard until interrupted."""
+    print("=" * 60)
+    print("Fortitude Re - Alternatives Portfolio Dashboard Server")
+    print("=" * 60)
+
+    print(f"\nUsing portfolio file: {file_path}")
+    app = DashboardApp(file_path, processor_options, payload_compression).load()
+    server = create_server(app, host, port)
+    url = f"http://{host}:{server.server_address[1]}/"
+
+    print(f"\nServing dashboard at {url} (press Ctrl+C to stop)")
+    print(f"Reload after replacing the workbook with:\n"
+          f"    curl -X POST -H '{RELOAD_TOKEN_HEADER}: {app.reload_token}' {url}api/reload")
+    if open_browser:
+        webbrowser.open(url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping server...")
+    finally:
+        server.server_close()
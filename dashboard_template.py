@@ -0,0 +1,1666 @@
+"""
+Dashboard Template
+
+This module holds the HTML shell of the dashboard and compiles it once per process.
+
+The CSS, tab scaffolding and chart JavaScript never change between runs; only the
+embedded data, the header text and three HTML tables do. DASHBOARD_TEMPLATE marks those
+parts with named {{ slot }} markers. get_dashboard_template() splits the shell into
+static chunks around the slots a single time (cached), and rendering just interleaves
+the static chunks with the slot values, which can be streamed straight to a file.
+"""
+
+import functools
+import re
+
+from payload_codec import DECODER_JS
+
+
+_SLOT = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# Slots filled once at compile time (identical for every dashboard)
+STATIC_SLOTS = {'decoder_js': DECODER_JS}
+
+
+class CompiledTemplate:
+    """A template split into static chunks and the named slots between them."""
+
+    def __init__(self, text, static_slots=None):
+        """Compile text, inlining any static_slots so only per-dashboard slots remain."""
+        static_slots = static_slots or {}
+        parts = _SLOT.split(text)
+        chunks = [parts[0]]
+        slots = []
+        for name, static in zip(parts[1::2], parts[2::2]):
+            if name in static_slots:
+                chunks[-1] += static_slots[name] + static
+            else:
+                slots.append(name)
+                chunks.append(static)
+        self.chunks = tuple(chunks)
+        self.slots = tuple(slots)
+
+    def iter_render(self, values):
+        """Yield the rendered document piece by piece."""
+        missing = set(self.slots) - set(values)
+        if missing:
+            raise KeyError(f"Template slots without values: {sorted(missing)}")
+        yield self.chunks[0]
+        for name, chunk in zip(self.slots, self.chunks[1:]):
+            yield str(values[name])
+            yield chunk
+
+    def render(self, values):
+        """Return the rendered document as one string."""
+        return ''.join(self.iter_render(values))
+
+
+@functools.lru_cache(maxsize=None)
+def get_dashboard_template():
+    """Return the compiled dashboard shell (built on first use, then cached)."""
+    return CompiledTemplate(DASHBOARD_TEMPLATE, STATIC_SLOTS)
+
+
+DASHBOARD_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Fortitude Re - Alternatives Portfolio Dashboard</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
+    <style>
+        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+        
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Oxygen', 'Ubuntu', 'Cantarell', sans-serif;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            padding: 20px;
+            min-height: 100vh;
+        }
+        
+        .dashboard-container {
+            max-width: 1400px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 20px;
+            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
+            overflow: hidden;
+        }
+        
+        .header {
+            background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
+            color: white;
+            padding: 40px;
+            text-align: center;
+        }
+        
+        .header h1 {
+            font-size: 2.5em;
+            margin-bottom: 10px;
+            font-weight: 700;
+        }
+        
+        .header p {
+            font-size: 1.1em;
+            opacity: 0.9;
+        }
+        
+        .nav-tabs {
+            display: flex;
+            background: #f8f9fa;
+            border-bottom: 2px solid #dee2e6;
+            padding: 0 40px;
+        }
+        
+        .nav-tab {
+            padding: 20px 30px;
+            cursor: pointer;
+            border-bottom: 3px solid transparent;
+            font-weight: 600;
+            color: #6c757d;
+            transition: all 0.3s ease;
+        }
+        
+        .nav-tab:hover {
+            color: #495057;
+            background: #e9ecef;
+        }
+        
+        .nav-tab.active {
+            color: #2a5298;
+            border-bottom-color: #2a5298;
+            background: white;
+        }
+        
+        .content {
+            padding: 40px;
+        }
+        
+        .tab-content {
+            display: none;
+        }
+        
+        .tab-content.active {
+            display: block;
+            animation: fadeIn 0.5s;
+        }
+        
+        @keyframes fadeIn {
+            from { opacity: 0; transform: translateY(10px); }
+            to { opacity: 1; transform: translateY(0); }
+        }
+        
+        .snapshot-bar {
+            display: flex;
+            align-items: center;
+            gap: 15px;
+            padding: 15px 30px;
+            background: #f8f9fa;
+            border-bottom: 1px solid #e9ecef;
+            color: #495057;
+            font-weight: 600;
+        }
+        
+        .snapshot-bar input[type="range"] {
+            flex: 1;
+            accent-color: #667eea;
+        }
+        
+        .metrics-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+            gap: 20px;
+            margin-bottom: 40px;
+        }
+        
+        .metric-card {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 25px;
+            border-radius: 15px;
+            box-shadow: 0 4px 15px rgba(0,0,0,0.1);
+            transition: transform 0.3s ease;
+        }
+        
+        .metric-card:hover {
+            transform: translateY(-5px);
+            box-shadow: 0 6px 20px rgba(0,0,0,0.15);
+        }
+        
+        .metric-card h3 {
+            font-size: 0.9em;
+            opacity: 0.9;
+            margin-bottom: 10px;
+            text-transform: uppercase;
+            letter-spacing: 1px;
+        }
+        
+        .metric-card .value {
+            font-size: 2em;
+            font-weight: 700;
+            margin-bottom: 5px;
+        }
+        
+        .metric-card .subtext {
+            font-size: 0.85em;
+            opacity: 0.8;
+        }
+        
+        .chart-container {
+            background: white;
+            border-radius: 15px;
+            padding: 30px;
+            margin-bottom: 30px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
+        }
+        
+        .chart-container h2 {
+            color: #2a5298;
+            margin-bottom: 20px;
+            font-size: 1.5em;
+        }
+        
+        .chart-wrapper {
+            position: relative;
+            height: 400px;
+        }
+        
+        .data-table {
+            width: 100%;
+            border-collapse: collapse;
+            margin-top: 20px;
+            background: white;
+            border-radius: 10px;
+            overflow: hidden;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
+        }
+        
+        .data-table thead {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+        }
+        
+        .data-table th {
+            padding: 15px;
+            text-align: left;
+            font-weight: 600;
+            text-transform: uppercase;
+            font-size: 0.85em;
+            letter-spacing: 0.5px;
+        }
+        
+        .data-table td {
+            padding: 15px;
+            border-bottom: 1px solid #e9ecef;
+        }
+        
+        .data-table tbody tr:hover {
+            background: #f8f9fa;
+        }
+        
+        .data-table tbody tr:last-child td {
+            border-bottom: none;
+        }
+        
+        .positive {
+            color: #28a745;
+            font-weight: 600;
+        }
+        
+        .negative {
+            color: #dc3545;
+            font-weight: 600;
+        }
+        
+        .footer {
+            background: #f8f9fa;
+            padding: 20px 40px;
+            text-align: center;
+            color: #6c757d;
+            border-top: 1px solid #dee2e6;
+        }
+        
+        .grid-2 {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(360px, 1fr));
+            gap: 30px;
+        }
+        
+        
+        .info-box {
+            background: #e7f3ff;
+            border-left: 4px solid #2a5298;
+            padding: 20px;
+            margin-bottom: 30px;
+            border-radius: 5px;
+        }
+        
+        .info-box h3 {
+            color: #2a5298;
+            margin-bottom: 10px;
+        }
+        
+        .info-box ul {
+            margin-left: 20px;
+            color: #495057;
+        }
+        
+        .info-box li {
+            margin: 8px 0;
+        }
+        
+        tr.drillable {
+            cursor: pointer;
+        }
+        
+        .drill-buttons {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 10px;
+            margin: 15px 0;
+        }
+        
+        .drill-button {
+            padding: 8px 16px;
+            border: 2px solid #667eea;
+            border-radius: 20px;
+            background: white;
+            color: #667eea;
+            font-weight: 600;
+            cursor: pointer;
+        }
+        
+        .drill-button.active {
+            background: #667eea;
+            color: white;
+        }
+        
+        .drill-status {
+            color: #6c757d;
+            margin-bottom: 10px;
+        }
+        
+        .virtual-header, .virtual-row {
+            display: grid;
+            grid-template-columns: 1.6fr 1fr 1fr 0.8fr 1fr 1fr 0.8fr 0.7fr;
+            gap: 10px;
+            align-items: center;
+            padding: 0 15px;
+        }
+        
+        .virtual-header {
+            height: 44px;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            font-weight: 600;
+            font-size: 0.8em;
+            text-transform: uppercase;
+            border-radius: 10px 10px 0 0;
+        }
+        
+        .virtual-viewport {
+            height: 360px;
+            overflow-y: auto;
+            border: 1px solid #e9ecef;
+            border-radius: 0 0 10px 10px;
+        }
+        
+        .virtual-spacer {
+            position: relative;
+        }
+        
+        .virtual-row {
+            position: absolute;
+            left: 0;
+            right: 0;
+            height: 36px;
+            border-bottom: 1px solid #e9ecef;
+            cursor: pointer;
+        }
+        
+        .virtual-row:hover, .virtual-row.selected {
+            background: #f8f9fa;
+        }
+    </style>
+</head>
+<body>
+    <div class="dashboard-container">
+        <!-- Header -->
+        <div class="header">
+            <h1>Fortitude Re - Alternatives Portfolio Dashboard</h1>
+            <p>Comprehensive Analysis & Performance Tracking</p>
+            <p style="font-size: 0.9em; margin-top: 10px;">
+                Data Period: {{ data_period }} | 
+                Generated: {{ generated_date }}
+            </p>
+        </div>
+        
+        <!-- Navigation Tabs -->
+        <div class="nav-tabs">
+            <div class="nav-tab active" onclick="showTab('overview')">Overview</div>
+            <div class="nav-tab" onclick="showTab('composition')">Composition</div>
+            <div class="nav-tab" onclick="showTab('performance')">Performance</div>
+            <div class="nav-tab" onclick="showTab('trends')">Trends</div>
+        </div>
+        
+        <!-- Quarter slider (shown once the precomputed snapshots are loaded) -->
+        <div class="snapshot-bar" id="snapshotBar" style="display: none;">
+            <label for="snapshotSlider">As of quarter:</label>
+            <input type="range" id="snapshotSlider" min="0" max="0" step="1" value="0">
+            <span id="snapshotLabel"></span>
+        </div>
+        
+        <!-- Main Content -->
+        <div class="content">
+            <!-- Overview Tab -->
+            <div id="overview" class="tab-content active">
+                <div class="info-box">
+                    <h3>📊 Dashboard Overview</h3>
+                    <ul>
+                        <li><strong>Purpose:</strong> Track and analyze Fortitude Re's Alternatives quarterly portfolio performance and composition</li>
+                        <li><strong>Alternatives Defined:</strong> Private Equity, Real Assets, Hedge Funds, Credit Funds, and Real Estate</li>
+                        <li><strong>Coverage:</strong> {{ alternatives_records }} investment records</li>
+                        <li><strong>Update Frequency:</strong> Quarterly (easily refreshable with new quarterly data)</li>
+                    </ul>
+                </div>
+                {{ unclassified_notice }}
+                <h2 style="color: #2a5298; margin-bottom: 20px;">Quarterly Metrics Summary</h2>
+                <div class="metrics-grid" id="metricCards">
+                    {{ metric_cards }}
+                </div>
+                
+                <div class="grid-2">
+                    <div class="chart-container">
+                        <h2>Total End NAV Trend: Alts vs Non-Alts</h2>
+                        <div class="chart-wrapper">
+                            <canvas id="navComparisonChart"></canvas>
+                        </div>
+                    </div>
+                    
+                    <div class="chart-container">
+                        <h2>Quarterly Return Performance</h2>
+                        <div class="chart-wrapper">
+                            <canvas id="quarterlyReturnChart"></canvas>
+                        </div>
+                    </div>
+                </div>
+                
+                <div class="chart-container">
+                    <h2>NAV Roll-Forward and Continuity Checks</h2>
+                    {{ nav_validation_table }}
+                </div>
+            </div>
+            
+            <!-- Composition Tab -->
+            <div id="composition" class="tab-content">
+                <h2 style="color: #2a5298; margin-bottom: 20px;">Portfolio Composition Analysis</h2>
+                
+                <div class="grid-2">
+                    <div class="chart-container">
+                        <h2>Alternatives by Asset Class (<span data-snapshot-label="Current">Current</span>)</h2>
+                        <div class="chart-wrapper">
+                            <canvas id="compositionPieChart"></canvas>
+                        </div>
+                    </div>
+                    
+                    <div class="chart-container">
+                        <h2>Asset Class Distribution (NAV)</h2>
+                        <div class="chart-wrapper">
+                            <canvas id="compositionBarChart"></canvas>
+                        </div>
+                    </div>
+                </div>
+                
+                <div class="chart-container">
+                    <h2>Whole Portfolio by Taxonomy Level (<span data-snapshot-label="Current">Current</span>)</h2>
+                    <div class="drill-buttons" id="taxonomyLevelButtons"></div>
+                    <div class="chart-wrapper">
+                        <canvas id="taxonomyChart"></canvas>
+                    </div>
+                </div>
+                
+                <div class="chart-container">
+                    <h2>Detailed Composition Breakdown</h2>
+                    <div id="compositionTable">
+                        {{ composition_table }}
+                    </div>
+                </div>
+                
+                <div class="chart-container" id="drilldownPanel" style="display: none;">
+                    <h2>Security Drilldown: <span id="drilldownTitle">select an asset class</span></h2>
+                    <div class="drill-buttons" id="drilldownButtons"></div>
+                    <div class="drill-status" id="drilldownStatus">Choose an asset class (or click a row above) to load its securities.</div>
+                    <div class="virtual-header">
+                        <span>Security</span>
+                        <span>Latest Quarter</span>
+                        <span>End NAV</span>
+                        <span>Return</span>
+                        <span>Contributions</span>
+                        <span>Distributions</span>
+                        <span>IRR</span>
+                        <span>TVPI</span>
+                    </div>
+                    <div class="virtual-viewport" id="drilldownViewport">
+                        <div class="virtual-spacer" id="drilldownSpacer"></div>
+                    </div>
+                    <h2 style="margin-top: 25px;">History: <span id="securityHistoryTitle"></span></h2>
+                    <div class="chart-wrapper">
+                        <canvas id="securityHistoryChart"></canvas>
+                    </div>
+                </div>
+            </div>
+            
+            <!-- Performance Tab -->
+            <div id="performance" class="tab-content">
+                <h2 style="color: #2a5298; margin-bottom: 20px;">Performance Analysis</h2>
+                
+                <div class="chart-container">
+                    <h2>Returns by Asset Class (<span data-snapshot-label="Most Recent Quarter">Most Recent Quarter</span>)</h2>
+                    <div class="chart-wrapper">
+                        <canvas id="performanceChart"></canvas>
+                    </div>
+                </div>
+                
+                <div class="chart-container">
+                    <h2>Quarterly Performance Metrics</h2>
+                    <div class="chart-wrapper">
+                        <canvas id="incomeYieldChart"></canvas>
+                    </div>
+                </div>
+                
+                <div class="chart-container">
+                    <h2>Performance Details by Asset Class</h2>
+                    <div id="performanceTable">
+                        {{ performance_table }}
+                    </div>
+                </div>
+                
+                <div class="chart-container">
+                    <h2>Time-Weighted Returns (Chain-Linked)</h2>
+                    {{ twr_table }}
+                </div>
+                
+                <div class="chart-container">
+                    <h2>Money-Weighted Returns (IRR) and Multiples Since First Quarter</h2>
+                    {{ irr_table }}
+                </div>
+            </div>
+            
+            <!-- Trends Tab -->
+            <div id="trends" class="tab-content">
+                <h2 style="color: #2a5298; margin-bottom: 20px;">Historical Trends</h2>
+                
+                <div class="chart-container">
+                    <h2>NAV Growth by Asset Class Over Time</h2>
+                    <div class="chart-wrapper">
+                        <canvas id="trendsLineChart"></canvas>
+                    </div>
+                </div>
+                
+                <div class="chart-container">
+                    <h2>Rolling Risk by Asset Class</h2>
+                    <div class="drill-buttons" id="riskWindowButtons"></div>
+                    <div class="drill-buttons" id="riskMetricButtons"></div>
+                    <div class="chart-wrapper">
+                        <canvas id="rollingRiskChart"></canvas>
+                    </div>
+                </div>
+                
+                <div class="chart-container">
+                    <h2>Cash Flow Analysis: Contributions vs Distributions</h2>
+                    <div class="chart-wrapper">
+                        <canvas id="cashFlowChart"></canvas>
+                    </div>
+                </div>
+                
+                <div class="chart-container">
+                    <h2>Investment Income Trends</h2>
+                    <div class="chart-wrapper">
+                        <canvas id="incomeChart"></canvas>
+                    </div>
+                </div>
+            </div>
+        </div>
+        
+        <!-- Footer -->
+        <div class="footer">
+            <p><strong>Fortitude Re - Alternatives Portfolio Dashboard</strong></p>
+            <p>Data sourced from FRL_Portfolio dataset.</p>
+            <p>To update with new quarterly data, run: python run_dashboard.py</p>
+        </div>
+    </div>
+
+    {{ drilldown_shards }}
+    <script>
+        // Embedded data: compact columnar payload, rebuilt into dashboardData on load
+        const dashboardPayload = {{ payload }};
+        let dashboardData = null;
+        {{ decoder_js }}
+        
+        // Tab switching functionality
+        function showTab(tabName) {
+            // Hide all tabs
+            document.querySelectorAll('.tab-content').forEach(tab => {
+                tab.classList.remove('active');
+            });
+            
+            // Remove active from all nav tabs
+            document.querySelectorAll('.nav-tab').forEach(tab => {
+                tab.classList.remove('active');
+            });
+            
+            // Show selected tab
+            document.getElementById(tabName).classList.add('active');
+            event.target.classList.add('active');
+        }
+        
+        // Format currency
+        function formatCurrency(value) {
+            if (value >= 1e9) return '$' + (value/1e9).toFixed(2) + 'B';
+            if (value >= 1e6) return '$' + (value/1e6).toFixed(1) + 'M';
+            if (value >= 1e3) return '$' + (value/1e3).toFixed(1) + 'K';
+            return '$' + value.toFixed(0);
+        }
+        
+        // Format percentage
+        function formatPercent(value) {
+            return value.toFixed(2) + '%';
+        }
+        
+        // Chart.js default configuration
+        Chart.defaults.font.family = "-apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Oxygen', 'Ubuntu', 'Cantarell', sans-serif";
+        Chart.defaults.font.size = 12;
+        Chart.defaults.color = '#495057';
+        
+        // Color palette
+        const colors = {
+            primary: ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#43e97b'],
+            gradient: [
+                'rgba(102, 126, 234, 0.8)',
+                'rgba(118, 75, 162, 0.8)',
+                'rgba(240, 147, 251, 0.8)',
+                'rgba(79, 172, 254, 0.8)',
+                'rgba(67, 233, 123, 0.8)'
+            ]
+        };
+        
+        // Snapshot charts, re-created when the quarter slider moves
+        let compositionPieChart = null;
+        let compositionBarChart = null;
+        let performanceChart = null;
+        let taxonomyChart = null;
+        
+        // Initialize all charts
+        function initializeCharts() {
+            createNAVComparisonChart();
+            createQuarterlyReturnChart();
+            createCompositionPieChart();
+            createCompositionBarChart();
+            createTaxonomyChart();
+            createPerformanceChart();
+            createIncomeYieldChart();
+            createTrendsLineChart();
+            createRollingRiskChart();
+            createCashFlowChart();
+            createIncomeChart();
+        }
+        
+        // NAV Comparison Chart
+        function createNAVComparisonChart() {
+            // Pull time-series data for Alts 
+            const altsData = dashboardData.alternatives_timeseries;
+            
+            const nonAltsData = dashboardData.non_alternatives_timeseries;
+            
+            // Create a new Chart.js line chart inside the HTML element <canvas id="navComparisonChart">
+            new Chart(document.getElementById('navComparisonChart'), {
+            
+                // Line chart
+                type: 'line',
+                
+                // Data that will be plotted on the chart
+                data: {
+                
+                    // Labels are the dates along the x-axis (quarterly dates)
+                    labels: altsData.map(d => d.Date),
+                    
+                    // Plot two datasets: Alts vs Non-Alts
+                    datasets: [
+                        {
+                            label: 'Alternatives',
+                            
+                            // End NAV values for Alts is Y-axis Values
+                            data: altsData.map(d => d.End_NAV),
+                            borderColor: '#667eea',
+                            backgroundColor: 'rgba(102, 126, 234, 0.1)',
+                            borderWidth: 3,
+                            fill: true,
+                            tension: 0.4
+                        },
+                        {
+                            label: 'Non-Alternatives',
+                            data: nonAltsData.map(d => d.End_NAV),
+                            borderColor: '#764ba2',
+                            backgroundColor: 'rgba(118, 75, 162, 0.1)',
+                            borderWidth: 3,
+                            fill: true,
+                            tension: 0.4
+                        }
+                    ]
+                },
+                // Options = Appearance and user-interaction settings
+                options: {
+                
+                    // Responsive = Resize window = true
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: {
+                            position: 'top',
+                            labels: {
+                                font: { size: 14, weight: 'bold' },
+                                padding: 15
+                            }
+                        },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    return context.dataset.label + ': ' + formatCurrency(context.parsed.y);
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        y: {
+                            beginAtZero: true,
+                            ticks: {
+                                callback: function(value) {
+                                    return formatCurrency(value);
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Quarterly Return Chart
+        function createQuarterlyReturnChart() {
+            const data = dashboardData.quarterly_performance;
+            
+            new Chart(document.getElementById('quarterlyReturnChart'), {
+                type: 'bar',
+                data: {
+                    labels: data.map(d => d.Date),
+                    datasets: [{
+                        label: 'Quarterly Return %',
+                        data: data.map(d => d.Return_Pct),
+                        backgroundColor: data.map(d => d.Return_Pct >= 0 ? 'rgba(67, 233, 123, 0.8)' : 'rgba(255, 99, 132, 0.8)'),
+                        borderColor: data.map(d => d.Return_Pct >= 0 ? '#43e97b' : '#ff6384'),
+                        borderWidth: 2
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: { display: false },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    return 'Return: ' + formatPercent(context.parsed.y);
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        y: {
+                            ticks: {
+                                callback: function(value) {
+                                    return value.toFixed(1) + '%';
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Composition Pie Chart
+        function createCompositionPieChart(data = dashboardData.composition) {
+            if (compositionPieChart) compositionPieChart.destroy();
+            compositionPieChart = new Chart(document.getElementById('compositionPieChart'), {
+                type: 'doughnut',
+                data: {
+                    labels: data.map(d => d.Asset_Class),
+                    datasets: [{
+                        data: data.map(d => d.Total_NAV),
+                        backgroundColor: colors.gradient,
+                        borderWidth: 3,
+                        borderColor: '#ffffff'
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: {
+                            position: 'right',
+                            labels: {
+                                padding: 15,
+                                font: { size: 12 }
+                            }
+                        },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    const label = context.label;
+                                    const value = context.parsed;
+                                    const total = context.dataset.data.reduce((a, b) => a + b, 0);
+                                    const percentage = ((value / total) * 100).toFixed(1);
+                                    return label + ': ' + formatCurrency(value) + ' (' + percentage + '%)';
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Composition Bar Chart
+        function createCompositionBarChart(data = dashboardData.composition) {
+            if (compositionBarChart) compositionBarChart.destroy();
+            compositionBarChart = new Chart(document.getElementById('compositionBarChart'), {
+                type: 'bar',
+                data: {
+                    labels: data.map(d => d.Asset_Class),
+                    datasets: [{
+                        label: 'Total NAV',
+                        data: data.map(d => d.Total_NAV),
+                        backgroundColor: colors.gradient,
+                        borderColor: colors.primary,
+                        borderWidth: 2
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    indexAxis: 'y',
+                    plugins: {
+                        legend: { display: false },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    return 'NAV: ' + formatCurrency(context.parsed.x);
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        x: {
+                            beginAtZero: true,
+                            ticks: {
+                                callback: function(value) {
+                                    return formatCurrency(value);
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Taxonomy Chart: NAV of every node at the selected level of the classification tree
+        const taxonomySelection = { level: null, date: null };
+        
+        async function createTaxonomyChart() {
+            let data;
+            try {
+                data = await loadDeferredSection('taxonomy_rollups') || [];
+            } catch (error) {
+                console.warn(error);
+                return;
+            }
+            if (data.length === 0) return;
+            const levels = dashboardData.metadata.taxonomy_levels || [...new Set(data.map(d => d.Level))];
+            taxonomySelection.level = levels[0];
+            taxonomySelection.date = taxonomySelection.date || data[data.length - 1].Date;
+            const container = document.getElementById('taxonomyLevelButtons');
+            const buttons = levels.map(level => {
+                const button = document.createElement('button');
+                button.className = 'drill-button' + (level === taxonomySelection.level ? ' active' : '');
+                button.textContent = level.replace(/_/g, ' ');
+                button.addEventListener('click', () => {
+                    taxonomySelection.level = level;
+                    buttons.forEach(other => other.classList.toggle('active', other === button));
+                    updateTaxonomyChart();
+                });
+                container.appendChild(button);
+                return button;
+            });
+            updateTaxonomyChart();
+        }
+        
+        function updateTaxonomyChart() {
+            const data = dashboardData.taxonomy_rollups
+                .filter(d => d.Date === taxonomySelection.date && d.Level === taxonomySelection.level)
+                .sort((a, b) => b.End_NAV - a.End_NAV);
+            
+            if (taxonomyChart) taxonomyChart.destroy();
+            taxonomyChart = new Chart(document.getElementById('taxonomyChart'), {
+                type: 'bar',
+                data: {
+                    labels: data.map(d => d.Node),
+                    datasets: [{
+                        label: 'End NAV',
+                        data: data.map(d => d.End_NAV),
+                        backgroundColor: data.map((d, idx) => colors.gradient[idx % colors.gradient.length]),
+                        borderColor: data.map((d, idx) => colors.primary[idx % colors.primary.length]),
+                        borderWidth: 2
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    indexAxis: 'y',
+                    plugins: {
+                        legend: { display: false },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    const row = data[context.dataIndex];
+                                    return 'NAV: ' + formatCurrency(row.End_NAV) + ' | Return: ' + formatPercent(row.Return_Pct);
+                                },
+                                afterLabel: function(context) {
+                                    const parent = data[context.dataIndex].Parent;
+                                    return parent ? 'Within: ' + parent : '';
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        x: {
+                            beginAtZero: true,
+                            ticks: {
+                                callback: function(value) {
+                                    return formatCurrency(value);
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Performance Chart
+        function createPerformanceChart(data = dashboardData.performance_by_asset_class) {
+            if (performanceChart) performanceChart.destroy();
+            performanceChart = new Chart(document.getElementById('performanceChart'), {
+                type: 'bar',
+                data: {
+                    labels: data.map(d => d.Asset_Class),
+                    datasets: [{
+                        label: 'Return %',
+                        data: data.map(d => d.Return_Pct),
+                        backgroundColor: colors.gradient,
+                        borderColor: colors.primary,
+                        borderWidth: 2
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: { display: false },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    return 'Return: ' + formatPercent(context.parsed.y);
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        y: {
+                            ticks: {
+                                callback: function(value) {
+                                    return value.toFixed(1) + '%';
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Income Yield Chart
+        function createIncomeYieldChart() {
+            const data = dashboardData.quarterly_performance;
+            
+            new Chart(document.getElementById('incomeYieldChart'), {
+                type: 'line',
+                data: {
+                    labels: data.map(d => d.Date),
+                    datasets: [
+                        {
+                            label: 'Quarterly Return %',
+                            data: data.map(d => d.Return_Pct),
+                            borderColor: '#667eea',
+                            backgroundColor: 'rgba(102, 126, 234, 0.1)',
+                            borderWidth: 3,
+                            yAxisID: 'y',
+                            tension: 0.4
+                        },
+                        {
+                            label: 'Income Yield %',
+                            data: data.map(d => d.Income_Yield),
+                            borderColor: '#43e97b',
+                            backgroundColor: 'rgba(67, 233, 123, 0.1)',
+                            borderWidth: 3,
+                            yAxisID: 'y',
+                            tension: 0.4
+                        }
+                    ]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: {
+                            position: 'top',
+                            labels: {
+                                padding: 15,
+                                font: { size: 14, weight: 'bold' }
+                            }
+                        },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    return context.dataset.label + ': ' + formatPercent(context.parsed.y);
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        y: {
+                            ticks: {
+                                callback: function(value) {
+                                    return value.toFixed(1) + '%';
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Trends Line Chart
+        function createTrendsLineChart() {
+            const data = dashboardData.asset_class_trends;
+            const assetClasses = [...new Set(data.map(d => d.Asset_Class))];
+            
+            const datasets = assetClasses.map((ac, idx) => {
+                const classData = data.filter(d => d.Asset_Class === ac);
+                return {
+                    label: ac,
+                    data: classData.map(d => ({ x: d.Date, y: d.End_NAV })),
+                    borderColor: colors.primary[idx % colors.primary.length],
+                    backgroundColor: colors.gradient[idx % colors.gradient.length],
+                    borderWidth: 3,
+                    tension: 0.4,
+                    fill: false
+                };
+            });
+            
+            new Chart(document.getElementById('trendsLineChart'), {
+                type: 'line',
+                data: { datasets: datasets },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: {
+                            position: 'top',
+                            labels: {
+                                padding: 10,
+                                font: { size: 12, weight: 'bold' }
+                            }
+                        },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    return context.dataset.label + ': ' + formatCurrency(context.parsed.y);
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        x: {
+                            type: 'category',
+                            title: { display: true, text: 'Quarter' }
+                        },
+                        y: {
+                            beginAtZero: true,
+                            ticks: {
+                                callback: function(value) {
+                                    return formatCurrency(value);
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Rolling Risk Chart: one line per asset class for the selected window and statistic
+        const RISK_METRICS = {
+            Volatility: { label: 'Volatility (annualized)', percent: true },
+            Downside_Deviation: { label: 'Downside Deviation (annualized)', percent: true },
+            Max_Drawdown: { label: 'Max Drawdown', percent: true },
+            Sharpe: { label: 'Sharpe Ratio', percent: false },
+            Sortino: { label: 'Sortino Ratio', percent: false }
+        };
+        const riskSelection = { window: null, metric: 'Volatility' };
+        let rollingRiskChart = null;
+        
+        function createRollingRiskChart() {
+            const data = dashboardData.rolling_risk || [];
+            if (data.length === 0) return;
+            const windows = [...new Set(data.map(d => d.Window))];
+            riskSelection.window = windows[0];
+            addRiskButtons('riskWindowButtons', 'window', windows.map(w => [w, w + '-Quarter Window']));
+            addRiskButtons('riskMetricButtons', 'metric',
+                Object.entries(RISK_METRICS).map(([key, metric]) => [key, metric.label]));
+            updateRollingRiskChart();
+        }
+        
+        function addRiskButtons(containerId, field, options) {
+            const container = document.getElementById(containerId);
+            const buttons = options.map(([value, label]) => {
+                const button = document.createElement('button');
+                button.className = 'drill-button' + (riskSelection[field] === value ? ' active' : '');
+                button.textContent = label;
+                button.addEventListener('click', () => {
+                    riskSelection[field] = value;
+                    buttons.forEach(other => other.classList.toggle('active', other === button));
+                    updateRollingRiskChart();
+                });
+                container.appendChild(button);
+                return button;
+            });
+        }
+        
+        function updateRollingRiskChart() {
+            const metric = RISK_METRICS[riskSelection.metric];
+            const data = dashboardData.rolling_risk.filter(d => d.Window === riskSelection.window);
+            const assetClasses = [...new Set(data.map(d => d.Asset_Class))];
+            const format = value => metric.percent ? formatPercent(value) : value.toFixed(2);
+            
+            const datasets = assetClasses.map((ac, idx) => ({
+                label: ac,
+                data: data.filter(d => d.Asset_Class === ac).map(d => ({ x: d.Date, y: d[riskSelection.metric] })),
+                borderColor: colors.primary[idx % colors.primary.length],
+                backgroundColor: colors.gradient[idx % colors.gradient.length],
+                borderWidth: 2,
+                borderDash: idx === assetClasses.length - 1 ? [6, 4] : [],
+                tension: 0.3,
+                fill: false
+            }));
+            
+            if (rollingRiskChart) rollingRiskChart.destroy();
+            rollingRiskChart = new Chart(document.getElementById('rollingRiskChart'), {
+                type: 'line',
+                data: { datasets: datasets },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: { position: 'top' },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    return context.dataset.label + ': ' + format(context.parsed.y);
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        x: {
+                            type: 'category',
+                            title: { display: true, text: 'Quarter (end of window)' }
+                        },
+                        y: {
+                            title: { display: true, text: metric.label },
+                            ticks: {
+                                callback: function(value) {
+                                    return format(value);
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Cash Flow Chart
+        function createCashFlowChart() {
+            const data = dashboardData.quarterly_performance;
+            
+            new Chart(document.getElementById('cashFlowChart'), {
+                type: 'bar',
+                data: {
+                    labels: data.map(d => d.Date),
+                    datasets: [
+                        {
+                            label: 'Contributions',
+                            data: data.map(d => d.Contributions),
+                            backgroundColor: 'rgba(67, 233, 123, 0.8)',
+                            borderColor: '#43e97b',
+                            borderWidth: 2
+                        },
+                        {
+                            label: 'Distributions',
+                            data: data.map(d => -d.Distributions),
+                            backgroundColor: 'rgba(255, 99, 132, 0.8)',
+                            borderColor: '#ff6384',
+                            borderWidth: 2
+                        }
+                    ]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: {
+                            position: 'top',
+                            labels: {
+                                padding: 15,
+                                font: { size: 14, weight: 'bold' }
+                            }
+                        },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    return context.dataset.label + ': ' + formatCurrency(Math.abs(context.parsed.y));
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        y: {
+                            ticks: {
+                                callback: function(value) {
+                                    return formatCurrency(Math.abs(value));
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Income Chart
+        function createIncomeChart() {
+            const data = dashboardData.quarterly_performance;
+            
+            new Chart(document.getElementById('incomeChart'), {
+                type: 'line',
+                data: {
+                    labels: data.map(d => d.Date),
+                    datasets: [{
+                        label: 'Net Investment Income',
+                        data: data.map(d => d.Net_Investment_Income),
+                        borderColor: '#667eea',
+                        backgroundColor: 'rgba(102, 126, 234, 0.2)',
+                        borderWidth: 3,
+                        fill: true,
+                        tension: 0.4
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: {
+                            position: 'top',
+                            labels: {
+                                padding: 15,
+                                font: { size: 14, weight: 'bold' }
+                            }
+                        },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    return 'Income: ' + formatCurrency(context.parsed.y);
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        y: {
+                            beginAtZero: true,
+                            ticks: {
+                                callback: function(value) {
+                                    return formatCurrency(value);
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Security drilldown: each asset class's securities are a separate shard,
+        // loaded (sidecar script or deferred JSON block) only when first opened.
+        // Deferred sections of the export (drilldownConfig.sections) are shards too.
+        const drilldownConfig = {{ drilldown_config }};
+        const drilldownShards = {};
+        const drilldownPending = {};
+        const DRILL_ROW_HEIGHT = 36;
+        let drilldownRows = [];
+        let drilldownHistory = new Map();
+        let selectedSecurity = null;
+        let securityHistoryChart = null;
+        
+        // Called by sidecar shard scripts once they load
+        function registerDrilldownShard(key, payload) {
+            if (drilldownPending[key]) drilldownPending[key](payload);
+        }
+        
+        function fetchDrilldownPayload(key) {
+            if (drilldownConfig.mode === 'inline') {
+                return Promise.resolve(JSON.parse(document.getElementById('drilldown-' + key).textContent));
+            }
+            return new Promise((resolve, reject) => {
+                drilldownPending[key] = resolve;
+                const script = document.createElement('script');
+                script.src = drilldownConfig.base + key + '.js';
+                script.onerror = () => reject(new Error('Could not load ' + script.src));
+                document.head.appendChild(script);
+            });
+        }
+        
+        function loadShard(key) {
+            if (!drilldownShards[key]) {
+                drilldownShards[key] = fetchDrilldownPayload(key)
+                    .then(decodeDashboardPayload);
+            }
+            return drilldownShards[key];
+        }
+        
+        function loadDrilldownShard(assetClass) {
+            return loadShard(drilldownConfig.shards[assetClass]);
+        }
+        
+        // Add a deferred section to dashboardData (no-op if it is already there)
+        async function loadDeferredSection(section) {
+            const key = (drilldownConfig.sections || {})[section];
+            if (dashboardData[section] === undefined && key) {
+                Object.assign(dashboardData, await loadShard(key));
+            }
+            return dashboardData[section];
+        }
+        
+        function initializeDrilldown() {
+            const assetClasses = Object.keys(drilldownConfig.shards);
+            if (assetClasses.length === 0) return;
+            document.getElementById('drilldownPanel').style.display = 'block';
+            
+            const buttons = document.getElementById('drilldownButtons');
+            assetClasses.forEach(assetClass => {
+                const button = document.createElement('button');
+                button.className = 'drill-button';
+                button.textContent = assetClass;
+                button.dataset.drillClass = assetClass;
+                button.addEventListener('click', () => openDrilldown(assetClass));
+                buttons.appendChild(button);
+            });
+            
+            attachDrilldownRows();
+            
+            const viewport = document.getElementById('drilldownViewport');
+            viewport.addEventListener('scroll', () => window.requestAnimationFrame(renderDrilldownRows));
+        }
+        
+        // Rows of the composition table open their asset class too
+        function attachDrilldownRows() {
+            document.querySelectorAll('tr[data-asset-class]').forEach(row => {
+                if (drilldownConfig.shards[row.dataset.assetClass]) {
+                    row.classList.add('drillable');
+                    row.addEventListener('click', () => openDrilldown(row.dataset.assetClass));
+                }
+            });
+        }
+        
+        async function openDrilldown(assetClass) {
+            document.querySelectorAll('.drill-button').forEach(button => {
+                button.classList.toggle('active', button.dataset.drillClass === assetClass);
+            });
+            document.getElementById('drilldownTitle').textContent = assetClass;
+            const status = document.getElementById('drilldownStatus');
+            status.textContent = 'Loading securities...';
+            
+            let shard;
+            try {
+                shard = await loadDrilldownShard(assetClass);
+            } catch (error) {
+                status.textContent = 'Could not load securities: ' + error.message;
+                return;
+            }
+            
+            // History rows arrive sorted by security, then date
+            const moneyWeighted = new Map(shard.money_weighted.map(row => [row.Security, row]));
+            drilldownHistory = new Map();
+            shard.history.forEach(row => {
+                if (!drilldownHistory.has(row.Security)) drilldownHistory.set(row.Security, []);
+                drilldownHistory.get(row.Security).push(row);
+            });
+            drilldownRows = Array.from(drilldownHistory, ([security, rows]) => {
+                const latest = rows[rows.length - 1];
+                const returns = moneyWeighted.get(security) || {};
+                return {
+                    security: security,
+                    asOf: latest.Date,
+                    endNav: latest.End_NAV,
+                    returnPct: latest.Return_Pct,
+                    contributions: rows.reduce((sum, row) => sum + row.Contributions, 0),
+                    distributions: rows.reduce((sum, row) => sum + row.Distributions, 0),
+                    irr: returns.IRR,
+                    tvpi: returns.TVPI
+                };
+            }).sort((a, b) => b.endNav - a.endNav);
+            
+            status.textContent = drilldownRows.length + ' securities, largest first. Click a security for its history.';
+            document.getElementById('drilldownSpacer').style.height = (drilldownRows.length * DRILL_ROW_HEIGHT) + 'px';
+            document.getElementById('drilldownViewport').scrollTop = 0;
+            selectedSecurity = drilldownRows.length ? drilldownRows[0].security : null;
+            renderDrilldownRows();
+            if (selectedSecurity) showSecurityHistory(selectedSecurity);
+        }
+        
+        // Virtualised table: only the rows in (or near) the viewport exist in the DOM
+        function renderDrilldownRows() {
+            const viewport = document.getElementById('drilldownViewport');
+            const first = Math.max(0, Math.floor(viewport.scrollTop / DRILL_ROW_HEIGHT) - 5);
+            const last = Math.min(drilldownRows.length,
+                Math.ceil((viewport.scrollTop + viewport.clientHeight) / DRILL_ROW_HEIGHT) + 5);
+            
+            const fragment = document.createDocumentFragment();
+            for (let i = first; i < last; i++) {
+                const item = drilldownRows[i];
+                const row = document.createElement('div');
+                row.className = 'virtual-row' + (item.security === selectedSecurity ? ' selected' : '');
+                row.style.top = (i * DRILL_ROW_HEIGHT) + 'px';
+                const cells = [
+                    item.security,
+                    item.asOf,
+                    formatCurrency(item.endNav),
+                    formatPercent(item.returnPct),
+                    formatCurrency(item.contributions),
+                    formatCurrency(item.distributions),
+                    item.irr == null ? '\u2014' : formatPercent(item.irr),
+                    item.tvpi == null ? '\u2014' : item.tvpi.toFixed(2) + 'x'
+                ];
+                cells.forEach((text, c) => {
+                    const cell = document.createElement('span');
+                    cell.textContent = text;
+                    if (c === 3) cell.className = item.returnPct >= 0 ? 'positive' : 'negative';
+                    if (c === 6 && item.irr != null) cell.className = item.irr >= 0 ? 'positive' : 'negative';
+                    row.appendChild(cell);
+                });
+                row.addEventListener('click', () => showSecurityHistory(item.security));
+                fragment.appendChild(row);
+            }
+            document.getElementById('drilldownSpacer').replaceChildren(fragment);
+        }
+        
+        function showSecurityHistory(security) {
+            selectedSecurity = security;
+            renderDrilldownRows();
+            const rows = drilldownHistory.get(security) || [];
+            document.getElementById('securityHistoryTitle').textContent = security;
+            
+            if (securityHistoryChart) securityHistoryChart.destroy();
+            const ctx = document.getElementById('securityHistoryChart').getContext('2d');
+            securityHistoryChart = new Chart(ctx, {
+                type: 'bar',
+                data: {
+                    labels: rows.map(row => row.Date),
+                    datasets: [
+                        {
+                            type: 'line',
+                            label: 'End NAV',
+                            data: rows.map(row => row.End_NAV),
+                            borderColor: colors.primary[0],
+                            backgroundColor: colors.gradient[0],
+                            tension: 0.3,
+                            yAxisID: 'y'
+                        },
+                        {
+                            type: 'line',
+                            label: 'Return %',
+                            data: rows.map(row => row.Return_Pct),
+                            borderColor: colors.primary[2],
+                            backgroundColor: colors.gradient[2],
+                            borderDash: [5, 5],
+                            tension: 0.3,
+                            yAxisID: 'y1'
+                        },
+                        {
+                            label: 'Contributions',
+                            data: rows.map(row => row.Contributions),
+                            backgroundColor: colors.gradient[3],
+                            yAxisID: 'y'
+                        },
+                        {
+                            label: 'Distributions',
+                            data: rows.map(row => -row.Distributions),
+                            backgroundColor: colors.gradient[4],
+                            yAxisID: 'y'
+                        }
+                    ]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: { position: 'top' },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    if (context.dataset.yAxisID === 'y1') {
+                                        return context.dataset.label + ': ' + formatPercent(context.parsed.y);
+                                    }
+                                    return context.dataset.label + ': ' + formatCurrency(Math.abs(context.parsed.y));
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        y: {
+                            ticks: {
+                                callback: function(value) {
+                                    return formatCurrency(value);
+                                }
+                            }
+                        },
+                        y1: {
+                            position: 'right',
+                            grid: { drawOnChartArea: false },
+                            ticks: {
+                                callback: function(value) {
+                                    return value.toFixed(1) + '%';
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Quarter slider: every quarter's snapshot is precomputed, so moving it only re-renders
+        let snapshotDates = [];
+        let snapshotRows = new Map();
+        
+        function initializeSnapshots() {
+            const metrics = dashboardData.snapshot_metrics || [];
+            if (metrics.length < 2) return;
+            snapshotDates = metrics.map(d => d.Date);
+            snapshotRows = new Map(snapshotDates.map(date => [date, []]));
+            dashboardData.snapshots.forEach(row => snapshotRows.get(row.Date).push(row));
+            
+            const slider = document.getElementById('snapshotSlider');
+            slider.max = snapshotDates.length - 1;
+            slider.value = snapshotDates.length - 1;
+            slider.addEventListener('input', () => applySnapshot(Number(slider.value)));
+            document.getElementById('snapshotLabel').textContent = snapshotDates[snapshotDates.length - 1];
+            document.getElementById('snapshotBar').style.display = 'flex';
+        }
+        
+        function applySnapshot(index) {
+            const date = snapshotDates[index];
+            const latest = index === snapshotDates.length - 1;
+            const rows = snapshotRows.get(date);
+            const composition = rows.map(d => ({
+                Asset_Class: d.Asset_Class,
+                Total_NAV: d.End_NAV,
+                Percentage: d.Percentage,
+                Num_Securities: d.Num_Securities
+            })).sort((a, b) => b.Total_NAV - a.Total_NAV);
+            const performance = rows.slice().sort((a, b) => b.Return_Pct - a.Return_Pct);
+            
+            document.getElementById('snapshotLabel').textContent = date;
+            document.querySelectorAll('[data-snapshot-label]').forEach(label => {
+                label.textContent = latest ? label.dataset.snapshotLabel : date;
+            });
+            document.getElementById('metricCards').innerHTML = renderMetricCards(dashboardData.snapshot_metrics[index], latest);
+            document.getElementById('compositionTable').innerHTML = renderCompositionTable(composition);
+            document.getElementById('performanceTable').innerHTML = renderPerformanceTable(performance);
+            createCompositionPieChart(composition);
+            createCompositionBarChart(composition);
+            createPerformanceChart(performance);
+            // The taxonomy chart may still be waiting for its deferred data
+            taxonomySelection.date = date;
+            if (taxonomyChart) updateTaxonomyChart();
+            attachDrilldownRows();
+        }
+        
+        function escapeHtml(text) {
+            return String(text).replace(/[&<>"']/g, c => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' })[c]);
+        }
+        
+        // The renderers below mirror the server-side tables in dashboard_generator.py
+        function renderMetricCards(metrics, latest) {
+            const period = latest ? 'Most Recent Quarter' : 'Quarter Ended: ' + metrics.Date;
+            const card = (title, value, subtext) => '<div class="metric-card"><h3>' + title + '</h3>' +
+                '<div class="value">' + value + '</div><div class="subtext">' + subtext + '</div></div>';
+            return [
+                card('Total End NAV', '$' + (metrics.total_nav / 1e9).toFixed(2) + 'B', 'Quarter Ended: ' + metrics.Date),
+                card('Weighted Return', metrics.weighted_return_pct.toFixed(2) + '%', period),
+                card('Total Securities', metrics.num_securities, 'Across ' + metrics.num_asset_classes + ' Asset Classes'),
+                card('Net Investment Income', '$' + (metrics.total_income / 1e6).toFixed(1) + 'M', period)
+            ].join('');
+        }
+        
+        function renderTable(headers, rows) {
+            return '<table class="data-table"><thead><tr>' + headers.map(h => '<th>' + h + '</th>').join('') +
+                '</tr></thead><tbody>' + rows.join('') + '</tbody></table>';
+        }
+        
+        function renderCompositionTable(composition) {
+            return renderTable(['Asset Class', 'Total NAV', '% of Portfolio', 'Number of Securities'],
+                composition.map(item => '<tr data-asset-class="' + escapeHtml(item.Asset_Class) + '">' +
+                    '<td><strong>' + escapeHtml(item.Asset_Class) + '</strong></td>' +
+                    '<td>$' + (item.Total_NAV / 1e9).toFixed(3) + 'B</td>' +
+                    '<td>' + item.Percentage.toFixed(1) + '%</td>' +
+                    '<td>' + item.Num_Securities + '</td></tr>'));
+        }
+        
+        function renderPerformanceTable(performance) {
+            return renderTable(['Asset Class', 'Ending NAV', 'Return %', 'Investment Income', 'Contributions', 'Distributions'],
+                performance.map(item => '<tr>' +
+                    '<td><strong>' + escapeHtml(item.Asset_Class) + '</strong></td>' +
+                    '<td>$' + (item.End_NAV / 1e9).toFixed(3) + 'B</td>' +
+                    '<td class="' + (item.Return_Pct >= 0 ? 'positive' : 'negative') + '">' + item.Return_Pct.toFixed(2) + '%</td>' +
+                    '<td>$' + (item.Net_Investment_Income / 1e6).toFixed(2) + 'M</td>' +
+                    '<td>$' + (item.Contributions / 1e6).toFixed(2) + 'M</td>' +
+                    '<td>$' + (item.Distributions / 1e6).toFixed(2) + 'M</td></tr>'));
+        }
+        
+        // Decode the embedded data (served from the JSON API in server mode), then initialize charts
+        window.addEventListener('load', async function() {
+            const payload = dashboardPayload !== null ? dashboardPayload : await (await fetch('api/payload')).json();
+            dashboardData = await decodeDashboardPayload(payload);
+            initializeCharts();
+            initializeDrilldown();
+            initializeSnapshots();
+        });
+    </script>
+</body>
+</html>
+"""
@@ -0,0 +1,197 @@
+"""
+Dashboard Watcher
+
+This module regenerates dashboards whenever their workbooks change.
+
+The watched workbook (or every workbook in a watched folder) is polled for changes to its
+size and modification time. A burst of saves is debounced: nothing is rebuilt until the
+file has been stable for a short quiet period. A save that leaves the contents identical
+is skipped after hashing. Otherwise the aggregate cube and the security history are
+merged from the previous build, re-aggregating only the quarters whose fingerprint
+changed; the cube-derived sections are then re-exported from the merged cube, and only
+the drilldown shards of asset classes with rows in those quarters are serialized again.
+IRR and NAV validation still run over the whole workbook, since every quarter feeds them.
+The page is written atomically, so a browser reload never sees a half-written file.
+"""
+
+import os
+import time
+
+from dashboard_generator import DashboardGenerator, _collect_batch_inputs, engine_options
+from data_cache import file_content_hash
+from data_processor import PortfolioDataProcessor
+from run_metrics import RunMetrics
+
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE = 2.0
+
+
+class _WatchedWorkbook:
+    """Build state kept between rebuilds of one workbook's dashboard."""
+
+    def __init__(self, file_path, output_path):
+        self.file_path = file_path
+        self.output_path = output_path
+        self.content_hash = None
+        self.cube = None
+        self.security_counts = None
+        self.fingerprints = None
+        self.history = None
+        self.drilldown = None
+
+
+class DashboardWatcher:
+    """Poll a workbook (or a folder of workbooks) and rebuild dashboards on change."""
+
+    def __init__(self, source, output_path=None, output_dir="dashboards",
+                 interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE,
+                 processor_options=None, generator_options=None):
+        """
+        Initialize the watcher.
+
+        A workbook source is written to output_path; a folder source writes
+        one <workbook>_dashboard.html per workbook into output_dir.
+        processor_options / generator_options are passed to
+        PortfolioDataProcessor / DashboardGenerator.save_dashboard.
+        """
+        self.source = source
+        self.output_path = output_path or "alternatives_dashboard.html"
+        self.output_dir = output_dir
+        self.interval = interval
+        self.debounce = debounce
+        self.processor_options = dict(processor_options or {})
+        self.generator_options = dict(generator_options or {})
+        self.workbooks = {}
+        self._signatures = {}
+
+    def _targets(self):
+        """Return {input_path: output_path} for everything currently watched."""
+        if not os.path.isdir(self.source):
+            return {self.source: self.output_path}
+        return {path: os.path.join(self.output_dir, name) for path, name in _collect_batch_inputs(self.source)}
+
+    @staticmethod
+    def _signature(path):
+        """Cheap change marker for a file: (mtime_ns, size), or None if it is missing."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self):
+        """Return the watched files whose signature changed since the last poll."""
+        signatures = {path: self._signature(path) for path in self._targets()}
+        changed = [path for path, sig in signatures.items()
+                   if sig is not None and sig != self._signatures.get(path)]
+        self._signatures = signatures
+        return changed
+
+    def wait_until_stable(self, paths):
+        """Block until none of paths has changed for self.debounce seconds."""
+        quiet_since = time.monotonic()
+        last = {path: self._signature(path) for path in paths}
+        while time.monotonic() - quiet_since < self.debounce:
+            time.sleep(min(self.interval, self.debounce))
+            current = {path: self._signature(path) for path in paths}
+            if current != last:
+                last = current
+                quiet_since = time.monotonic()
+        self._signatures.update(last)
+
+    def rebuild(self, file_path):
+        """
+        Bring one dashboard up to date with its workbook.
+
+        Returns 'built', 'updated', 'unchanged' or 'failed'.
+        """
+        output_path = self._targets().get(file_path, self.output_path)
+        state = self.workbooks.get(file_path)
+        if state is None or state.output_path != output_path:
+            state = self.workbooks[file_path] = _WatchedWorkbook(file_path, output_path)
+
+        metrics = RunMetrics(name=os.path.basename(file_path), echo=False)
+        started = time.perf_counter()
+        try:
+            content_hash = file_content_hash(file_path)
+            if content_hash == state.content_hash:
+                return 'unchanged'
+
+            processor = PortfolioDataProcessor(file_path, metrics=metrics, **self.processor_options)
+            processor.load_data()
+            if not processor.has_positions:
+                # Chunked reads keep cube sums only, which cannot be compared quarter by quarter
+                processor.classify_investments()
+                fingerprints = None
+                outcome = 'built' if state.content_hash is None else 'updated'
+                detail = f"{processor.cube['Date'].nunique()} quarters, chunked"
+            elif state.cube is None:
+                processor.classify_investments()
+                fingerprints = processor.quarter_fingerprints()
+                outcome, detail = 'built', f"{len(fingerprints)} quarters"
+            else:
+                fingerprints, changed, removed = processor.update_quarters(
+                    state.cube, state.security_counts, state.fingerprints, state.history)
+                if not len(changed) and not len(removed):
+                    state.content_hash = content_hash
+                    return 'unchanged'
+                outcome = 'updated'
+                detail = f"{len(changed)} quarter(s) re-aggregated, {len(removed)} dropped"
+
+            data = processor.export_to_json()
+            drilldown = processor.export_security_drilldown(state.drilldown)
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            generator = DashboardGenerator(data, metrics=metrics, drilldown=drilldown)
+            generator.save_dashboard(output_path, **self.generator_options)
+        except Exception as e:
+            print(f"[{time.strftime('%H:%M:%S')}] {os.path.basename(file_path)}: FAILED ({type(e).__name__}: {e})")
+            return 'failed'
+
+        state.content_hash = content_hash
+        state.cube, state.security_counts, state.fingerprints = processor.cube, processor.security_counts, fingerprints
+        state.history = processor.get_security_history() if fingerprints is not None else None
+        state.drilldown = drilldown
+        elapsed = time.perf_counter() - started
+        print(f"[{time.strftime('%H:%M:%S')}] {os.path.basename(file_path)}: {outcome} "
+              f"({detail}) -> {output_path} in {elapsed:.2f}s")
+        return outcome
+
+    def run_once(self):
+        """Rebuild every watched dashboard that is out of date; returns {path: outcome}."""
+        first_poll = not self._signatures
+        changed = self.poll()
+        if changed and not first_poll:
+            self.wait_until_stable(changed)
+        return {path: self.rebuild(path) for path in changed}
+
+    def run(self, max_cycles=None):
+        """Watch until interrupted (or for max_cycles polls)."""
+        cycles = 0
+        try:
+            while max_cycles is None or cycles < max_cycles:
+                self.run_once()
+                cycles += 1
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+
+
+def watch(source, output_path=None, output_dir="dashboards", interval=DEFAULT_POLL_INTERVAL,
+          debounce=DEFAULT_DEBOUNCE, gzip_copy=False, taxonomy=None, engine=None,
+          memory_limit=None, sheet_name=None, date_range=None, compact=False, copy_free=False):
+    """Regenerate the dashboard(s) for source whenever it changes, until Ctrl+C."""
+    print("=" * 60)
+    print("Fortitude Re - Alternatives Portfolio Dashboard Watch Mode")
+    print("=" * 60)
+    print(f"\nWatching: {source} (polling every {interval:g}s, {debounce:g}s debounce)")
+    print("Press Ctrl+C to stop.\n")
+
+    watcher = DashboardWatcher(source, output_path, output_dir, interval, debounce,
+                               processor_options={'taxonomy': taxonomy, 'sheet_name': sheet_name,
+                                                  'date_range': date_range, 'compact': compact,
+                                                  'copy_free': copy_free,
+                                                  **engine_options(engine, memory_limit)},
+                               generator_options={'gzip_copy': gzip_copy})
+    watcher.run()
+    return watcher
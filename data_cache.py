@@ -0,0 +1,160 @@
+"""
+Data Cache
+
+This module keeps a persistent, columnar copy of parsed portfolio workbooks on disk.
+
+Parsing the FRL_Portfolio sheet through openpyxl is by far the slowest step of the
+pipeline, so the typed frame (with Date already parsed) is saved as one NumPy array
+per column in an uncompressed .npz file. Entries are keyed by the workbook's content
+hash, the sheet name and the cache schema version, so an edited workbook simply misses
+the cache and gets rebuilt.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+# Bump whenever the layout of the cached frame changes so old entries are ignored
+CACHE_SCHEMA_VERSION = 2
+
+DEFAULT_CACHE_DIR_NAME = '.dashboard_cache'
+
+_COLUMNS_KEY = '__columns__'
+_NULL_PREFIX = '__null__'
+_NUMBER_PREFIX = '__number__'
+
+
+def file_content_hash(file_path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def frame_to_arrays(df, prefix=''):
+    """
+    Flatten df into a dict of plain NumPy arrays (no pickled objects).
+
+    Text columns become unicode arrays with an optional null mask; mixed
+    text/number columns also keep a float array of their numeric cells.
+    """
+    arrays = {prefix + _COLUMNS_KEY: np.array([str(c) for c in df.columns])}
+    for col in df.columns:
+        series = df[col]
+        key = prefix + str(col)
+        if series.dtype.kind in 'biufcmM':
+            arrays[key] = series.to_numpy()
+        else:
+            nulls = series.isna().to_numpy()
+            values = series.to_numpy(dtype=object)
+            is_number = np.array([isinstance(v, (int, float, np.number)) and not n
+                                  for v, n in zip(values, nulls)], dtype=bool)
+            arrays[key] = np.where(nulls | is_number, '', values).astype(str)
+            if nulls.any():
+                arrays[prefix + _NULL_PREFIX + str(col)] = nulls
+            if is_number.any():
+                arrays[prefix + _NUMBER_PREFIX + str(col)] = np.where(is_number, values, np.nan).astype(float)
+    return arrays
+
+
+def arrays_to_frame(archive, prefix=''):
+    """Rebuild a frame written by frame_to_arrays from an opened .npz archive."""
+    columns = [str(c) for c in archive[prefix + _COLUMNS_KEY]]
+    files = set(archive.files)
+    data = {}
+    for col in columns:
+        values = archive[prefix + col]
+        if values.dtype.kind == 'U':
+            values = values.astype(object)
+            null_key = prefix + _NULL_PREFIX + col
+            if null_key in files:
+                values[archive[null_key]] = None
+            number_key = prefix + _NUMBER_PREFIX + col
+            if number_key in files:
+                # Mixed text/number column (e.g. stray notes beside the data)
+                numbers = archive[number_key]
+                is_number = ~np.isnan(numbers)
+                values[is_number] = numbers[is_number]
+        data[col] = values
+    return pd.DataFrame(data, columns=columns)
+
+
+def save_arrays(path, arrays):
+    """Write arrays to an uncompressed .npz at path atomically."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class WorkbookCache:
+    """On-disk columnar cache of parsed portfolio frames."""
+
+    def __init__(self, cache_dir):
+        """Initialize the cache rooted at cache_dir (created on first write)."""
+        self.cache_dir = cache_dir
+
+    @classmethod
+    def for_file(cls, file_path):
+        """Return a cache stored next to the given workbook."""
+        base_dir = os.path.dirname(os.path.abspath(file_path))
+        return cls(os.path.join(base_dir, DEFAULT_CACHE_DIR_NAME))
+
+    def _entry_prefix(self, file_path, sheet_name, variant):
+        """File name prefix shared by every cache entry of one workbook/sheet."""
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        safe_sheet = ''.join(c if c.isalnum() else '_' for c in sheet_name)
+        prefix = f"{stem}-{safe_sheet}"
+        if variant:
+            prefix += f"-{variant}"
+        return prefix + '-'
+
+    def entry_path(self, file_path, sheet_name, variant=None, content_hash=None):
+        """Return the cache file path for the current contents of file_path."""
+        if content_hash is None:
+            content_hash = file_content_hash(file_path)
+        key = hashlib.sha256(
+            f"{content_hash}|{sheet_name}|{variant or ''}|v{CACHE_SCHEMA_VERSION}".encode('utf-8')
+        ).hexdigest()[:24]
+        name = self._entry_prefix(file_path, sheet_name, variant) + key + '.npz'
+        return os.path.join(self.cache_dir, name)
+
+    def load(self, entry_path):
+        """Load a cached frame, or return None if the entry is missing or unreadable."""
+        if not os.path.isfile(entry_path):
+            return None
+        try:
+            with np.load(entry_path, allow_pickle=False) as archive:
+                return arrays_to_frame(archive)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, entry_path, df):
+        """Write df to entry_path atomically and drop stale entries for the same workbook."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        save_arrays(entry_path, frame_to_arrays(df))
+        self._prune_stale(entry_path)
+
+    def _prune_stale(self, entry_path):
+        """Remove older entries of the same workbook/sheet that no longer match its contents."""
+        name = os.path.basename(entry_path)
+        prefix = name[:name.rfind('-') + 1]
+        for other in os.listdir(self.cache_dir):
+            if other != name and other.startswith(prefix) and other.endswith('.npz'):
+                # Only remove entries whose suffix is a bare key (not another variant)
+                if '-' not in other[len(prefix):]:
+                    try:
+                        os.remove(os.path.join(self.cache_dir, other))
+                    except OSError:
+                        pass
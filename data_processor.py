@@ -10,68 +10,522 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
+import os
 
 import openpyxl
 
+from data_cache import WorkbookCache, arrays_to_frame, file_content_hash, frame_to_arrays, save_arrays
+from date_index import DatePartitionIndex
+from irr_solver import solve_irr, year_fractions
+from nav_validation import ABS_TOLERANCE, MAX_EXCEPTIONS, POSITION_KEYS, REL_TOLERANCE, validate_nav
+from out_of_core import DEFAULT_MEMORY_LIMIT, ChunkedAggregator, chunk_rows_for
+from rolling_risk import RISK_STATISTICS, rolling_risk
+from taxonomy import UNCLASSIFIED, AssetTaxonomy
+from run_metrics import RunMetrics, instrumented
+from tabular_readers import CSV, EXCEL, FORMATS, PARQUET, CsvReader, ParquetReader, detect_format
+from xlsx_reader import StreamingXlsxReader
+
 
 class PortfolioDataProcessor:
     """Process and analyze portfolio data for the Alternatives dashboard."""
     
-    # Define which asset classes are considered "Alternatives"
-    ALTERNATIVES_CLASSES = {
-        'Private Equity',
-        'Real Assets', 
-        'Hedge Funds',
-        'Credit Funds',
-        'Real Estate'
-    }
+    SHEET_NAME = 'FRL_Portfolio'
+    
+    # Columns the pipeline reads; the streaming engine materialises only these
+    DATE_COLUMNS = ['Date']
+    TEXT_COLUMNS = ['Asset_Class', 'Security']
+    NUMERIC_COLUMNS = ['Beg_NAV', 'End_NAV', 'Contributions', 'Distributions', 'Net_Investment_Income']
+    REQUIRED_COLUMNS = DATE_COLUMNS + TEXT_COLUMNS + NUMERIC_COLUMNS
+    
+    # Read when present: the position's entity and the FX component of its NAV roll-forward
+    OPTIONAL_TEXT_COLUMNS = ['Entity']
+    OPTIONAL_NUMERIC_COLUMNS = ['FX_Gain_Loss']
+    
+    # Grouping keys and summed measures of the pre-aggregated cube
+    CUBE_KEYS = ['Date', 'Asset_Class', 'Is_Alternative']
+    CUBE_MEASURES = ['Beg_NAV', 'End_NAV', 'Contributions', 'Distributions', 'Net_Investment_Income']
+    
+    # Dimension columns stored as categoricals (integer codes + shared dictionary) in compact mode
+    DIMENSION_COLUMNS = ['Asset_Class', 'Security', 'Entity']
     
-    NON_ALTERNATIVES_CLASSES = {
-        'Equities',
-        'Derivatives',
-        'Cash',
-        'Sovereigns/Treasuries',
-        'CMBS',
-        'Agencies',
-        'Corporate Bonds',
-        'Preferreds',
-        'ABS',
-        'Munis',
-        'CLOs',
-        'RMBS'
+    # Sections needing row-level positions, which the chunked engine does not keep
+    POSITION_SECTIONS = {
+        'money_weighted_returns': 'IRR and multiples need each security\'s quarterly cash flows',
+        'nav_validation': 'NAV roll-forward and continuity checks need each position\'s quarterly rows',
+        'security_drilldown': 'The security drilldown needs each security\'s quarterly history'
     }
     
-    def __init__(self, file_path):
-        """Initialize the processor with the Excel file path."""
+    # Bump whenever the layout of the persisted refresh state changes
+    STATE_SCHEMA_VERSION = 4
+    
+    # 'openpyxl' reads the whole sheet through pandas; 'stream' projects REQUIRED_COLUMNS (plus the optional ones);
+    # 'chunked' streams the same columns in bounded chunks and keeps only the cube sums plus the
+    # securities of each (Date, Asset_Class), so position-level sections are not available.
+    # CSV and Parquet input always use their own projecting readers ('chunked' applies to them too)
+    ENGINES = ('openpyxl', 'stream', 'chunked')
+    
+    # Decimal places kept for floats in export_to_json (None keeps full precision)
+    FLOAT_PRECISION = 6
+    
+    # Trailing time-weighted return horizons, in quarters
+    TWR_HORIZONS = {'1Y': 4, '3Y': 12, '5Y': 20}
+    
+    # Rolling risk windows, in quarters
+    RISK_WINDOWS = (4, 8, 12)
+    
+    # Asset_Class label of the Alternatives total in return tables
+    TOTAL_LABEL = 'Total Alternatives'
+    
+    def __init__(self, file_path, sheet_name=None, cache_dir=None, use_cache=True, engine='openpyxl',
+                 compact=False, copy_free=False, track_memory=False, metrics=None,
+                 float_precision=FLOAT_PRECISION, taxonomy=None, memory_limit=DEFAULT_MEMORY_LIMIT,
+                 input_format=None, date_range=None):
+        """
+        Initialize the processor with the portfolio file path (Excel, CSV or Parquet).
+        
+        Parsed workbooks are cached in cache_dir (default: a .dashboard_cache
+        folder next to the workbook); pass use_cache=False to always re-parse.
+        engine selects the Excel reader (see ENGINES). compact=True stores the
+        dimension columns as categoricals so grouping works on integer codes.
+        copy_free=True orders df by segment as it is loaded so that
+        alts_df/non_alts_df are slices of df instead of copies, and track_memory=True records tracemalloc peaks for every stage.
+        Stage timings and progress messages go to metrics (a RunMetrics,
+        created if not given), which may be shared with DashboardGenerator.
+        float_precision sets the decimal places of exported floats.
+        taxonomy is an AssetTaxonomy or the path of a mapping file (default:
+        taxonomy.json); its Alternatives segments decide Is_Alternative.
+        memory_limit (bytes) caps the chunked engine's reading and aggregation.
+        input_format is one of tabular_readers.FORMATS (default: detected from
+        the file). date_range ((start, end), either may be None) keeps only the
+        rows dated inside it; Parquet row groups outside it are never read.
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'; expected one of {self.ENGINES}")
+        if input_format is not None and input_format not in FORMATS:
+            raise ValueError(f"Unknown input format '{input_format}'; expected one of {FORMATS}")
         self.file_path = file_path
+        self.sheet_name = sheet_name or self.SHEET_NAME
+        self.use_cache = use_cache
+        self.engine = engine
+        self.compact = compact
+        self.copy_free = copy_free
+        self.track_memory = track_memory
+        self.float_precision = float_precision
+        self.memory_limit = memory_limit
+        self.input_format = input_format or detect_format(file_path)
+        self.date_range = date_range
+        self.taxonomy = taxonomy if isinstance(taxonomy, AssetTaxonomy) else AssetTaxonomy.load(taxonomy)
+        self.unclassified = {}
+        self.metrics = metrics or RunMetrics(track_memory=track_memory)
+        self.memory_report = None
+        self.cache = WorkbookCache(cache_dir) if cache_dir else WorkbookCache.for_file(file_path)
         self.df = None
         self.alts_df = None
         self.non_alts_df = None
+        self.cube = None
+        self.security_counts = None
+        self.security_pairs = None
+        self.security_history = None
+        self.history_changes = None
+        self.money_weighted = None
+        self.position_navs = None
+        self.prior_positions = None
+        self.history_start = None
+        self.partial_sections = {}
+        self.date_index = None
+        self.cube_date_index = None
         
+    @instrumented()
     def load_data(self):
-        """Load portfolio data from Excel file."""
-        print("Loading portfolio data...")
-        self.df = pd.read_excel(self.file_path, sheet_name='FRL_Portfolio', engine='openpyxl')
-        self.df['Date'] = pd.to_datetime(self.df['Date'])
-        print(f"Loaded {len(self.df)} records from {self.df['Date'].min()} to {self.df['Date'].max()}")
+        """Load portfolio data from the input file (or from the on-disk cache when unchanged)."""
+        self.metrics.log("Loading portfolio data...")
+        self.metrics.annotate(input_format=self.input_format)
+        
+        entry_path = None
+        if self.engine == 'chunked':
+            # Too large to load whole, so there is no parsed frame to cache either
+            self.df = self._read_chunked()
+        elif self.use_cache and self.input_format != PARQUET:
+            # Each engine / format gets its own entry since projected frames hold fewer columns;
+            # Parquet is already columnar and reads as fast as the cache would
+            if self.input_format != EXCEL:
+                variant = self.input_format
+            else:
+                variant = None if self.engine == 'openpyxl' else self.engine
+            entry_path = self.cache.entry_path(self.file_path, self.sheet_name, variant=variant,
+                                               content_hash=file_content_hash(self.file_path))
+            self.df = self.cache.load(entry_path)
+            if self.df is not None:
+                self.metrics.annotate(cache_hit=True)
+                self.metrics.log(f"Loaded {len(self.df)} records from cache ({entry_path})")
+        
+        if self.df is None:
+            self.df = self._read_workbook()
+            self._validate_schema(self.df)
+            self.df['Date'] = pd.to_datetime(self.df['Date'])
+            if entry_path is not None:
+                try:
+                    self.cache.store(entry_path, self.df)
+                except OSError as e:
+                    # A read-only location should never stop the dashboard from being built
+                    self.metrics.log(f"Warning: could not write workbook cache: {e}")
+        
+        if self.date_range is not None:
+            self.df = self._select_dates(self.df)
+        
+        if self.compact:
+            self.compact_frame()
+        
+        if self.copy_free and self.has_positions:
+            order = self._segment_order(self.df)
+            if order is not None:
+                self.df = self._reorder_rows(self.df, order)
+        
+        records = self._record_count(self.df)
+        self.metrics.set_rows(records)
+        self.metrics.log(f"Loaded {records} records from {self.df['Date'].min()} to {self.df['Date'].max()}")
         return self
     
+    def compact_frame(self):
+        """
+        Convert dimension columns to categoricals and record the memory saved.
+        
+        Each column keeps one dictionary of distinct strings plus compact integer
+        codes; frames sliced from df (alts_df, non_alts_df) share that dictionary.
+        """
+        before = self.df.memory_usage(deep=True)
+        for col in self.DIMENSION_COLUMNS:
+            if col in self.df.columns and not isinstance(self.df[col].dtype, pd.CategoricalDtype):
+                self.df[col] = self.df[col].astype('category')
+        after = self.df.memory_usage(deep=True)
+        
+        self.memory_report = {
+            'before_bytes': int(before.sum()),
+            'after_bytes': int(after.sum()),
+            'columns': {
+                str(col): {'before_bytes': int(before[col]), 'after_bytes': int(after[col])}
+                for col in self.df.columns if col in before.index
+            }
+        }
+        self.metrics.log(f"Compact mode: frame memory {self.memory_report['before_bytes']/1e6:.1f} MB -> "
+              f"{self.memory_report['after_bytes']/1e6:.1f} MB")
+        return self.memory_report
+    
+    def _read_workbook(self):
+        """Parse the input file with the reader for its format (and, for Excel, the configured engine)."""
+        if self.input_format != EXCEL or self.engine == 'stream':
+            return self._projecting_reader().read()
+        return pd.read_excel(self.file_path, sheet_name=self.sheet_name, engine='openpyxl')
+    
+    def _projecting_reader(self):
+        """A reader for the input format projecting the required (and any optional) columns."""
+        columns = {
+            'date_columns': self.DATE_COLUMNS,
+            'text_columns': self.TEXT_COLUMNS + self.OPTIONAL_TEXT_COLUMNS,
+            'numeric_columns': self.NUMERIC_COLUMNS + self.OPTIONAL_NUMERIC_COLUMNS,
+            'optional_columns': self.OPTIONAL_TEXT_COLUMNS + self.OPTIONAL_NUMERIC_COLUMNS
+        }
+        if self.input_format == CSV:
+            return CsvReader(self.file_path, **columns)
+        if self.input_format == PARQUET:
+            return ParquetReader(self.file_path, date_range=self.date_range, **columns)
+        return StreamingXlsxReader(self.file_path, self.sheet_name, **columns)
+    
+    def _in_date_range(self, dates):
+        """Boolean mask of the dates inside date_range."""
+        start, end = self.date_range
+        keep = np.ones(len(dates), dtype=bool)
+        if start is not None:
+            keep &= (dates >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            keep &= (dates <= pd.Timestamp(end)).to_numpy()
+        return keep
+    
+    def _select_dates(self, df):
+        """Rows of df dated inside date_range (ValueError if none are)."""
+        keep = self._in_date_range(df['Date'])
+        if not keep.any():
+            start, end = self.date_range
+            raise ValueError(f"No portfolio rows are dated between {start or 'the start'} and {end or 'the end'}")
+        return df if keep.all() else df[keep].reset_index(drop=True)
+    
+    @property
+    def has_positions(self):
+        """True if df holds row-level positions (False for the chunked engine's cube sums)."""
+        return self.engine != 'chunked'
+    
+    def _require_positions(self, section):
+        """Raise ValueError if section needs row-level positions that were not kept."""
+        if not self.has_positions:
+            raise ValueError(f"{self.POSITION_SECTIONS[section]}; not available with the chunked engine")
+    
+    @staticmethod
+    def _record_count(df):
+        """Raw records behind df's rows (chunked frames count them in a Records column)."""
+        return int(df['Records'].sum()) if 'Records' in df.columns else len(df)
+    
+    def _read_chunked(self):
+        """
+        Stream the input file in bounded chunks straight into cube sums.
+        
+        Rows are summed per Date and Asset_Class as they arrive (see
+        out_of_core), and the resulting frame stands in for df: one row per
+        asset class and quarter, with a Records column counting the raw rows
+        behind it. The distinct securities of each (Date, Asset_Class) are
+        kept exactly in security_pairs, so security counts match the in-memory
+        engines. Memory depends on the number of quarters, classes and
+        securities, not on the number of rows; sections that need positions
+        (see POSITION_SECTIONS) are not available.
+        """
+        chunk_rows = chunk_rows_for(self.memory_limit)
+        aggregator = None
+        for chunk in self._projecting_reader().iter_chunks(chunk_rows):
+            if aggregator is None:
+                self._validate_schema(chunk)
+                aggregator = ChunkedAggregator(self.DATE_COLUMNS + ['Asset_Class'], self.CUBE_MEASURES,
+                                               dimensions=self.DIMENSION_COLUMNS, distinct='Security',
+                                               memory_limit=self.memory_limit)
+            if self.date_range is not None:
+                chunk = chunk[self._in_date_range(chunk['Date'])]
+            aggregator.add(chunk)
+        if aggregator is None:
+            raise ValueError(f"{os.path.basename(self.file_path)} has no data rows")
+        
+        df = aggregator.result()
+        self.security_pairs = aggregator.distinct_result()
+        self.metrics.annotate(chunks=aggregator.chunks, chunk_rows=chunk_rows, raw_records=aggregator.rows,
+                              aggregate_bytes=aggregator.peak_state_bytes)
+        self.metrics.log(f"Chunked read: {aggregator.rows} records in {aggregator.chunks} chunk(s) of up to "
+                         f"{chunk_rows} rows -> {len(df)} asset class quarters, {len(self.security_pairs)} "
+                         f"securities by quarter ({aggregator.peak_state_bytes / 1e6:.1f} MB aggregate, limit "
+                         f"{self.memory_limit / 1e6:.0f} MB)")
+        return df
+    
+    def _validate_schema(self, df):
+        """Raise ValueError if any column the pipeline needs is missing or holds non-numeric measures."""
+        missing = [col for col in self.REQUIRED_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Portfolio data is missing required columns: {missing}")
+        numeric = self.NUMERIC_COLUMNS + self.OPTIONAL_NUMERIC_COLUMNS
+        untyped = [col for col in numeric if col in df.columns and not pd.api.types.is_numeric_dtype(df[col])]
+        if untyped:
+            raise ValueError(f"Portfolio data has non-numeric values in columns: {untyped}")
+    
+    @instrumented()
     def classify_investments(self):
         """Separate Alternatives from Non-Alternatives investments."""
-        print("\nClassifying investments...")
+        self.metrics.log("\nClassifying investments...")
+        self.metrics.set_rows(len(self.df))
+        
+        self._forget_positions()
+        self._flag_alternatives()
+        
+        if self.copy_free:
+            self._split_in_place()
+        else:
+            # Split into two dataframes
+            self.alts_df = self.df[self.df['Is_Alternative']].copy()
+            self.non_alts_df = self.df[~self.df['Is_Alternative']].copy()
         
-        # Create Alternatives boolean flag
-        self.df['Is_Alternative'] = self.df['Asset_Class'].isin(self.ALTERNATIVES_CLASSES)
+        total = self._record_count(self.df)
+        for label, frame in (('Alternatives', self.alts_df), ('Non-Alternatives', self.non_alts_df)):
+            records = self._record_count(frame)
+            self.metrics.log(f"{label} records: {records} ({records/total*100:.1f}%)")
         
-        # Split into two dataframes
-        self.alts_df = self.df[self.df['Is_Alternative']].copy()
-        self.non_alts_df = self.df[~self.df['Is_Alternative']].copy()
+        self.build_cube()
+        self.build_date_index()
         
-        print(f"Alternatives records: {len(self.alts_df)} ({len(self.alts_df)/len(self.df)*100:.1f}%)")
-        print(f"Non-Alternatives records: {len(self.non_alts_df)} ({len(self.non_alts_df)/len(self.df)*100:.1f}%)")
+        if self.track_memory:
+            held_bytes = self._held_bytes(self.df, self.alts_df, self.non_alts_df)
+            self.metrics.annotate(held_bytes=held_bytes)
         
         return self
     
+    @property
+    def memory_stats(self):
+        """tracemalloc peaks (and held column bytes) per recorded stage."""
+        stats = {}
+        for record in self.metrics.stages:
+            if record.get('peak_bytes') is not None:
+                stats[record['stage']] = {k: record[k] for k in ('peak_bytes', 'held_bytes') if k in record}
+        return stats
+    
+    def _flag_alternatives(self):
+        """
+        Add the Is_Alternative boolean column to df from the taxonomy.
+        
+        Asset classes missing from the taxonomy are not Alternatives; their
+        record counts are kept in self.unclassified and reported.
+        """
+        asset_class = self.df['Asset_Class']
+        codes = self.taxonomy.codes(asset_class)
+        self.df['Is_Alternative'] = np.where(codes >= 0, self.taxonomy.is_alternative[codes], False)
+        if self.security_pairs is not None:
+            pair_codes = self.taxonomy.codes(self.security_pairs['Asset_Class'])
+            self.security_pairs['Is_Alternative'] = np.where(pair_codes >= 0, self.taxonomy.is_alternative[pair_codes],
+                                                             False)
+        
+        missing = codes < 0
+        self.unclassified = {}
+        if missing.any():
+            names = asset_class[missing].astype(object).fillna('(blank)')
+            if 'Records' in self.df.columns:
+                counts = (self.df.loc[missing, 'Records'].groupby(names.to_numpy()).sum()
+                          .sort_values(ascending=False, kind='stable'))
+            else:
+                counts = names.value_counts()
+            self.unclassified = {str(name): int(count) for name, count in counts.items()}
+            records = sum(self.unclassified.values())
+            listed = ', '.join(f"{name} ({count})" for name, count in self.unclassified.items())
+            self.metrics.log(f"Warning: {records} records have asset classes missing from the "
+                             f"taxonomy and are reported as {UNCLASSIFIED}: {listed}")
+            self.metrics.annotate(unclassified_records=records)
+    
+    def _split_in_place(self):
+        """
+        Slice df into alts_df and non_alts_df instead of copying the rows.
+        
+        load_data has already put Alternatives first and both segments in
+        Date order, so the two frames are row slices sharing df's column data
+        and every quarter inside them is a contiguous range for the date
+        index. A df assigned some other way is reordered here first.
+        """
+        order = self._segment_order(self.df)
+        if order is not None:
+            self.df = self._reorder_rows(self.df, order)
+        n_alts = int(self.df['Is_Alternative'].sum())
+        self.alts_df = self.df.iloc[:n_alts]
+        self.non_alts_df = self.df.iloc[n_alts:]
+    
+    def _segment_order(self, df):
+        """Row order putting Alternatives first, each segment by Date (None if df is already in it)."""
+        if 'Is_Alternative' in df.columns:
+            is_alt = df['Is_Alternative'].to_numpy(dtype=bool)
+        else:
+            codes = self.taxonomy.codes(df['Asset_Class'])
+            is_alt = np.where(codes >= 0, self.taxonomy.is_alternative[codes], False).astype(bool)
+        order = np.lexsort((df['Date'].to_numpy(), ~is_alt))
+        return None if np.array_equal(order, np.arange(len(order))) else order
+    
+    @staticmethod
+    def _reorder_rows(df, order):
+        """
+        Return df's rows in the given order, rebuilt one column at a time.
+        
+        Each source column is dropped from df as soon as its reordered copy
+        exists, so memory holds df plus roughly one column (one block, for
+        columns pandas stores together) rather than two whole frames as with
+        df.take(order). df is left empty.
+        """
+        index = df.index.take(order)
+        columns = {}
+        for col in list(df.columns):
+            columns[col] = df.pop(col).array.take(order)
+        return pd.DataFrame(columns, index=index, copy=False)
+    
+    @staticmethod
+    def _held_bytes(*frames):
+        """Bytes of column storage held by the frames, counting shared buffers once."""
+        roots = {}
+        for frame in frames:
+            for col in frame.columns:
+                values = frame[col].array
+                if isinstance(values, pd.Categorical):
+                    arrays = [values.codes, np.asarray(values.categories)]
+                else:
+                    arrays = [getattr(values, '_ndarray', None)]
+                    if arrays[0] is None:
+                        arrays = [np.asarray(values)]
+                for arr in arrays:
+                    root = arr
+                    while isinstance(root.base, np.ndarray):
+                        root = root.base
+                    roots[id(root)] = root.nbytes
+        return int(sum(roots.values()))
+    
+    @instrumented()
+    def build_cube(self):
+        """
+        Pre-aggregate the portfolio into a (Date x Asset_Class x Is_Alternative) cube.
+        
+        Every dashboard section is derived from this cube, so the raw rows are
+        grouped exactly once no matter how many sections are exported.
+        """
+        self.metrics.set_rows(len(self.df))
+        self.cube, self.security_counts = self._aggregate(self.df, self.security_pairs)
+        self._index_cube()
+        return self.cube
+    
+    def _aggregate(self, df, securities=None):
+        """
+        Return the cube and per-segment distinct security counts for df's rows.
+        
+        Securities are counted from df unless securities (the chunked
+        engine's security_pairs) is given.
+        """
+        grouped = df.groupby(self.CUBE_KEYS, sort=True, observed=True)
+        cube = grouped[self.CUBE_MEASURES].sum()
+        if securities is None:
+            securities = df
+            cube['Num_Securities'] = grouped['Security'].nunique()
+        else:
+            cube['Num_Securities'] = (securities.groupby(self.CUBE_KEYS, sort=True, observed=True)['Security']
+                                      .nunique().reindex(cube.index, fill_value=0))
+        # Chunked frames are pre-summed; their Records column counts the raw rows
+        cube['Records'] = grouped['Records'].sum() if 'Records' in df.columns else grouped.size()
+        cube = cube.reset_index()
+        
+        # Return components are linear in the summed measures
+        cube = self.calculate_returns(cube)
+        
+        # Distinct securities across all classes of a segment (a security
+        # could in principle be reported under more than one asset class)
+        security_counts = (
+            securities.drop_duplicates(['Date', 'Is_Alternative', 'Security'])
+            .groupby(['Date', 'Is_Alternative'], observed=True).size()
+        )
+        return cube, security_counts
+    
+    def _index_cube(self):
+        """Cache the Alternatives slice of the cube and its date index."""
+        alts_cube = self._segment_cube(True)
+        self.cube_date_index = DatePartitionIndex(alts_cube['Date'])
+        self._alts_cube = alts_cube
+    
+    @instrumented()
+    def build_date_index(self):
+        """
+        Index the row positions of every quarter in df, alts_df and non_alts_df.
+        
+        Snapshot lookups then touch only the rows of the requested quarter
+        instead of scanning the full history with a boolean mask.
+        """
+        self.date_index = {
+            'all': DatePartitionIndex(self.df['Date']),
+            'alternatives': DatePartitionIndex(self.alts_df['Date']),
+            'non_alternatives': DatePartitionIndex(self.non_alts_df['Date'])
+        }
+        return self.date_index
+    
+    def get_snapshot(self, as_of_date=None, segment='alternatives'):
+        """Return the raw rows of one quarter (default: the most recent) for a segment."""
+        frames = {'all': self.df, 'alternatives': self.alts_df, 'non_alternatives': self.non_alts_df}
+        index = self.date_index[segment]
+        if as_of_date is None:
+            as_of_date = index.latest
+        return index.rows(frames[segment], as_of_date)
+    
+    def _segment_cube(self, alternatives=True):
+        """Return the cube rows for Alternatives (or Non-Alternatives)."""
+        return self.cube[self.cube['Is_Alternative'] == alternatives]
+    
+    def _snapshot_cube(self, as_of_date=None):
+        """Return the Alternatives cube rows for one date (default: the most recent)."""
+        if as_of_date is None:
+            as_of_date = self.cube_date_index.latest
+        as_of_date = pd.Timestamp(as_of_date)
+        return self.cube_date_index.rows(self._alts_cube, as_of_date), as_of_date
+    
     def calculate_returns(self, df):
         """Calculate returns and performance metrics."""
         # Calculate actual return (considering all components)
@@ -90,45 +544,28 @@ class PortfolioDataProcessor:
         
         return df
     
+    @instrumented()
     def get_composition_by_asset_class(self, as_of_date=None):
         """Get portfolio composition by asset class."""
-        df = self.alts_df.copy()
-        
-        if as_of_date:
-            df = df[df['Date'] == as_of_date]
-        else:
-            # Use most recent date
-            as_of_date = df['Date'].max()
-            df = df[df['Date'] == as_of_date]
-        
-        composition = df.groupby('Asset_Class').agg({
-            'End_NAV': 'sum',
-            'Security': 'nunique'
-        }).reset_index()
+        snapshot, _ = self._snapshot_cube(as_of_date or None)
         
+        composition = snapshot[['Asset_Class', 'End_NAV', 'Num_Securities']].reset_index(drop=True)
         composition.columns = ['Asset_Class', 'Total_NAV', 'Num_Securities']
         composition['Percentage'] = (composition['Total_NAV'] / composition['Total_NAV'].sum()) * 100
         composition = composition.sort_values('Total_NAV', ascending=False)
         
         return composition
     
+    @instrumented()
     def get_time_series_data(self):
         """Get time series data for NAV trends."""
+        columns = ['End_NAV', 'Net_Investment_Income', 'Contributions', 'Distributions']
+        
         # Alternatives over time
-        alts_ts = self.alts_df.groupby('Date').agg({
-            'End_NAV': 'sum',
-            'Net_Investment_Income': 'sum',
-            'Contributions': 'sum',
-            'Distributions': 'sum'
-        }).reset_index()
+        alts_ts = self._segment_cube(True).groupby('Date')[columns].sum().reset_index()
         
         # Non-Alternatives over time
-        non_alts_ts = self.non_alts_df.groupby('Date').agg({
-            'End_NAV': 'sum',
-            'Net_Investment_Income': 'sum',
-            'Contributions': 'sum',
-            'Distributions': 'sum'
-        }).reset_index()
+        non_alts_ts = self._segment_cube(False).groupby('Date')[columns].sum().reset_index()
         
         # Add labels
         alts_ts['Category'] = 'Alternatives'
@@ -136,19 +573,18 @@ class PortfolioDataProcessor:
         
         return alts_ts, non_alts_ts
     
+    @instrumented()
     def get_asset_class_trends(self):
         """Get NAV trends by asset class."""
-        trends = self.alts_df.groupby(['Date', 'Asset_Class']).agg({
-            'End_NAV': 'sum'
-        }).reset_index()
+        trends = self._segment_cube()[['Date', 'Asset_Class', 'End_NAV']].reset_index(drop=True)
         
         return trends
     
-    def calculate_performance_metrics(self):
+    @instrumented()
+    def calculate_performance_metrics(self, as_of_date=None):
         """Calculate key performance metrics for the Alternatives portfolio."""
-        # Calculate for the most recent completed quarter
-        recent_date = self.alts_df['Date'].max()
-        recent_data = self.alts_df[self.alts_df['Date'] == recent_date]
+        # Calculate for the most recent completed quarter (or as_of_date)
+        recent_data, recent_date = self._snapshot_cube(as_of_date)
         
         # Overall metrics
         total_nav = recent_data['End_NAV'].sum()
@@ -156,9 +592,6 @@ class PortfolioDataProcessor:
         total_contributions = recent_data['Contributions'].sum()
         total_distributions = recent_data['Distributions'].sum()
         
-        # Calculate returns
-        recent_data = self.calculate_returns(recent_data)
-        
         # Weighted average return (weighted by beginning NAV)
         total_beg_nav = recent_data['Beg_NAV'].sum()
         if total_beg_nav > 0:
@@ -167,7 +600,7 @@ class PortfolioDataProcessor:
             weighted_return = 0
         
         # Number of investments
-        num_securities = recent_data['Security'].nunique()
+        num_securities = int(self.security_counts.get((recent_date, True), 0))
         num_asset_classes = recent_data['Asset_Class'].nunique()
         
         metrics = {
@@ -183,41 +616,81 @@ class PortfolioDataProcessor:
         
         return metrics
     
-    def get_performance_by_asset_class(self):
+    @instrumented()
+    def get_performance_by_asset_class(self, as_of_date=None):
         """Calculate performance metrics by asset class."""
-        # Use most recent quarter
-        recent_date = self.alts_df['Date'].max()
-        recent_data = self.alts_df[self.alts_df['Date'] == recent_date].copy()
+        # Use most recent quarter (or as_of_date)
+        recent_data, _ = self._snapshot_cube(as_of_date)
         
-        recent_data = self.calculate_returns(recent_data)
-        
-        perf = recent_data.groupby('Asset_Class').agg({
-            'End_NAV': 'sum',
-            'Net_Investment_Income': 'sum',
-            'Total_Return': 'sum',
-            'Beg_NAV': 'sum',
-            'Contributions': 'sum',
-            'Distributions': 'sum'
-        }).reset_index()
-        
-        # Calculate return percentage
-        perf['Return_Pct'] = np.where(
-            perf['Beg_NAV'] > 0,
-            (perf['Total_Return'] / perf['Beg_NAV']) * 100,
-            0
-        )
+        perf = recent_data[['Asset_Class', 'End_NAV', 'Net_Investment_Income', 'Total_Return',
+                            'Beg_NAV', 'Contributions', 'Distributions', 'Return_Pct']].reset_index(drop=True)
         
         perf = perf.sort_values('Return_Pct', ascending=False)
         
         return perf
     
+    @instrumented()
+    def get_quarterly_snapshots(self):
+        """
+        Precompute the snapshot views of every quarter at once.
+        
+        The cube is already one row per (Date, Asset_Class), so the
+        composition, performance and metric-card values of all quarters come
+        from a single grouped pass instead of one get_* call per date. Returns
+        (snapshots, snapshot_metrics): per-class rows with composition
+        percentages and returns, and one row of key metrics per quarter (the
+        same fields as calculate_performance_metrics()).
+        """
+        alts = self._alts_cube
+        self.metrics.set_rows(len(alts))
+        
+        snapshots = alts[['Date', 'Asset_Class', 'End_NAV', 'Num_Securities', 'Net_Investment_Income',
+                          'Total_Return', 'Beg_NAV', 'Contributions', 'Distributions',
+                          'Return_Pct']].reset_index(drop=True)
+        quarter_nav = snapshots.groupby('Date')['End_NAV'].transform('sum')
+        snapshots.insert(4, 'Percentage', snapshots['End_NAV'] / quarter_nav * 100)
+        
+        totals = alts.groupby('Date').agg(
+            total_nav=('End_NAV', 'sum'),
+            total_income=('Net_Investment_Income', 'sum'),
+            total_contributions=('Contributions', 'sum'),
+            total_distributions=('Distributions', 'sum'),
+            total_return=('Total_Return', 'sum'),
+            total_beg_nav=('Beg_NAV', 'sum'),
+            num_asset_classes=('Asset_Class', 'nunique')
+        )
+        securities = self.security_counts.xs(True, level='Is_Alternative').reindex(totals.index, fill_value=0)
+        snapshot_metrics = pd.DataFrame({
+            'Date': totals.index,
+            'total_nav': totals['total_nav'].to_numpy(),
+            'total_income': totals['total_income'].to_numpy(),
+            'total_contributions': totals['total_contributions'].to_numpy(),
+            'total_distributions': totals['total_distributions'].to_numpy(),
+            'weighted_return_pct': np.where(totals['total_beg_nav'] > 0,
+                                            totals['total_return'] / totals['total_beg_nav'] * 100, 0),
+            'num_securities': securities.to_numpy().astype(int),
+            'num_asset_classes': totals['num_asset_classes'].to_numpy()
+        })
+        return snapshots, snapshot_metrics
+    
+    @instrumented()
+    def get_taxonomy_rollups(self):
+        """
+        Aggregate every quarter of the whole portfolio to every taxonomy level.
+        
+        The cube already holds one row per (Date, Asset_Class), so each level
+        is a grouped sum over the cube rather than another pass over the raw
+        rows. Returns one row per Date, Level and Node with its Parent, the
+        summed measures and the return components.
+        """
+        self.metrics.set_rows(len(self.cube))
+        rollups = self.taxonomy.rollup(self.cube, ['Date'], self.CUBE_MEASURES)
+        return self.calculate_returns(rollups)
+    
+    @instrumented()
     def get_quarterly_performance(self):
         """Get quarterly performance metrics."""
-        # Calculate returns for each quarter
-        df = self.alts_df.copy()
-        df = self.calculate_returns(df)
-        
-        quarterly = df.groupby('Date').agg({
+        quarterly = self._segment_cube().groupby('Date').agg({
             'End_NAV': 'sum',
             'Beg_NAV': 'sum',
             'Total_Return': 'sum',
@@ -242,9 +715,579 @@ class PortfolioDataProcessor:
         
         return quarterly
     
+    def _class_return_matrix(self):
+        """
+        Return (calendar, labels, returns): quarterly Alternatives returns as a (quarter x class) matrix.
+        
+        Columns are the asset classes followed by the Alternatives total; rows
+        follow a gap-free quarterly calendar. Returns are fractions (0 when
+        Beg_NAV is not positive, as in calculate_returns) and NaN in quarters
+        without rows.
+        """
+        grouped = self._alts_cube.groupby(['Date', 'Asset_Class'], observed=True)[['Total_Return', 'Beg_NAV']].sum()
+        by_class = grouped.unstack('Asset_Class')
+        total = grouped.groupby(level='Date').sum()
+        labels = [str(c) for c in by_class['Beg_NAV'].columns] + [self.TOTAL_LABEL]
+        beg_nav = np.column_stack([by_class['Beg_NAV'].to_numpy(), total['Beg_NAV'].to_numpy()])
+        total_return = np.column_stack([by_class['Total_Return'].to_numpy(), total['Total_Return'].to_numpy()])
+        
+        quarters = by_class.index.to_period('Q')
+        calendar = pd.period_range(quarters.min(), quarters.max(), freq='Q')
+        returns = np.full((len(calendar), len(labels)), np.nan)
+        returns[calendar.get_indexer(quarters)] = np.where(
+            np.isnan(beg_nav), np.nan, np.where(beg_nav > 0, total_return / np.where(beg_nav > 0, beg_nav, 1), 0))
+        return calendar, labels, returns
+    
+    @instrumented()
+    def get_time_weighted_returns(self):
+        """
+        Chain-link quarterly returns into YTD, 1Y, 3Y, 5Y and inception-to-date TWRs.
+        
+        The quarterly returns of every asset class and of the Alternatives
+        total form one (quarter x class) matrix on a gap-free quarterly
+        calendar. A single cumulative product down the reversed matrix gives
+        the compounded return of every trailing window at once. A horizon is
+        reported only when the class has history covering the whole window;
+        3Y, 5Y and inception-to-date (if at least a year) are also annualized.
+        """
+        self.metrics.set_rows(len(self._alts_cube))
+        calendar, classes, returns = self._class_return_matrix()
+        
+        # Quarters with no rows for a class count as a 0% return
+        present = ~np.isnan(returns)
+        quarterly = np.nan_to_num(returns)
+        
+        # Row k-1 holds the compounded return of the latest k quarters
+        trailing = np.cumprod(1 + quarterly[::-1], axis=0) - 1
+        quarters_held = len(calendar) - present.argmax(axis=0)
+        columns = np.arange(len(classes))
+        
+        def window(length):
+            length = np.broadcast_to(length, quarters_held.shape)
+            values = trailing[np.minimum(length, len(calendar)) - 1, columns]
+            return np.where(length <= quarters_held, values, np.nan)
+        
+        twr = pd.DataFrame({
+            'Asset_Class': classes,
+            'Inception': calendar[len(calendar) - quarters_held].end_time.normalize(),
+            'Quarters': quarters_held
+        })
+        horizons = {'YTD': calendar[-1].quarter, **self.TWR_HORIZONS, 'ITD': quarters_held}
+        for name, length in horizons.items():
+            twr[f'Return_{name}'] = window(length) * 100
+        for name in ('3Y', '5Y', 'ITD'):
+            length = np.broadcast_to(horizons[name], quarters_held.shape)
+            annualized = (1 + twr[f'Return_{name}'].to_numpy() / 100) ** (4 / length) - 1
+            twr[f'Annualized_{name}'] = np.where(length >= 4, annualized * 100, np.nan)
+        
+        return twr
+    
+    @instrumented()
+    def get_rolling_risk(self, windows=RISK_WINDOWS, level='asset_class', risk_free_rate=0.0, history=None):
+        """
+        Rolling volatility, downside deviation, max drawdown, Sharpe and Sortino ratios.
+        
+        level='asset_class' covers every Alternatives asset class and the
+        total; level='security' covers every security of get_security_history()
+        (history, computed if not given). All series of a level form one
+        (quarter x series) return matrix and every window is computed with
+        vectorized kernels (see rolling_risk). Returns one row per series,
+        window (in quarters) and quarter with a complete window; Return,
+        Volatility, Downside_Deviation and Max_Drawdown are in percent.
+        """
+        if level == 'asset_class':
+            calendar, labels, returns = self._class_return_matrix()
+            keys = pd.DataFrame({'Asset_Class': labels})
+        elif level == 'security':
+            if history is None:
+                history = self.get_security_history()
+            first = ~history[['Asset_Class', 'Security']].duplicated().to_numpy()
+            ids = np.cumsum(first) - 1
+            keys = history.loc[first, ['Asset_Class', 'Security']].astype(object).reset_index(drop=True)
+            quarters = history['Date'].dt.to_period('Q')
+            calendar = pd.period_range(quarters.min(), quarters.max(), freq='Q')
+            returns = np.full((len(calendar), len(keys)), np.nan)
+            returns[calendar.get_indexer(quarters), ids] = history['Return_Pct'].to_numpy(dtype=float) / 100
+        else:
+            raise ValueError(f"Unknown level '{level}'; expected 'asset_class' or 'security'")
+        self.metrics.set_rows(returns.size)
+        
+        dates = calendar.end_time.normalize()
+        frames = []
+        for window in windows:
+            statistics = rolling_risk(returns, window, risk_free_rate=risk_free_rate)
+            rows, columns = np.nonzero(~np.isnan(statistics['Return']))
+            frame = keys.iloc[columns].reset_index(drop=True)
+            frame.insert(0, 'Date', dates[rows])
+            frame['Window'] = window
+            for name in RISK_STATISTICS:
+                values = statistics[name][rows, columns]
+                frame[name] = values * 100 if name in ('Return', 'Volatility', 'Downside_Deviation',
+                                                       'Max_Drawdown') else values
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+    
+    def get_money_weighted_returns(self, history=None):
+        """
+        Solve IRR and TVPI / DPI / RVPI for every security, asset class and the total.
+        
+        The history opens mid-life, so each security pays in its first
+        quarter's Beg_NAV at the start of that quarter, then Contributions (in)
+        and Distributions (out) at each quarter end, and is valued at its last
+        End_NAV. Asset classes and the total pool the cash flows of their
+        securities. All series share one padded cash-flow matrix and are solved
+        as a single batch (see irr_solver). history is the
+        get_security_history() frame, computed if not given. The result is
+        kept, so asking again for the same history does not solve it again.
+        """
+        if history is None:
+            self._require_positions('money_weighted_returns')
+            history = self.get_security_history()
+        if self.money_weighted is None or self.money_weighted[0] is not history:
+            self.money_weighted = (history, self._solve_money_weighted(history))
+        return self.money_weighted[1]
+    
+    @instrumented('get_money_weighted_returns')
+    def _solve_money_weighted(self, history):
+        """Solve get_money_weighted_returns() for one security history frame."""
+        self.metrics.set_rows(len(history))
+        
+        # History rows are sorted by asset class, security and date
+        keys = history[['Asset_Class', 'Security']]
+        first = ~keys.duplicated().to_numpy()
+        last = ~keys.duplicated(keep='last').to_numpy()
+        ids = np.cumsum(first) - 1
+        securities = keys[first].reset_index(drop=True)
+        asset_classes, class_ids = np.unique(securities['Asset_Class'].astype(str).to_numpy(), return_inverse=True)
+        
+        # Column 0 is the end of the quarter before the first one, i.e. the start of the history
+        quarters = history['Date'].dt.to_period('Q')
+        calendar = pd.period_range(quarters.min() - 1, quarters.max(), freq='Q')
+        positions = calendar.get_indexer(quarters)
+        beg_nav, end_nav, contributions, distributions = (
+            history[col].to_numpy(dtype=float) for col in ['Beg_NAV', 'End_NAV', 'Contributions', 'Distributions'])
+        
+        amounts = np.zeros((len(securities), len(calendar)))
+        np.add.at(amounts, (ids, positions), distributions - contributions)
+        amounts[ids[first], positions[first] - 1] -= beg_nav[first]
+        amounts[ids[last], positions[last]] += end_nav[last]
+        totals = np.column_stack([beg_nav[first] + np.bincount(ids, contributions),
+                                  np.bincount(ids, distributions), end_nav[last]])
+        
+        # Pool securities into one row per asset class plus the total, and solve everything at once
+        pooled = np.zeros((len(asset_classes), len(calendar)))
+        np.add.at(pooled, class_ids, amounts)
+        pooled_totals = np.zeros((len(asset_classes), 3))
+        np.add.at(pooled_totals, class_ids, totals)
+        amounts = np.vstack([amounts, pooled, pooled.sum(axis=0, keepdims=True)])
+        totals = np.vstack([totals, pooled_totals, pooled_totals.sum(axis=0, keepdims=True)])
+        result = solve_irr(amounts, year_fractions(calendar.end_time.normalize()))
+        
+        returns = pd.concat([
+            securities.astype(object).assign(Level='security'),
+            pd.DataFrame({'Asset_Class': asset_classes, 'Security': None, 'Level': 'asset_class'}),
+            pd.DataFrame({'Asset_Class': [self.TOTAL_LABEL], 'Security': None, 'Level': 'total'})
+        ], ignore_index=True)[['Level', 'Asset_Class', 'Security']]
+        paid_in, distributed, nav = totals.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns['Paid_In'] = paid_in
+            returns['Distributed'] = distributed
+            returns['NAV'] = nav
+            returns['IRR'] = result['irr'] * 100
+            returns['TVPI'] = np.where(paid_in > 0, (distributed + nav) / paid_in, np.nan)
+            returns['DPI'] = np.where(paid_in > 0, distributed / paid_in, np.nan)
+            returns['RVPI'] = np.where(paid_in > 0, nav / paid_in, np.nan)
+        returns['Converged'] = result['converged']
+        returns['Iterations'] = result['iterations']
+        returns['Method'] = result['method']
+        returns['Residual'] = result['residual']
+        
+        unsolved = int((~returns['Converged']).sum())
+        self.metrics.annotate(irr_series=len(returns), irr_unsolved=unsolved,
+                              irr_max_iterations=int(returns['Iterations'].max()))
+        if unsolved:
+            self.metrics.log(f"IRR: {unsolved} of {len(returns)} cash-flow series have no solution")
+        return returns
+    
+    @instrumented()
+    def validate_nav(self, abs_tol=ABS_TOLERANCE, rel_tol=REL_TOLERANCE, max_exceptions=MAX_EXCEPTIONS):
+        """
+        Check the NAV roll-forward and quarter-to-quarter continuity of every position.
+        
+        Runs over the full history of df (see nav_validation.validate_nav) and
+        returns (exceptions, summary): the largest exceptions of each check
+        and one row of counts per check. After refresh() only df's quarters
+        are checked, continuing from the End_NAVs saved for the others.
+        """
+        self._require_positions('nav_validation')
+        self.metrics.set_rows(len(self.df))
+        exceptions, summary = validate_nav(self.df, abs_tol=abs_tol, rel_tol=rel_tol,
+                                           max_exceptions=max_exceptions, prior=self.prior_positions,
+                                           start_date=self.history_start)
+        total = int(summary['Exceptions'].sum())
+        self.metrics.annotate(nav_exceptions=total)
+        if total:
+            counts = ', '.join(f"{row.Check} {row.Exceptions}" for row in summary.itertuples() if row.Exceptions)
+            self.metrics.log(f"NAV validation: {total} exceptions in {len(self.df)} records ({counts})")
+        return exceptions, summary
+    
+    def get_security_history(self):
+        """
+        Get the quarterly history of every Alternatives security (for the drilldown).
+        
+        Rows are summed over entities per asset class, security and quarter,
+        with returns computed as for the asset-class cube. The frame is kept
+        once computed, so export_to_json() and export_security_drilldown()
+        share it. After refresh() this is the merged history kept in the
+        saved state, which also holds the quarters missing from the input.
+        """
+        if self.security_history is None:
+            self._require_positions('security_drilldown')
+            self.security_history = self._sum_security_history()
+        return self.security_history
+    
+    @instrumented('get_security_history')
+    def _sum_security_history(self):
+        """Compute get_security_history() from the Alternatives rows of df."""
+        if self.alts_df is not None:
+            alts = self.alts_df
+        else:
+            # refresh()/update_quarters() runs flag rows without splitting them
+            if 'Is_Alternative' not in self.df.columns:
+                self._flag_alternatives()
+            alts = self.df[self.df['Is_Alternative'].to_numpy()]
+        self.metrics.set_rows(len(alts))
+        return self._finish_history(self._sum_history(alts))
+    
+    def _forget_positions(self):
+        """Drop the security history and returns kept from an earlier pass over df."""
+        self.security_history = None
+        self.history_changes = None
+        self.money_weighted = None
+    
+    def _sum_history(self, alts):
+        """Sum Alternatives rows over entities per asset class, security and quarter."""
+        return (alts.groupby(['Asset_Class', 'Security', 'Date'], sort=True, observed=True)[self.CUBE_MEASURES]
+                .sum().reset_index())
+    
+    def _finish_history(self, history):
+        """Add returns to summed security history and put its columns in drilldown order."""
+        history = self.calculate_returns(history)
+        return history[['Asset_Class', 'Security', 'Date', 'Beg_NAV', 'End_NAV', 'Contributions',
+                        'Distributions', 'Net_Investment_Income', 'Return_Pct']]
+    
+    def export_security_drilldown(self, previous=None):
+        """
+        Export the security history as JSON-ready column tables, one shard per asset class.
+        
+        Each shard holds the quarterly 'history' of the class's securities and
+        their 'money_weighted' returns (IRR and multiples). The dashboard loads
+        each shard only when its asset class is opened. Empty when the
+        chunked engine kept no positions. previous is an earlier export of the
+        same workbook: after update_quarters() merged the history, shards of
+        asset classes without rows in the changed quarters are reused from it
+        instead of being serialized again.
+        """
+        if not self.has_positions:
+            return {}
+        history = self.get_security_history()
+        returns = self.get_money_weighted_returns(history)
+        returns = returns.loc[returns['Level'] == 'security',
+                              ['Asset_Class', 'Security', 'IRR', 'TVPI', 'DPI', 'RVPI']]
+        returns_by_class = dict(tuple(returns.groupby('Asset_Class', sort=False)))
+        reusable = previous if previous is not None and self.history_changes is not None else {}
+        drilldown = {}
+        for asset_class, group in history.groupby('Asset_Class', sort=True, observed=True):
+            asset_class = str(asset_class)
+            if asset_class in reusable and asset_class not in self.history_changes:
+                drilldown[asset_class] = reusable[asset_class]
+                continue
+            drilldown[asset_class] = {
+                'history': self._serialize_frame(group.drop(columns='Asset_Class')),
+                'money_weighted': self._serialize_frame(returns_by_class[asset_class].drop(columns='Asset_Class'))
+            }
+        return drilldown
+    
+    def quarter_fingerprints(self, df=None):
+        """
+        Content hash of every quarter's rows, as a uint64 Series indexed by Date.
+        
+        Rows are hashed over REQUIRED_COLUMNS plus the optional columns present
+        (Entity, FX_Gain_Loss), which NAV validation reads. Row hashes are
+        summed per quarter, so the fingerprint ignores row order but changes
+        when any of those values in a row of that quarter is added, removed
+        or edited.
+        """
+        df = self.df if df is None else df
+        index = DatePartitionIndex(df['Date'])
+        optional = [col for col in self.OPTIONAL_TEXT_COLUMNS + self.OPTIONAL_NUMERIC_COLUMNS if col in df.columns]
+        columns = [df[col].astype(object) if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col]
+                   for col in self.REQUIRED_COLUMNS + optional]
+        row_hashes = pd.util.hash_pandas_object(pd.concat(columns, axis=1), index=False).to_numpy()
+        if len(row_hashes):
+            sums = np.add.reduceat(row_hashes[index.order], index.bounds[:-1])
+        else:
+            sums = np.array([], dtype=np.uint64)
+        return pd.Series(sums, index=pd.DatetimeIndex(index.dates, name='Date'), name='Fingerprint')
+    
+    def default_state_path(self):
+        """Location of the persisted aggregate state for this workbook/sheet."""
+        stem = os.path.splitext(os.path.basename(self.file_path))[0]
+        safe_sheet = ''.join(c if c.isalnum() else '_' for c in self.sheet_name)
+        return os.path.join(self.cache.cache_dir, f"{stem}-{safe_sheet}.state.npz")
+    
+    def save_state(self, state_path=None, fingerprints=None):
+        """Persist the cube, security counts, security history, position End_NAVs and quarter fingerprints."""
+        state_path = state_path or self.default_state_path()
+        if fingerprints is None:
+            fingerprints = self.quarter_fingerprints()
+        
+        arrays = {
+            'meta.schema_version': np.array(self.STATE_SCHEMA_VERSION),
+            'meta.alternatives': np.array(sorted(self.taxonomy.alternatives_classes))
+        }
+        arrays.update(frame_to_arrays(self.cube, 'cube.'))
+        arrays.update(frame_to_arrays(self.security_counts.rename('Count').reset_index(), 'security_counts.'))
+        arrays.update(frame_to_arrays(fingerprints.reset_index(), 'quarters.'))
+        history = self.get_security_history()[['Asset_Class', 'Security', 'Date'] + self.CUBE_MEASURES]
+        arrays.update(frame_to_arrays(history.astype({'Asset_Class': object, 'Security': object}), 'history.'))
+        arrays.update(frame_to_arrays(self._position_navs(), 'positions.'))
+        
+        os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+        save_arrays(state_path, arrays)
+        return state_path
+    
+    def _load_state(self, state_path):
+        """Return (cube, security_counts, fingerprints, security history, position End_NAVs) from state_path, or None."""
+        if not os.path.isfile(state_path):
+            return None
+        try:
+            with np.load(state_path, allow_pickle=False) as archive:
+                if int(archive['meta.schema_version']) != self.STATE_SCHEMA_VERSION:
+                    return None
+                # Aggregates saved under a different classification are not reusable
+                if set(archive['meta.alternatives'].tolist()) != self.taxonomy.alternatives_classes:
+                    return None
+                cube = arrays_to_frame(archive, 'cube.')
+                counts = arrays_to_frame(archive, 'security_counts.')
+                quarters = arrays_to_frame(archive, 'quarters.')
+                history = arrays_to_frame(archive, 'history.')
+                positions = arrays_to_frame(archive, 'positions.')
+        except (OSError, ValueError, KeyError):
+            return None
+        
+        security_counts = counts.set_index(['Date', 'Is_Alternative'])['Count']
+        fingerprints = quarters.set_index('Date')['Fingerprint']
+        return cube, security_counts, fingerprints, history, positions
+    
+    @instrumented()
+    def refresh(self, state_path=None):
+        """
+        Incrementally merge new or changed quarters into the persisted aggregates.
+        
+        Only quarters whose fingerprint differs from the saved state are
+        re-aggregated; quarters missing from the input keep their stored
+        aggregates, so a workbook holding just the new quarter is enough.
+        The per-security history is merged the same way, so IRR, multiples
+        and the drilldown still cover every quarter, and NAV validation
+        checks the input's quarters against each position's saved End_NAVs.
+        Row-level frames (alts_df, date_index) are not rebuilt in this mode.
+        """
+        self._require_incremental()
+        state_path = state_path or self.default_state_path()
+        if self.df is None:
+            self.load_data()
+        
+        self.metrics.log("\nRefreshing aggregates...")
+        self.metrics.set_rows(len(self.df))
+        self._forget_positions()
+        self._flag_alternatives()
+        fingerprints = self.quarter_fingerprints()
+        
+        state = self._load_state(state_path)
+        if state is None:
+            self.metrics.log("No usable saved state found; aggregating full history")
+            changed = fingerprints.index
+            merged_fingerprints = fingerprints
+            self.cube, self.security_counts = self._aggregate(self.df)
+            self._index_cube()
+        else:
+            stored_cube, stored_counts, stored_fingerprints, stored_history, stored_positions = state
+            changed = self._changed_quarters(fingerprints, stored_fingerprints)
+            merged_fingerprints = pd.concat([
+                stored_fingerprints[~stored_fingerprints.index.isin(changed)],
+                fingerprints[changed]
+            ]).sort_index()
+            self._merge_quarters(stored_cube, stored_counts, changed)
+            self._merge_history(stored_history, changed)
+            self._merge_positions(stored_positions, changed, fingerprints.index)
+            self.history_start = merged_fingerprints.index.min()
+        
+        self.metrics.annotate(changed_quarters=len(changed))
+        self.save_state(state_path, merged_fingerprints)
+        self.metrics.log(f"Re-aggregated {len(changed)} of {len(merged_fingerprints)} quarters "
+              f"({int(self.df['Date'].isin(changed).sum())} records)")
+        return self
+    
+    @instrumented()
+    def update_quarters(self, cube, security_counts, fingerprints, history=None):
+        """
+        Rebuild the aggregates from a previous run's, re-aggregating only changed quarters.
+        
+        cube, security_counts and fingerprints come from an earlier run over
+        the same workbook, and so does history (its get_security_history()),
+        which when given is merged the same way. Unlike refresh(), the loaded
+        frame is taken as the full history, so quarters that disappeared from
+        it are dropped. Returns (fingerprints, changed dates, removed dates).
+        """
+        self._require_incremental()
+        if self.df is None:
+            self.load_data()
+        self.metrics.set_rows(len(self.df))
+        self._forget_positions()
+        self._flag_alternatives()
+        current = self.quarter_fingerprints()
+        changed = self._changed_quarters(current, fingerprints)
+        removed = fingerprints.index[~fingerprints.index.isin(current.index)]
+        self._merge_quarters(cube, security_counts, changed, removed)
+        self.metrics.annotate(changed_quarters=len(changed), removed_quarters=len(removed))
+        if history is not None:
+            self._merge_history(history, changed.union(removed))
+        self.metrics.log(f"Re-aggregated {len(changed)} of {len(current)} quarters, "
+                         f"dropped {len(removed)}")
+        return current, changed, removed
+    
+    def _require_incremental(self):
+        """Raise ValueError for the chunked engine, whose cube sums cannot be fingerprinted per row."""
+        if not self.has_positions:
+            raise ValueError("Incremental updates need row-level data; use the 'openpyxl' or 'stream' engine")
+    
+    @staticmethod
+    def _changed_quarters(fingerprints, stored_fingerprints):
+        """Dates whose fingerprint is new or differs from stored_fingerprints."""
+        known = fingerprints.index.isin(stored_fingerprints.index)
+        unchanged = np.zeros(len(fingerprints), dtype=bool)
+        unchanged[known] = (stored_fingerprints.loc[fingerprints.index[known]].to_numpy()
+                            == fingerprints.to_numpy()[known])
+        return fingerprints.index[~unchanged]
+    
+    def _merge_quarters(self, stored_cube, stored_counts, changed, removed=None):
+        """Replace the stored aggregates of changed quarters (and drop removed ones)."""
+        stale = changed if removed is None else changed.union(removed)
+        keep_cube = stored_cube[~stored_cube['Date'].isin(stale)]
+        keep_counts = stored_counts[~stored_counts.index.get_level_values('Date').isin(stale)]
+        if len(changed):
+            delta_cube, delta_counts = self._aggregate(self.df[self.df['Date'].isin(changed)])
+            keep_cube = pd.concat([keep_cube.astype({'Asset_Class': object}),
+                                   delta_cube.astype({'Asset_Class': object})], ignore_index=True)
+            keep_counts = pd.concat([keep_counts, delta_counts])
+        self.cube = keep_cube.sort_values(self.CUBE_KEYS).reset_index(drop=True)
+        self.security_counts = keep_counts.sort_index()
+        self._index_cube()
+    
+    def _merge_history(self, stored_history, changed):
+        """
+        Replace the stored security history of changed quarters with sums over df's rows.
+        
+        The asset classes with rows in those quarters, before or after, are
+        kept in history_changes (see export_security_drilldown).
+        """
+        stale = stored_history['Date'].isin(changed)
+        keep = stored_history[~stale]
+        rows = self.df[self.df['Date'].isin(changed).to_numpy() & self.df['Is_Alternative'].to_numpy()]
+        delta = self._sum_history(rows)
+        self.history_changes = ({str(name) for name in stored_history.loc[stale, 'Asset_Class'].unique()}
+                                | {str(name) for name in delta['Asset_Class'].unique()})
+        merged = pd.concat([keep.astype({'Asset_Class': object, 'Security': object}),
+                            delta.astype({'Asset_Class': object, 'Security': object})], ignore_index=True)
+        merged = merged.sort_values(['Asset_Class', 'Security', 'Date']).reset_index(drop=True)
+        self.security_history = self._finish_history(merged)
+    
+    def _position_navs(self):
+        """End_NAV of every position and quarter, as kept in the refresh state."""
+        if self.position_navs is not None:
+            return self.position_navs
+        keys = [key for key in POSITION_KEYS if key in self.df.columns]
+        return self.df[keys + ['Date', 'End_NAV']].astype({key: object for key in keys})
+    
+    def _merge_positions(self, stored_positions, changed, loaded):
+        """
+        Merge df's position End_NAVs into the stored ones and keep the rest as validation priors.
+        
+        Stored rows of quarters that df does not hold become prior_positions,
+        so validate_nav() checks each position's first quarter in df against
+        the End_NAV it reported the quarter before.
+        """
+        columns = [key for key in POSITION_KEYS if key in self.df.columns] + ['Date', 'End_NAV']
+        if list(stored_positions.columns) != columns:
+            # Saved with other position keys than the input has: the positions cannot be matched
+            stored_positions = pd.DataFrame(columns=columns)
+        self.prior_positions = stored_positions[~stored_positions['Date'].isin(loaded)].reset_index(drop=True)
+        rows = self.df[self.df['Date'].isin(changed)]
+        self.position_navs = pd.concat([
+            stored_positions[~stored_positions['Date'].isin(changed)],
+            rows[columns].astype({key: object for key in columns[:-2]})
+        ], ignore_index=True)
+        
+        first, last = (date.strftime('%Y-%m-%d') for date in (self.df['Date'].min(), self.df['Date'].max()))
+        self.partial_sections['nav_validation'] = (
+            f"Covers the {len(loaded)} quarter(s) in the refresh input ({first} to {last}), continuing from the "
+            f"End_NAVs saved for earlier quarters; the other quarters were checked when they were first loaded")
+        self.metrics.log(f"NAV validation covers {len(loaded)} quarter(s), continuing from "
+                         f"{len(self.prior_positions)} saved position End_NAVs")
+    
+    @instrumented()
+    def serialize_tables(self, tables):
+        """
+        Convert result tables to JSON-ready column tables.
+        
+        Each column is formatted once as a whole (dates to 'YYYY-MM-DD',
+        floats rounded to float_precision, NaN to None) and kept as one list:
+        {'columns': [names], 'data': [values of each column]}. No per-row
+        records are built (see payload_codec.table_records for that view).
+        """
+        self.metrics.set_rows(sum(len(df) for df in tables.values()))
+        return {name: self._serialize_frame(df) for name, df in tables.items()}
+    
+    def _serialize_frame(self, df):
+        """Format every column of df in one pass and return it as a column table."""
+        names = [str(col) for col in df.columns]
+        columns = []
+        for col in df.columns:
+            series = df[col]
+            kind = series.dtype.kind
+            if kind == 'M':
+                values = np.datetime_as_string(series.to_numpy(dtype='datetime64[D]'), unit='D').astype(object)
+                values[series.isna().to_numpy()] = None
+                values = values.tolist()
+            elif kind == 'f':
+                values = series.to_numpy()
+                if self.float_precision is not None:
+                    values = np.round(values, self.float_precision)
+                missing = np.isnan(values)
+                if missing.any():
+                    # NaN is not valid JSON; export missing values as null
+                    values = values.astype(object)
+                    values[missing] = None
+                values = values.tolist()
+            elif kind in 'iub':
+                values = series.to_numpy().tolist()
+            else:
+                values = series.astype(object).where(series.notna(), None).tolist()
+            columns.append(values)
+        return {'columns': names, 'data': columns}
+    
+    def _round_value(self, value):
+        """Round a float scalar to float_precision (other values pass through)."""
+        if isinstance(value, float) and self.float_precision is not None:
+            return round(value, self.float_precision)
+        return value
+    
+    @instrumented()
     def export_to_json(self):
         """Export processed data to JSON format for the dashboard."""
-        print("\nExporting data to JSON...")
+        self.metrics.log("\nExporting data to JSON...")
+        self.metrics.set_rows(len(self.cube))
         
         # Get all the data
         composition = self.get_composition_by_asset_class()
@@ -253,32 +1296,57 @@ class PortfolioDataProcessor:
         metrics = self.calculate_performance_metrics()
         performance = self.get_performance_by_asset_class()
         quarterly = self.get_quarterly_performance()
+        snapshots, snapshot_metrics = self.get_quarterly_snapshots()
+        time_weighted = self.get_time_weighted_returns()
+        risk = self.get_rolling_risk()
+        rollups = self.get_taxonomy_rollups()[['Date', 'Level', 'Node', 'Parent', 'End_NAV',
+                                               'Net_Investment_Income', 'Return_Pct']]
+        if self.has_positions:
+            nav_exceptions, nav_validation = self.validate_nav()
+            money_weighted = self.get_money_weighted_returns()
+            money_weighted = money_weighted.loc[money_weighted['Level'] != 'security',
+                                                ['Asset_Class', 'Paid_In', 'Distributed', 'NAV', 'IRR',
+                                                 'TVPI', 'DPI', 'RVPI', 'Converged']]
+            unavailable = {}
+        else:
+            # The chunked engine kept cube sums only; the page explains the missing sections
+            nav_exceptions = nav_validation = money_weighted = pd.DataFrame()
+            unavailable = dict(self.POSITION_SECTIONS)
+        
+        # Convert to JSON-serializable format, one column at a time
+        tables = self.serialize_tables({
+            'composition': composition,
+            'alternatives_timeseries': alts_ts,
+            'non_alternatives_timeseries': non_alts_ts,
+            'asset_class_trends': asset_class_trends,
+            'performance_by_asset_class': performance,
+            'quarterly_performance': quarterly,
+            'snapshots': snapshots,
+            'snapshot_metrics': snapshot_metrics,
+            'time_weighted_returns': time_weighted,
+            'money_weighted_returns': money_weighted,
+            'rolling_risk': risk,
+            'taxonomy_rollups': rollups,
+            'nav_validation': nav_validation,
+            'nav_exceptions': nav_exceptions
+        })
         
-        # Convert to JSON-serializable format
         data = {
             'metadata': {
                 'generated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'data_period': f"{self.alts_df['Date'].min().strftime('%Y-%m-%d')} to {self.alts_df['Date'].max().strftime('%Y-%m-%d')}",
-                'total_records': len(self.df),
-                'alternatives_records': len(self.alts_df)
+                'data_period': f"{self._alts_cube['Date'].min().strftime('%Y-%m-%d')} to {self._alts_cube['Date'].max().strftime('%Y-%m-%d')}",
+                'total_records': int(self.cube['Records'].sum()),
+                'alternatives_records': int(self._alts_cube['Records'].sum()),
+                'taxonomy_levels': self.taxonomy.all_levels,
+                'unclassified_asset_classes': self.unclassified,
+                'unavailable_sections': unavailable,
+                'partial_sections': dict(self.partial_sections)
             },
-            'key_metrics': metrics,
-            'composition': composition.to_dict(orient='records'),
-            'alternatives_timeseries': alts_ts.to_dict(orient='records'),
-            'non_alternatives_timeseries': non_alts_ts.to_dict(orient='records'),
-            'asset_class_trends': asset_class_trends.to_dict(orient='records'),
-            'performance_by_asset_class': performance.to_dict(orient='records'),
-            'quarterly_performance': quarterly.to_dict(orient='records')
+            'key_metrics': {key: self._round_value(value) for key, value in metrics.items()},
+            **tables
         }
         
-        # Convert datetime objects to strings
-        for key in ['alternatives_timeseries', 'non_alternatives_timeseries', 
-                    'asset_class_trends', 'quarterly_performance']:
-            for record in data[key]:
-                if 'Date' in record:
-                    record['Date'] = pd.to_datetime(record['Date']).strftime('%Y-%m-%d')
-        
-        print("Data export complete!")
+        self.metrics.log("Data export complete!")
         return data
 
 
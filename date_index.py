@@ -0,0 +1,67 @@
+"""
+Date Index
+
+This module provides a date-partitioned row index for portfolio frames.
+
+Rows are grouped by Date once (a stable argsort plus the start offset of every
+quarter), so fetching the rows of any single quarter costs O(rows in that quarter)
+instead of a boolean scan over the whole frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class DatePartitionIndex:
+    """Sorted row ranges per distinct date for one frame."""
+
+    def __init__(self, dates):
+        """Build the index from a Series/array of datetime64 values."""
+        values = pd.DatetimeIndex(dates).to_numpy()
+        self.order = np.argsort(values, kind='stable')
+        sorted_dates = values[self.order]
+        self.dates, starts = np.unique(sorted_dates, return_index=True)
+        self.bounds = np.append(starts, len(values))
+        # When the frame is already date-ordered every partition is a plain slice
+        self.is_sorted = bool(np.array_equal(self.order, np.arange(len(values))))
+
+    def __len__(self):
+        """Number of distinct dates."""
+        return len(self.dates)
+
+    def __contains__(self, date):
+        """True if the index has rows for date."""
+        return self._locate(date) is not None
+
+    @property
+    def latest(self):
+        """Most recent indexed date (or None for an empty frame)."""
+        return pd.Timestamp(self.dates[-1]) if len(self.dates) else None
+
+    def _locate(self, date):
+        """Return the partition number of date, or None if it has no rows."""
+        if not len(self.dates):
+            return None
+        key = np.datetime64(pd.Timestamp(date)).astype(self.dates.dtype)
+        i = int(np.searchsorted(self.dates, key))
+        if i < len(self.dates) and self.dates[i] == key:
+            return i
+        return None
+
+    def positions(self, date):
+        """Return the integer row positions holding date (slice when contiguous)."""
+        i = self._locate(date)
+        if i is None:
+            return np.array([], dtype=np.intp)
+        start, stop = self.bounds[i], self.bounds[i + 1]
+        if self.is_sorted:
+            return slice(int(start), int(stop))
+        return self.order[start:stop]
+
+    def rows(self, df, date):
+        """Return the rows of df (the frame this index was built on) for date."""
+        return df.iloc[self.positions(date)]
+
+    def counts(self):
+        """Return a Series of row counts per date."""
+        return pd.Series(np.diff(self.bounds), index=pd.DatetimeIndex(self.dates, name='Date'))
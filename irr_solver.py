@@ -0,0 +1,122 @@
+"""
+IRR Solver
+
+This module computes money-weighted returns (XIRR) for many cash-flow series at once.
+
+Every series (a security, an asset class, the whole portfolio) is one row of a padded
+cash-flow matrix whose columns share a single time axis, so series with different
+lifetimes simply carry zeros outside their own dates. All rows are solved together:
+vectorized Newton steps on the rows that are still active, then vectorized bisection
+for any row where Newton failed to converge or left the valid range (rate > -100%).
+The result carries per-row convergence diagnostics.
+"""
+
+import numpy as np
+
+
+DAYS_PER_YEAR = 365.0
+
+# Status codes of solve_irr()
+NEWTON = 'newton'
+BISECTION = 'bisection'
+NO_SOLUTION = 'no_solution'
+
+_MIN_RATE = -0.9999
+
+
+def year_fractions(dates):
+    """Years elapsed from the first of dates (a DatetimeIndex or datetime64 array)."""
+    values = np.asarray(dates, dtype='datetime64[D]')
+    return (values - values[0]).astype(float) / DAYS_PER_YEAR
+
+
+def _relative_npv(rates, amounts, times):
+    """NPV divided by the present value of the gross flows (scale-free), row by row."""
+    with np.errstate(over='ignore', invalid='ignore'):
+        discount = np.exp(-np.outer(np.log1p(rates), times))
+        return (amounts * discount).sum(axis=1) / (np.abs(amounts) * discount).sum(axis=1)
+
+
+def _npv_and_slope(rates, amounts, times):
+    """Relative NPV and its derivative with respect to the rate (same scale), row by row."""
+    with np.errstate(over='ignore', invalid='ignore'):
+        discount = np.exp(-np.outer(np.log1p(rates), times))
+        values = amounts * discount
+        gross = np.abs(values).sum(axis=1)
+        return values.sum(axis=1) / gross, -(values * times).sum(axis=1) / (1 + rates) / gross
+
+
+def solve_irr(amounts, times, guess=0.1, tol=1e-10, max_iter=50, upper_bound=100.0, max_bisections=200):
+    """
+    Solve the annual IRR of every row of a padded cash-flow matrix.
+
+    amounts is (series x dates), negative for money paid in and positive for
+    money returned (including the closing NAV); times are the dates in years.
+    A row is converged when |NPV| <= tol times the present value of its gross
+    flows at the same rate. Rows without both a positive and a negative flow,
+    or whose NPV does not change sign between -99.99% and upper_bound, have
+    no solution (NaN).
+
+    Returns a dict of per-row arrays: irr, converged, iterations, method
+    (NEWTON, BISECTION or NO_SOLUTION) and residual (that relative |NPV|).
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    times = np.asarray(times, dtype=float)
+    n = len(amounts)
+    solvable = (amounts > 0).any(axis=1) & (amounts < 0).any(axis=1)
+
+    irr = np.full(n, np.nan)
+    iterations = np.zeros(n, dtype=int)
+    method = np.full(n, NO_SOLUTION, dtype=object)
+    converged = np.zeros(n, dtype=bool)
+
+    # Newton on the rows still active; rows drop out as they converge or diverge
+    rates = np.full(n, guess, dtype=float)
+    active = np.flatnonzero(solvable)
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        value, slope = _npv_and_slope(rates[active], amounts[active], times)
+        iterations[active] += 1
+        done = np.abs(value) <= tol
+        converged[active[done]] = True
+        with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+            step = rates[active] - value / slope
+        diverged = ~done & (~np.isfinite(step) | (step <= -1))
+        rates[active] = np.where(done | diverged, rates[active], step)
+        active = active[~done & ~diverged]
+    irr[converged] = rates[converged]
+    method[converged] = NEWTON
+
+    # Bisection for the rest, over the rows whose NPV changes sign on the bracket
+    pending = np.flatnonzero(solvable & ~converged)
+    if len(pending):
+        low = np.full(len(pending), _MIN_RATE)
+        high = np.full(len(pending), upper_bound)
+        low_value = _relative_npv(low, amounts[pending], times)
+        high_value = _relative_npv(high, amounts[pending], times)
+        bracketed = np.isfinite(low_value) & np.isfinite(high_value) & (np.sign(low_value) != np.sign(high_value))
+        pending, low, high, low_value = pending[bracketed], low[bracketed], high[bracketed], low_value[bracketed]
+        for _ in range(max_bisections):
+            if not len(pending):
+                break
+            mid = (low + high) / 2
+            mid_value = _relative_npv(mid, amounts[pending], times)
+            iterations[pending] += 1
+            same_side = np.sign(mid_value) == np.sign(low_value)
+            low = np.where(same_side, mid, low)
+            low_value = np.where(same_side, mid_value, low_value)
+            high = np.where(same_side, high, mid)
+            done = (np.abs(mid_value) <= tol) | (high - low <= tol)
+            irr[pending[done]] = mid[done]
+            converged[pending[done]] = True
+            method[pending[done]] = BISECTION
+            keep = ~done
+            pending, low, high, low_value = pending[keep], low[keep], high[keep], low_value[keep]
+
+    residual = np.full(n, np.nan)
+    solved = np.flatnonzero(np.isfinite(irr))
+    if len(solved):
+        residual[solved] = np.abs(_relative_npv(irr[solved], amounts[solved], times))
+
+    return {'irr': irr, 'converged': converged, 'iterations': iterations, 'method': method, 'residual': residual}
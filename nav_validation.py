@@ -0,0 +1,188 @@
+"""
+NAV Validation
+
+This module checks that position-level NAVs reconcile, across the whole history at once.
+
+Every row must roll forward (Beg_NAV + Contributions - Distributions + income and gains
+= End_NAV), and every position's Beg_NAV must equal the End_NAV it reported the quarter
+before. Rows are sorted once by position and date; the prior quarter of every row is then
+the row above it, so the grouped "shift" is a shifted array masked at position
+boundaries and every check is a vectorized comparison. Only the rows that break a
+tolerance are materialised, as a compact exceptions report.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Exception types reported by validate_nav()
+ROLL_FORWARD = 'roll_forward'
+CONTINUITY = 'continuity'
+QUARTER_GAP = 'quarter_gap'
+OPENING_BALANCE = 'opening_balance'
+DUPLICATE = 'duplicate'
+CHECKS = (ROLL_FORWARD, CONTINUITY, QUARTER_GAP, OPENING_BALANCE, DUPLICATE)
+
+# Columns that identify a position (those present are used) and the income / gain
+# columns that explain the change in NAV besides cash flows
+POSITION_KEYS = ('Entity', 'Security')
+RETURN_COLUMNS = ('Net_Investment_Income', 'FX_Gain_Loss')
+
+# A difference is an exception when it exceeds ABS_TOLERANCE + REL_TOLERANCE * |NAV|
+ABS_TOLERANCE = 1.0
+REL_TOLERANCE = 1e-6
+
+# Largest exceptions kept per check in the report
+MAX_EXCEPTIONS = 100
+
+
+def _codes(values):
+    """Integer codes of a column (categorical codes when available)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy()
+    return pd.factorize(values)[0]
+
+
+def _quarter_numbers(dates):
+    """Running quarter number of every datetime64 date (consecutive quarters differ by 1)."""
+    return dates.astype('datetime64[M]').astype(np.int64) // 3
+
+
+def validate_nav(df, keys=POSITION_KEYS, return_columns=RETURN_COLUMNS, abs_tol=ABS_TOLERANCE,
+                 rel_tol=REL_TOLERANCE, max_exceptions=MAX_EXCEPTIONS, prior=None, start_date=None):
+    """
+    Run the roll-forward and continuity checks over every row of df.
+
+    Checks, per position (the keys present in df, e.g. Entity + Security):
+    ROLL_FORWARD  End_NAV differs from Beg_NAV + Contributions - Distributions
+                  plus the return_columns present in df;
+    CONTINUITY    Beg_NAV differs from the previous quarter's End_NAV;
+    QUARTER_GAP   the previous row is more than one quarter earlier (its
+                  End_NAV is carried over the gap as the expected Beg_NAV);
+    OPENING_BALANCE  a position first appearing after the first quarter of
+                  df opens with a non-zero Beg_NAV (its history is missing);
+    DUPLICATE     the position reports the same quarter more than once.
+
+    prior holds rows of other quarters (the keys, Date and End_NAV) that are
+    not checked themselves but supply the End_NAV each position's rows in
+    df continue from, e.g. quarters kept in a saved state. start_date is the
+    first quarter of the whole history (default: the earliest date in df
+    and prior).
+
+    Returns (exceptions, summary). exceptions keeps the max_exceptions
+    largest differences of every check (Check, Date, keys, Asset_Class,
+    Prior_Date, Expected, Actual, Difference); summary has one row per check
+    with Checked, Exceptions, Max_Abs_Difference and Total_Abs_Difference.
+    """
+    keys = [key for key in keys if key in df.columns]
+    return_columns = [col for col in return_columns if col in df.columns]
+    labels = keys + (['Asset_Class'] if 'Asset_Class' in df.columns else [])
+    checked = np.ones(len(df), dtype=bool)
+    if prior is not None and len(prior):
+        # Prior rows only sort in as each position's earlier quarters; they are never checked
+        prior = prior[keys + ['Date', 'End_NAV']]
+        df = pd.concat([df.astype({key: object for key in keys}), prior.astype({key: object for key in keys})],
+                       ignore_index=True)
+        checked = np.concatenate([checked, np.zeros(len(prior), dtype=bool)])
+    n = len(df)
+
+    # Sort by position and date: each row's prior quarter is the row above it
+    dates = df['Date'].to_numpy(dtype='datetime64[ns]')
+    quarters = _quarter_numbers(dates)
+    position = np.zeros(n, dtype=np.int64)
+    for key in keys:
+        codes = _codes(df[key])
+        position = position * (int(codes.max()) + 2 if n else 1) + codes + 1
+    if n:
+        # One integer sort key (position, quarter); rows within a quarter keep their order
+        first_quarter = quarters.min()
+        order = np.argsort(position * (int(quarters.max() - first_quarter) + 1) + (quarters - first_quarter),
+                           kind='stable')
+    else:
+        order = np.arange(0)
+    checked = checked[order]
+    position = position[order]
+    dates = dates[order]
+    quarters = quarters[order]
+    beg = df['Beg_NAV'].to_numpy(dtype=float)[order]
+    end = df['End_NAV'].to_numpy(dtype=float)[order]
+
+    contributions = df['Contributions'].to_numpy(dtype=float)[order]
+    distributions = df['Distributions'].to_numpy(dtype=float)[order]
+    expected_end = beg + contributions - distributions
+    for col in return_columns:
+        expected_end = expected_end + np.nan_to_num(df[col].to_numpy(dtype=float)[order])
+
+    has_prior = np.zeros(n, dtype=bool)
+    has_prior[1:] = position[1:] == position[:-1]
+    prior_end = np.full(n, np.nan)
+    prior_end[1:] = end[:-1]
+    prior_end[~has_prior] = np.nan
+    prior_dates = np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]')
+    prior_dates[1:] = dates[:-1]
+    prior_dates[~has_prior] = np.datetime64('NaT')
+    step = np.zeros(n, dtype=np.int64)
+    step[1:] = quarters[1:] - quarters[:-1]
+
+    start = np.datetime64(pd.Timestamp(start_date), 'ns') if start_date is not None else (dates.min() if n else None)
+    repeat = has_prior & checked
+    duplicate = repeat & (step == 0)
+    gap = repeat & (step > 1)
+    consecutive = repeat & (step == 1)
+    opening = ~has_prior & checked & (dates > start) if n else has_prior
+
+    def breaks(expected, actual, rows):
+        """Rows (of those checked) where actual differs from expected beyond the tolerance."""
+        difference = actual - expected
+        limit = abs_tol + rel_tol * np.maximum(np.abs(expected), np.abs(actual))
+        return rows & ~(np.abs(difference) <= limit), difference
+
+    checks = {
+        ROLL_FORWARD: (checked, expected_end, end),
+        CONTINUITY: (consecutive, prior_end, beg),
+        QUARTER_GAP: (gap, prior_end, beg),
+        OPENING_BALANCE: (opening, np.zeros(n), beg),
+        DUPLICATE: (duplicate, prior_end, beg),
+    }
+
+    summary = []
+    exceptions = []
+    for check, (rows, expected, actual) in checks.items():
+        if check in (QUARTER_GAP, DUPLICATE):
+            # Structural problems are exceptions whatever the values; every repeat report is checked
+            failed, difference = rows, np.nan_to_num(actual - expected)
+            rows = repeat
+        else:
+            failed, difference = breaks(expected, actual, rows)
+        flagged = np.flatnonzero(failed)
+        magnitude = np.abs(difference[flagged])
+        # Missing NAVs have no difference to report but rank first
+        finite = np.isfinite(magnitude)
+        summary.append({
+            'Check': check,
+            'Checked': int(rows.sum()),
+            'Exceptions': len(flagged),
+            'Max_Abs_Difference': float(magnitude[finite].max()) if finite.any() else 0.0,
+            'Total_Abs_Difference': float(magnitude[finite].sum())
+        })
+        if len(flagged):
+            # Largest differences first; only these rows are materialised
+            rank = np.where(finite, magnitude, np.inf)
+            flagged = flagged[np.argsort(-rank, kind='stable')[:max_exceptions]]
+            rows_taken = df.iloc[order[flagged]]
+            frame = {'Check': check, 'Date': dates[flagged]}
+            for key in labels:
+                frame[key] = rows_taken[key].astype(object).to_numpy()
+            frame.update({
+                'Prior_Date': prior_dates[flagged],
+                'Expected': expected[flagged],
+                'Actual': actual[flagged],
+                'Difference': difference[flagged]
+            })
+            exceptions.append(pd.DataFrame(frame))
+
+    if exceptions:
+        exceptions = pd.concat(exceptions, ignore_index=True)
+    else:
+        exceptions = pd.DataFrame(columns=['Check', 'Date'] + labels + ['Prior_Date', 'Expected', 'Actual', 'Difference'])
+    return exceptions, pd.DataFrame(summary)
@@ -0,0 +1,156 @@
+"""
+Out-of-Core Aggregation
+
+This module folds a stream of row chunks into one running aggregate with bounded memory.
+
+Portfolios too large to load as one DataFrame are read in chunks (see
+StreamingXlsxReader.iter_chunks). Every chunk is summed per key combination (e.g.
+Date x Asset_Class) and only those partial sums are kept. They are merged into the
+running aggregate whenever they outgrow their share of the memory budget. Text keys are
+stored as integer codes into vocabularies that grow as new values appear, and they come
+back as categoricals. A distinct column (e.g. Security) is tracked as the set of its
+codes seen under each key, so distinct counts taken from the aggregate are exact, not
+estimates. Memory grows with the number of keys and distinct values, never with rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_MEMORY_LIMIT = 512_000_000
+
+# Approximate bytes held per raw row while a chunk is parsed, encoded and grouped
+CHUNK_BYTES_PER_ROW = 400
+MIN_CHUNK_ROWS = 10_000
+
+# Shares of the memory limit: the chunk being read, partial sums waiting to be
+# merged, and the running aggregate (a merge briefly needs the last two twice)
+CHUNK_SHARE = 0.25
+PENDING_SHARE = 0.125
+STATE_SHARE = 0.25
+
+
+def chunk_rows_for(memory_limit):
+    """Rows per chunk that keep a parsed chunk within its share of memory_limit."""
+    return max(MIN_CHUNK_ROWS, int(memory_limit * CHUNK_SHARE) // CHUNK_BYTES_PER_ROW)
+
+
+class ChunkedAggregator:
+    """Fold row chunks into per-key sums and record counts within a memory limit."""
+
+    def __init__(self, keys, measures, dimensions=(), distinct=None, memory_limit=DEFAULT_MEMORY_LIMIT):
+        """
+        Initialize an empty aggregate.
+
+        keys are the grouping columns and measures the summed ones; keys
+        listed in dimensions are text columns stored as integer codes.
+        distinct names a text column whose distinct values are kept per key
+        (see distinct_result()).
+        """
+        self.keys = list(keys)
+        self.measures = list(measures)
+        self.distinct = distinct
+        coded = self.keys + ([distinct] if distinct else [])
+        self.dimensions = [key for key in coded if key in set(dimensions) or key == distinct]
+        self.memory_limit = memory_limit
+        self.vocabularies = {key: pd.Index([], dtype=object) for key in self.dimensions}
+        self.state = None
+        self.distinct_state = None
+        self.pending = []
+        self.pending_distinct = []
+        self.pending_bytes = 0
+        self.rows = 0
+        self.chunks = 0
+        self.peak_state_bytes = 0
+
+    def _encode(self, key, values):
+        """Codes of values in the key's vocabulary, adding values seen for the first time (-1 if missing)."""
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            inverse, uniques = values.cat.codes.to_numpy(), pd.Index(values.cat.categories, dtype=object)
+        else:
+            inverse, uniques = pd.factorize(values)
+            uniques = pd.Index(uniques, dtype=object)
+        vocabulary = self.vocabularies[key]
+        new = uniques[vocabulary.get_indexer(uniques) < 0]
+        if len(new):
+            vocabulary = self.vocabularies[key] = vocabulary.append(new)
+        unique_codes = vocabulary.get_indexer(uniques).astype(np.int32)
+        return np.where(inverse >= 0, unique_codes[inverse], np.int32(-1)).astype(np.int32)
+
+    def add(self, chunk):
+        """Sum one chunk of rows into the aggregate."""
+        frame = {}
+        for key in self.keys:
+            frame[key] = self._encode(key, chunk[key]) if key in self.dimensions else chunk[key].to_numpy()
+        for col in self.measures:
+            frame[col] = chunk[col].to_numpy(dtype=float)
+        if self.distinct:
+            frame[self.distinct] = self._encode(self.distinct, chunk[self.distinct])
+        frame = pd.DataFrame(frame)
+        grouped = frame.groupby(self.keys, sort=False, dropna=False)
+        partial = grouped[self.measures].sum()
+        partial['Records'] = grouped.size()
+
+        self.rows += len(chunk)
+        self.chunks += 1
+        self.pending.append(partial)
+        self.pending_bytes += int(partial.memory_usage(index=True).sum())
+        if self.distinct:
+            pairs = frame[self.keys + [self.distinct]].drop_duplicates()
+            self.pending_distinct.append(pairs)
+            self.pending_bytes += int(pairs.memory_usage(index=False).sum())
+        if self.pending_bytes > self.memory_limit * PENDING_SHARE:
+            self._merge()
+        return self
+
+    def _merge(self):
+        """Merge the pending partial sums into the running aggregate."""
+        if not self.pending:
+            return
+        parts = ([self.state] if self.state is not None else []) + self.pending
+        merged = pd.concat(parts) if len(parts) > 1 else parts[0]
+        self.state = merged.groupby(level=self.keys, sort=False, dropna=False).sum()
+        state_bytes = int(self.state.memory_usage(index=True).sum())
+        if self.distinct:
+            parts = ([self.distinct_state] if self.distinct_state is not None else []) + self.pending_distinct
+            merged = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+            self.distinct_state = merged.drop_duplicates(ignore_index=True)
+            state_bytes += int(self.distinct_state.memory_usage(index=False).sum())
+        self.pending = []
+        self.pending_distinct = []
+        self.pending_bytes = 0
+        self.peak_state_bytes = max(self.peak_state_bytes, state_bytes)
+        if state_bytes > self.memory_limit * STATE_SHARE:
+            distinct = f", {len(self.distinct_state):,} distinct values" if self.distinct else ''
+            raise MemoryError(
+                f"The running aggregate needs {state_bytes / 1e6:.1f} MB, more than its share of the "
+                f"{self.memory_limit / 1e6:.0f} MB memory limit ({len(self.state):,} key combinations"
+                f"{distinct}); raise the memory limit")
+
+    def result(self):
+        """Return the aggregate as a DataFrame: keys (dimensions as categoricals), measures and Records."""
+        self._merge()
+        if self.state is None:
+            raise ValueError("No rows were aggregated")
+        frame = self._decode(self.state.reset_index())
+        frame['Records'] = frame['Records'].astype(np.int64)
+        return frame
+
+    def distinct_result(self):
+        """Return the distinct column's values seen under each key: one row per (keys, value)."""
+        self._merge()
+        if self.distinct_state is None:
+            raise ValueError("No distinct values were tracked")
+        return self._decode(self.distinct_state.copy())
+
+    def _decode(self, frame):
+        """Replace the integer codes in frame's dimension columns with categoricals."""
+        for key in self.dimensions:
+            if key not in frame.columns:
+                continue
+            # Sorted categories, as astype('category') would give, so grouped output keeps its order
+            vocabulary = self.vocabularies[key]
+            categories = vocabulary.sort_values()
+            remap = np.append(categories.get_indexer(vocabulary), -1).astype(np.int32)
+            frame[key] = pd.Categorical.from_codes(remap[frame[key].to_numpy()], categories=categories)
+        return frame
@@ -0,0 +1,186 @@
+"""
+Payload Codec
+
+This module encodes the dashboard data embedded in the HTML in a compact form.
+
+export_to_json() produces column tables ({'columns': [names], 'data': [one list of
+values per column]}), so no key name is repeated per row. Here the column lists are taken
+as they are, text columns (asset classes, dates, categories) become indices into one
+shared string dictionary, and each block can optionally be deflate-compressed and
+base64-encoded. Records are only built where something needs rows: in the browser
+(DECODER_JS, using the native DecompressionStream), so the chart code keeps reading
+dashboardData as lists of records, and in table_records() for Python callers.
+"""
+
+import base64
+import json
+import math
+import zlib
+
+
+PAYLOAD_FORMAT = 'columnar'
+PAYLOAD_VERSION = 1
+
+# Payloads whose encoded JSON is larger than this are compressed in 'auto' mode
+COMPRESSION_THRESHOLD_BYTES = 256 * 1024
+
+COMPRESSION_MODES = ('auto', 'on', 'off')
+
+_DICT = 'dict'
+_RAW = 'raw'
+
+
+def is_column_table(value):
+    """True if value is a column table: {'columns': [names], 'data': [one list per column]}."""
+    return isinstance(value, dict) and set(value) == {'columns', 'data'}
+
+
+def table_length(table):
+    """Number of rows in a column table."""
+    return len(table['data'][0]) if table['data'] else 0
+
+
+def table_records(table):
+    """The rows of a column table as a list of dicts (the record view)."""
+    return [dict(zip(table['columns'], row)) for row in zip(*table['data'])]
+
+
+def _is_text_column(values):
+    """True if every value is a string or None (and at least one is a string)."""
+    return any(isinstance(v, str) for v in values) and all(v is None or isinstance(v, str) for v in values)
+
+
+def _finite(values):
+    """Replace NaN/inf (which JSON.parse rejects) with None."""
+    return [None if isinstance(v, float) and not math.isfinite(v) else v for v in values]
+
+
+def _pack_block(value, compress):
+    """Return value as-is, or as {'deflate': base64} holding its compressed JSON."""
+    if not compress:
+        return value
+    raw = json.dumps(value, separators=(',', ':'), allow_nan=False).encode('utf-8')
+    return {'deflate': base64.b64encode(zlib.compress(raw, 9)).decode('ascii')}
+
+
+def _unpack_block(block):
+    """Inverse of _pack_block."""
+    if isinstance(block, dict) and 'deflate' in block:
+        return json.loads(zlib.decompress(base64.b64decode(block['deflate'])).decode('utf-8'))
+    return block
+
+
+def encode_payload(data, compression='auto'):
+    """
+    Encode the export_to_json() dict as a compact columnar payload.
+
+    Column tables are encoded column by column without being copied;
+    other values are kept as they are. compression is 'on', 'off' or 'auto' (compress when the encoded payload
+    exceeds COMPRESSION_THRESHOLD_BYTES). Compressed blocks carry NaN/inf as null.
+    """
+    if compression not in COMPRESSION_MODES:
+        raise ValueError(f"compression must be one of {COMPRESSION_MODES}, got {compression!r}")
+
+    strings = []
+    string_ids = {}
+
+    def intern(value):
+        if value is None:
+            return -1
+        index = string_ids.get(value)
+        if index is None:
+            index = string_ids[value] = len(strings)
+            strings.append(value)
+        return index
+
+    tables = {}
+    objects = {}
+    for name, value in data.items():
+        if not is_column_table(value):
+            objects[name] = value
+            continue
+        encoding, blocks = [], []
+        for values in value['data']:
+            if _is_text_column(values):
+                encoding.append(_DICT)
+                blocks.append([intern(v) for v in values])
+            else:
+                encoding.append(_RAW)
+                blocks.append(values)
+        tables[name] = {'length': table_length(value), 'columns': list(value['columns']), 'encoding': encoding,
+                        'values': blocks}
+
+    if compression == 'auto':
+        uncompressed = {'strings': strings, 'tables': tables, 'objects': objects}
+        size = len(json.dumps(uncompressed, separators=(',', ':')))
+        compression = 'on' if size > COMPRESSION_THRESHOLD_BYTES else 'off'
+    compress = compression == 'on'
+
+    if compress:
+        for table in tables.values():
+            table['values'] = _pack_block([_finite(v) for v in table['values']], True)
+
+    return {
+        'format': PAYLOAD_FORMAT,
+        'version': PAYLOAD_VERSION,
+        'compressed': compress,
+        'strings': _pack_block(strings, compress),
+        'tables': tables,
+        'objects': objects
+    }
+
+
+def decode_payload(payload):
+    """Rebuild the export_to_json() dict (with its column tables) from an encoded payload."""
+    if payload.get('format') != PAYLOAD_FORMAT or payload.get('version') != PAYLOAD_VERSION:
+        raise ValueError(f"Unsupported payload: {payload.get('format')} v{payload.get('version')}")
+
+    strings = _unpack_block(payload['strings'])
+    data = dict(payload['objects'])
+    for name, table in payload['tables'].items():
+        columns = []
+        for encoding, values in zip(table['encoding'], _unpack_block(table['values'])):
+            if encoding == _DICT:
+                values = [strings[i] if i >= 0 else None for i in values]
+            columns.append(values)
+        data[name] = {'columns': list(table['columns']), 'data': columns}
+    return data
+
+
+def payload_script_literal(payload):
+    """Serialize a payload for embedding inside a <script> element."""
+    text = json.dumps(payload, separators=(',', ':'))
+    # '</' would end the script element early if it appeared in a string value
+    return text.replace('</', '<\\/')
+
+
+# Browser-side decoder; mirrors decode_payload(), but hands the page lists of records
+DECODER_JS = """
+        async function inflateBlock(block) {
+            if (block === null || typeof block !== 'object' || !('deflate' in block)) return block;
+            const bytes = Uint8Array.from(atob(block.deflate), c => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+            return JSON.parse(await new Response(stream).text());
+        }
+
+        async function decodeDashboardPayload(payload) {
+            const strings = await inflateBlock(payload.strings);
+            const data = Object.assign({}, payload.objects);
+            for (const [name, table] of Object.entries(payload.tables)) {
+                const blocks = await inflateBlock(table.values);
+                const columns = blocks.map((values, c) => table.encoding[c] === 'dict'
+                    ? values.map(i => (i >= 0 ? strings[i] : null))
+                    : values);
+                const rows = new Array(table.length);
+                for (let r = 0; r < table.length; r++) {
+                    const record = {};
+                    for (let c = 0; c < table.columns.length; c++) {
+                        record[table.columns[c]] = columns[c][r];
+                    }
+                    rows[r] = record;
+                }
+                data[name] = rows;
+            }
+            return data;
+        }
+"""
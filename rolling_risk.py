@@ -0,0 +1,104 @@
+"""
+Rolling Risk
+
+This module computes rolling-window risk statistics for many return series at once.
+
+Returns are laid out as a (period x series) matrix. Sums over every trailing window come
+from one cumulative sum per statistic (the window sum is the difference of two cumulative
+sums), so volatility, downside deviation and the Sharpe and Sortino ratios cost the same
+for any window length. Maximum drawdown needs the running peak inside each window: it steps
+through the offsets of a window over cumulative log wealth, updating a running peak and
+drawdown for every window at once, in blocks of series so memory stays bounded (two
+windows x block arrays) for security-level matrices and long histories.
+"""
+
+import numpy as np
+
+
+PERIODS_PER_YEAR = 4
+
+# Series processed per block by the drawdown kernel
+DEFAULT_BLOCK_SIZE = 4096
+
+RISK_STATISTICS = ('Return', 'Volatility', 'Downside_Deviation', 'Max_Drawdown', 'Sharpe', 'Sortino')
+
+
+def rolling_sum(values, window):
+    """Sum of every trailing window along axis 0 (NaN for the first window - 1 rows)."""
+    result = np.full(values.shape, np.nan)
+    if len(values) < window:
+        return result
+    totals = np.cumsum(values, axis=0)
+    result[window - 1] = totals[window - 1]
+    result[window:] = totals[window:] - totals[:-window]
+    return result
+
+
+def rolling_max_drawdown(returns, window, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Largest peak-to-trough loss (a negative fraction) inside every trailing window.
+
+    The wealth path of a window starts at 1 just before its first return.
+    NaN returns count as flat; mask incomplete windows separately.
+    """
+    periods, series = returns.shape
+    result = np.full(returns.shape, np.nan)
+    if periods < window:
+        return result
+    growth = np.log1p(np.maximum(np.nan_to_num(returns), -1 + 1e-12))
+    log_wealth = np.vstack([np.zeros((1, series)), np.cumsum(growth, axis=0)])
+    windows = periods - window + 1
+    for start in range(0, series, block_size):
+        block = log_wealth[:, start:start + block_size]
+        # Row i of each array tracks the window whose wealth path is block[i:i + window + 1]
+        peak = block[:windows].copy()
+        drawdown = np.zeros_like(peak)
+        step = np.empty_like(peak)
+        for offset in range(1, window + 1):
+            wealth = block[offset:offset + windows]
+            np.maximum(peak, wealth, out=peak)
+            np.subtract(wealth, peak, out=step)
+            np.minimum(drawdown, step, out=drawdown)
+        result[window - 1:, start:start + block_size] = np.expm1(drawdown)
+    return result
+
+
+def rolling_risk(returns, window, periods_per_year=PERIODS_PER_YEAR, risk_free_rate=0.0,
+                 block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Rolling risk statistics of a (period x series) matrix of periodic returns (fractions).
+
+    Returns {statistic: matrix} for RISK_STATISTICS, aligned with the last
+    period of each window and NaN wherever the window is incomplete (fewer
+    than window periods, or a missing return inside it). Return is the
+    compounded window return; Volatility and Downside_Deviation (below the
+    per-period risk-free rate) are annualized; Sharpe and Sortino divide the
+    annualized mean excess return by them.
+    """
+    returns = np.asarray(returns, dtype=float)
+    if returns.ndim == 1:
+        returns = returns[:, None]
+    target = risk_free_rate / periods_per_year
+    valid = ~np.isnan(returns)
+    values = np.where(valid, returns, 0.0)
+    excess = np.where(valid, returns - target, 0.0)
+
+    complete = rolling_sum(valid.astype(float), window) == window
+    mean = rolling_sum(values, window) / window
+    mean_square = rolling_sum(values ** 2, window) / window
+    downside_square = rolling_sum(np.minimum(excess, 0.0) ** 2, window) / window
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Sample variance from the window's first and second moments
+        variance = np.maximum(mean_square - mean ** 2, 0.0) * window / (window - 1) if window > 1 else np.nan
+        volatility = np.sqrt(variance * periods_per_year)
+        downside = np.sqrt(downside_square * periods_per_year)
+        annual_excess = (mean - target) * periods_per_year
+        statistics = {
+            'Return': np.expm1(rolling_sum(np.log1p(np.maximum(values, -1 + 1e-12)), window)),
+            'Volatility': volatility,
+            'Downside_Deviation': downside,
+            'Max_Drawdown': rolling_max_drawdown(returns, window, block_size),
+            'Sharpe': np.where(volatility > 0, annual_excess / volatility, np.nan),
+            'Sortino': np.where(downside > 0, annual_excess / downside, np.nan)
+        }
+    return {name: np.where(complete, matrix, np.nan) for name, matrix in statistics.items()}
@@ -4,20 +4,57 @@ Runner Script for Dashboard
 Behavior on Windows:
 - User double-clicks this script (or the packaged EXE, which I developed but did not include in the Resent Email).
 - A native Windows "Open File" dialog appears (via PowerShell + .NET).
-- User selects an Excel workbook. Note that Worksheet name must be: FRL_Portfolio
+- User selects an Excel workbook (or a CSV / Parquet export). The worksheet read is
+  FRL_Portfolio unless --sheet names another one.
 - The script generates 'alternatives_dashboard.html'.
 - The dashboard opens automatically in the default browser.
 
 Behavior on non-Windows (like Linux or Mac):
-- Falls back to asking for an Excel path in the console.
+- Falls back to asking for a portfolio file path in the console.
+
+Batch mode (any OS):
+- python run_dashboard.py --batch <folder or manifest.txt> [--output-dir dashboards] [--workers N]
+- Builds one dashboard per workbook in parallel and writes a batch_summary.json.
+
+Run metrics (any OS):
+- --metrics-json run.json / --metrics-prom dashboard.prom write per-stage timings, row counts
+  and (with --track-memory) memory peaks; --profile STAGE runs a stage under cProfile.
+
+Server mode (any OS):
+- python run_dashboard.py --serve [--port 8050] serves the dashboard and JSON endpoints
+  (/api/composition, /api/trends, ...) from memory at http://127.0.0.1:8050/.
+
+Watch mode (any OS):
+- python run_dashboard.py --watch <workbook or folder> rebuilds the dashboard(s) whenever the
+  workbook is saved, re-aggregating only the quarters that changed.
+
+Large workbooks (any OS):
+- --engine stream reads Excel workbooks with the streaming reader instead of openpyxl
+  (several times faster, same results).
+- --compact stores the dimension columns as categoricals, cutting the memory they take.
+- --copy-free orders the rows by segment as they load, so the Alternatives / Non-Alternatives
+  split shares the loaded frame instead of copying it.
+- --memory-limit MB reads the workbook in bounded chunks and keeps only the asset class sums,
+  for portfolios too large to load as one DataFrame (IRR, NAV validation and the security
+  drilldown need individual positions and are left out).
+
+Input formats (any OS):
+- CSV (.csv / .tsv, optionally compressed) and Parquet files are read natively; the format
+  is detected from the extension, or from the file's first bytes.
+- --sheet NAME reads another worksheet of an Excel workbook; --start-date / --end-date keep
+  only the quarters in that range (Parquet files skip the row groups outside it unread).
 """
 
+import argparse
+import multiprocessing
 import os
 import sys
 import webbrowser
 import subprocess
 
-from dashboard_generator import main  # main(file_path=..., output_path=...)
+from dashboard_generator import main, generate_batch, engine_options  # main(file_path=..., output_path=...)
+from dashboard_server import serve
+from dashboard_watcher import watch
 
 
 def select_excel_file_windows() -> str:
@@ -29,8 +66,8 @@ def select_excel_file_windows() -> str:
     ps_script = r'''
 Add-Type -AssemblyName System.Windows.Forms | Out-Null
 $ofd = New-Object System.Windows.Forms.OpenFileDialog
-$ofd.Filter = "Excel files (*.xlsx;*.xls)|*.xlsx;*.xls|All files (*.*)|*.*"
-$ofd.Title = "Select portfolio Excel file"
+$ofd.Filter = "Portfolio files (*.xlsx;*.xls;*.csv;*.parquet)|*.xlsx;*.xls;*.csv;*.parquet|All files (*.*)|*.*"
+$ofd.Title = "Select portfolio file"
 $null = $ofd.ShowDialog()
 $ofd.FileName
 '''
@@ -70,8 +107,8 @@ def select_excel_file() -> str:
         return select_excel_file_windows()
     else:
         print("\nNon-Windows OS detected.")
-        print("Please enter the full path to the portfolio Excel file.")
-        excel_path = input("Excel file path: ").strip()
+        print("Please enter the full path to the portfolio file (Excel, CSV or Parquet).")
+        excel_path = input("Portfolio file path: ").strip()
         if not excel_path:
             print("No file provided. Exiting.")
             sys.exit(1)
@@ -82,7 +119,94 @@ def select_excel_file() -> str:
         return excel_path
 
 
+def parse_args(argv=None):
+    """Parse optional command-line flags; no flags means the interactive flow."""
+    parser = argparse.ArgumentParser(description="Generate the Alternatives portfolio dashboard.")
+    parser.add_argument("--batch", metavar="SOURCE",
+                        help="folder of workbooks or manifest file (one path per line) to process in parallel")
+    parser.add_argument("--output-dir", default="dashboards",
+                        help="where batch dashboards are written (default: dashboards)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes for batch mode (default: CPU count)")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="write per-stage run metrics (time, CPU, rows, memory) as JSON")
+    parser.add_argument("--metrics-prom", metavar="PATH",
+                        help="write run metrics as a Prometheus textfile-collector file (*.prom)")
+    parser.add_argument("--track-memory", action="store_true",
+                        help="record tracemalloc peak memory for every stage")
+    parser.add_argument("--profile", metavar="STAGE", action="append",
+                        help="run STAGE under cProfile (repeatable; 'all' profiles every stage)")
+    parser.add_argument("--payload-compression", choices=("auto", "on", "off"), default="auto",
+                        help="deflate-compress the data embedded in the HTML (default: auto, by size)")
+    parser.add_argument("--gzip", action="store_true",
+                        help="also write a gzip-compressed copy of the dashboard (.html.gz)")
+    parser.add_argument("--serve", action="store_true",
+                        help="serve the dashboard and its JSON API from a local web server instead of writing a file")
+    parser.add_argument("--host", default="127.0.0.1", help="server address for --serve (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8050, help="server port for --serve (default: 8050)")
+    parser.add_argument("--watch", metavar="SOURCE",
+                        help="workbook or folder to watch; dashboards are rebuilt whenever it changes")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="watch mode polling interval in seconds (default: 1)")
+    parser.add_argument("--debounce", type=float, default=2.0,
+                        help="watch mode quiet period before rebuilding after a save (default: 2)")
+    parser.add_argument("--taxonomy", metavar="PATH", default=None,
+                        help="asset class taxonomy mapping file (default: taxonomy.json)")
+    parser.add_argument("--engine", choices=("openpyxl", "stream"), default=None,
+                        help="Excel reader: openpyxl, or the faster streaming reader (default: openpyxl)")
+    parser.add_argument("--memory-limit", metavar="MB", type=float, default=None,
+                        help="read the workbook in chunks, keeping the read under MB megabytes "
+                             "(for workbooks too large to load whole)")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the Entity, Security and Asset_Class columns as categoricals to save memory")
+    parser.add_argument("--copy-free", action="store_true",
+                        help="order rows by segment on load so the Alternatives split slices instead of copying")
+    parser.add_argument("--sheet", metavar="NAME", default=None,
+                        help="worksheet to read from Excel workbooks (default: FRL_Portfolio)")
+    parser.add_argument("--start-date", metavar="YYYY-MM-DD", default=None,
+                        help="ignore quarters before this date")
+    parser.add_argument("--end-date", metavar="YYYY-MM-DD", default=None,
+                        help="ignore quarters after this date")
+    args = parser.parse_args(argv)
+    if args.engine and args.memory_limit:
+        parser.error("--engine cannot be combined with --memory-limit, which uses the chunked reader")
+    args.memory_limit = int(args.memory_limit * 1e6) if args.memory_limit else None
+    args.date_range = (args.start_date, args.end_date) if args.start_date or args.end_date else None
+    return args
+
+
+def run_batch(args):
+    """Run batch mode and exit non-zero if any workbook failed."""
+    if not os.path.exists(args.batch):
+        raise FileNotFoundError(f"Batch source does not exist:\n    {args.batch}")
+    summary = generate_batch(args.batch, output_dir=args.output_dir, workers=args.workers,
+                             taxonomy=args.taxonomy, engine=args.engine,
+                             memory_limit=args.memory_limit, sheet_name=args.sheet, date_range=args.date_range,
+                             compact=args.compact, copy_free=args.copy_free)
+    sys.exit(1 if summary['failed'] else 0)
+
+
 if __name__ == "__main__":
+    # Needed for worker processes when running as a packaged Windows EXE
+    multiprocessing.freeze_support()
+    args = parse_args()
+    if args.batch:
+        try:
+            run_batch(args)
+        except FileNotFoundError as e:
+            print(f"\nError: {e}")
+            sys.exit(1)
+
+    if args.watch:
+        if not os.path.exists(args.watch):
+            print(f"\nError: Watch source does not exist:\n    {args.watch}")
+            sys.exit(1)
+        watch(args.watch, output_dir=args.output_dir, interval=args.interval, debounce=args.debounce,
+              gzip_copy=args.gzip, taxonomy=args.taxonomy, engine=args.engine,
+              memory_limit=args.memory_limit, sheet_name=args.sheet, date_range=args.date_range,
+              compact=args.compact, copy_free=args.copy_free)
+        sys.exit(0)
+
     try:
         print("\nStarting Fortitude Re Alternatives Portfolio Dashboard Generator...")
         print("-" * 60)
@@ -91,11 +215,30 @@ if __name__ == "__main__":
         excel_path = select_excel_file()
         print(f"\nSelected file:\n    {excel_path}")
 
+        # 2a. Server mode: keep the data in memory and serve it until Ctrl+C
+        if args.serve:
+            serve(excel_path, host=args.host, port=args.port,
+                  processor_options={'taxonomy': args.taxonomy, 'sheet_name': args.sheet,
+                                     'date_range': args.date_range, 'compact': args.compact,
+                                     'copy_free': args.copy_free,
+                                     **engine_options(args.engine, args.memory_limit)},
+                  payload_compression=args.payload_compression)
+            sys.exit(0)
+
         # 2. Generate the dashboard
         output_html = "alternatives_dashboard.html"
 
         # This main function call is from dashboard_generator, which then calls data_processor
-        main(file_path=excel_path, output_path=output_html)
+        profile_stages = args.profile
+        if profile_stages and 'all' in profile_stages:
+            profile_stages = True
+        main(file_path=excel_path, output_path=output_html,
+             metrics_json=args.metrics_json, metrics_prom=args.metrics_prom,
+             track_memory=args.track_memory, profile_stages=profile_stages,
+             payload_compression=args.payload_compression,
+             gzip_copy=args.gzip, taxonomy=args.taxonomy, engine=args.engine,
+             memory_limit=args.memory_limit, sheet_name=args.sheet, date_range=args.date_range,
+             compact=args.compact, copy_free=args.copy_free)
 
         # 3. Open the HTML dashboard in the default browser
         html_full_path = os.path.abspath(output_html)
@@ -0,0 +1,290 @@
+"""
+Run Metrics
+
+This module records what each pipeline stage costs.
+
+Every stage (load, classify, each aggregation, export, render, save) is timed for wall
+and CPU time, tagged with the number of rows it handled and, when memory tracking is
+on, the tracemalloc peak it reached. Individual stages can also be run under cProfile.
+The run report can be written as JSON or as a Prometheus textfile-collector file so a
+scheduler can alert on regressions. Progress messages go through log() instead of print.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class RunMetrics:
+    """Collect per-stage timings, row counts and memory peaks for one pipeline run."""
+
+    def __init__(self, name='dashboard', track_memory=False, profile_stages=None, profile_dir=None,
+                 echo=True):
+        """
+        Initialize an empty run report.
+
+        profile_stages is a collection of stage names to run under cProfile
+        (True profiles every stage); .prof files go to profile_dir.
+        echo=False keeps log() messages out of stdout.
+        """
+        self.name = name
+        self.track_memory = track_memory
+        self.profile_stages = profile_stages
+        self.profile_dir = profile_dir or os.path.join(tempfile.gettempdir(), 'dashboard_profiles')
+        self.echo = echo
+        self.started = datetime.now()
+        self.finished = None
+        self.success = None
+        self.stages = []
+        self.messages = []
+        self._local = threading.local()
+        self._started_tracing = False
+        self._wall_start = time.perf_counter()
+
+    @property
+    def _active(self):
+        """The stack of open stages of the calling thread (threads of a server time their own stages)."""
+        if not hasattr(self._local, 'active'):
+            self._local.active = []
+        return self._local.active
+
+    def reset(self):
+        """Forget every recorded stage and message and start a new run (e.g. per server reload)."""
+        self.started = datetime.now()
+        self.finished = None
+        self.success = None
+        self.stages = []
+        self.messages = []
+        self._wall_start = time.perf_counter()
+
+    def log(self, message):
+        """Record a progress message (and print it unless echo is off)."""
+        self.messages.append({'time': datetime.now().isoformat(timespec='seconds'), 'message': message})
+        if self.echo:
+            print(message)
+
+    def _should_profile(self, name):
+        """True if the stage was opted in to cProfile."""
+        if self.profile_stages is True:
+            return True
+        return bool(self.profile_stages) and name in self.profile_stages
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Measure the enclosed block as one stage; yields its record.
+
+        Stages may nest (e.g. aggregations inside export_to_json); each record
+        keeps its parent's name and the outer stage's memory peak includes
+        everything run inside it.
+        """
+        record = {'stage': name, 'parent': self._active[-1]['stage'] if self._active else None,
+                  'rows': rows, 'started': datetime.now().isoformat(timespec='milliseconds')}
+
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            # Fold the enclosing stage's peak so far into its running maximum before resetting
+            if self._active:
+                parent = self._active[-1]
+                parent['_peak_abs'] = max(parent['_peak_abs'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            record['_baseline'] = tracemalloc.get_traced_memory()[0]
+            record['_peak_abs'] = record['_baseline']
+
+        profiler = cProfile.Profile() if self._should_profile(name) else None
+        self._active.append(record)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+            record['status'] = 'ok'
+        except BaseException as e:
+            record['status'] = 'failed'
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_seconds'] = time.perf_counter() - wall_start
+            record['cpu_seconds'] = time.process_time() - cpu_start
+            self._active.pop()
+
+            if self.track_memory:
+                peak_abs = max(record.pop('_peak_abs'), tracemalloc.get_traced_memory()[1])
+                record['peak_bytes'] = int(peak_abs - record.pop('_baseline'))
+                if self._active:
+                    parent = self._active[-1]
+                    parent['_peak_abs'] = max(parent['_peak_abs'], peak_abs)
+                elif self._started_tracing:
+                    tracemalloc.stop()
+                    self._started_tracing = False
+
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                stamp = self.started.strftime('%Y%m%d_%H%M%S')
+                path = os.path.join(self.profile_dir, f"{self.name}_{stamp}_{name}_{len(self.stages)}.prof")
+                profiler.dump_stats(path)
+                record['profile_path'] = path
+
+            self.stages.append(record)
+
+    def set_rows(self, rows):
+        """Set the row count of the innermost active stage."""
+        if self._active:
+            self._active[-1]['rows'] = int(rows)
+
+    def annotate(self, **values):
+        """Attach extra values (e.g. held_bytes) to the innermost active stage."""
+        if self._active:
+            self._active[-1].update(values)
+
+    def finish(self, success=True):
+        """Mark the run as finished."""
+        self.finished = datetime.now()
+        self.success = success
+        return self
+
+    def get_stage(self, name):
+        """Return the most recent record for a stage name, or None."""
+        for record in reversed(self.stages):
+            if record['stage'] == name:
+                return record
+        return None
+
+    def to_dict(self):
+        """Return the run report as a JSON-serializable dict."""
+        return {
+            'run': self.name,
+            'started': self.started.isoformat(timespec='seconds'),
+            'finished': self.finished.isoformat(timespec='seconds') if self.finished else None,
+            'success': self.success,
+            'total_wall_seconds': time.perf_counter() - self._wall_start,
+            'track_memory': self.track_memory,
+            'stages': self.stages,
+            'messages': self.messages
+        }
+
+    def write_json(self, path):
+        """Write the run report as JSON."""
+        _atomic_write(path, json.dumps(self.to_dict(), indent=2, default=str))
+        return path
+
+    def to_prometheus(self, labels=None, prefix='dashboard'):
+        """
+        Render the report in Prometheus text exposition format.
+
+        Repeated stages are summed (times, calls) or maxed (rows, peak bytes)
+        so every series appears once.
+        """
+        labels = dict(labels or {})
+        labels.setdefault('run', self.name)
+
+        totals = {}
+        for record in self.stages:
+            entry = totals.setdefault(record['stage'], {'wall': 0.0, 'cpu': 0.0, 'calls': 0,
+                                                        'rows': None, 'peak': None, 'failed': 0})
+            entry['wall'] += record.get('wall_seconds', 0.0)
+            entry['cpu'] += record.get('cpu_seconds', 0.0)
+            entry['calls'] += 1
+            entry['failed'] += record.get('status') == 'failed'
+            if record.get('rows') is not None:
+                entry['rows'] = max(entry['rows'] or 0, record['rows'])
+            if record.get('peak_bytes') is not None:
+                entry['peak'] = max(entry['peak'] or 0, record['peak_bytes'])
+
+        def fmt(extra=None):
+            merged = dict(labels, **(extra or {}))
+            body = ','.join(f'{_metric_name(k)}="{_escape_label(v)}"' for k, v in sorted(merged.items()))
+            return '{' + body + '}' if body else ''
+
+        lines = []
+
+        def family(metric, kind, help_text, samples):
+            if not samples:
+                return
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for extra, value in samples:
+                lines.append(f"{prefix}_{metric}{fmt(extra)} {value}")
+
+        stages = sorted(totals.items())
+        family('stage_wall_seconds', 'gauge', 'Wall-clock time spent in the stage.',
+               [({'stage': s}, f"{e['wall']:.6f}") for s, e in stages])
+        family('stage_cpu_seconds', 'gauge', 'Process CPU time spent in the stage.',
+               [({'stage': s}, f"{e['cpu']:.6f}") for s, e in stages])
+        family('stage_calls', 'gauge', 'Number of times the stage ran.',
+               [({'stage': s}, e['calls']) for s, e in stages])
+        family('stage_failures', 'gauge', 'Number of failed runs of the stage.',
+               [({'stage': s}, e['failed']) for s, e in stages])
+        family('stage_rows', 'gauge', 'Rows processed by the stage.',
+               [({'stage': s}, e['rows']) for s, e in stages if e['rows'] is not None])
+        family('stage_peak_bytes', 'gauge', 'tracemalloc peak allocated during the stage.',
+               [({'stage': s}, e['peak']) for s, e in stages if e['peak'] is not None])
+        family('run_success', 'gauge', '1 if the last run completed successfully.',
+               [(None, 1 if self.success else 0)])
+        family('run_wall_seconds', 'gauge', 'Wall-clock time of the whole run.',
+               [(None, f"{time.perf_counter() - self._wall_start:.6f}")])
+        family('run_timestamp_seconds', 'gauge', 'Unix time the run finished.',
+               [(None, f"{(self.finished or datetime.now()).timestamp():.0f}")])
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, labels=None):
+        """Write the report for the node_exporter textfile collector (atomically)."""
+        _atomic_write(path, self.to_prometheus(labels))
+        return path
+
+
+def instrumented(stage_name=None):
+    """
+    Decorator that runs a method as a metrics stage of self.metrics.
+
+    Methods of objects without a metrics attribute run unchanged.
+    """
+    def decorator(method):
+        name = stage_name or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = getattr(self, 'metrics', None)
+            if metrics is None:
+                return method(self, *args, **kwargs)
+            with metrics.stage(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _metric_name(name):
+    """Sanitise a label/metric name for Prometheus."""
+    return re.sub(r'[^a-zA-Z0-9_]', '_', str(name))
+
+
+def _escape_label(value):
+    """Escape a Prometheus label value."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _atomic_write(path, text):
+    """Write text to path via a temporary file and rename, so readers never see partial output."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
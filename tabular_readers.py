@@ -0,0 +1,245 @@
+"""
+Tabular Readers
+
+This module reads portfolio data from CSV and Parquet files and detects the input format.
+
+Warehouse exports arrive as CSV or Parquet, and converting them to Excel only to read them
+back is slow. CsvReader and ParquetReader mirror StreamingXlsxReader (same constructor,
+read() and iter_chunks()), so every format yields the same typed frame: the projected
+columns in the order requested, dates as datetime64, text as str and numbers as float64.
+CSV is parsed by pyarrow's multithreaded reader when it is installed (pandas' C parser
+otherwise), with the column types declared up front instead of inferred. Parquet is read
+column-projected, and row groups whose Date statistics fall outside the requested range
+are never decoded.
+"""
+
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    # Optional: needed for Parquet input and the multithreaded CSV parser
+    pa = pa_csv = pq = None
+
+
+EXCEL = 'excel'
+CSV = 'csv'
+PARQUET = 'parquet'
+FORMATS = (EXCEL, CSV, PARQUET)
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+CSV_EXTENSIONS = ('.csv', '.tsv')
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+# Compression suffixes pandas decompresses transparently (data.csv.gz is a CSV)
+_COMPRESSION_SUFFIXES = ('.gz', '.bz2', '.zip', '.xz', '.zst')
+
+# Every extension detect_format() recognises
+INPUT_EXTENSIONS = (EXCEL_EXTENSIONS + CSV_EXTENSIONS + PARQUET_EXTENSIONS
+                    + tuple(ext + suffix for ext in CSV_EXTENSIONS for suffix in _COMPRESSION_SUFFIXES))
+
+# Leading bytes of a Parquet file, an .xlsx / .xlsm zip archive and a legacy .xls file
+_PARQUET_MAGIC = b'PAR1'
+_ZIP_MAGIC = b'PK\x03\x04'
+_OLE_MAGIC = b'\xd0\xcf\x11\xe0'
+
+
+def detect_format(file_path):
+    """
+    Return the format of file_path (one of FORMATS).
+
+    The extension decides (ignoring a compression suffix); files with an
+    unknown extension are identified from their first bytes and read as
+    CSV when nothing else matches.
+    """
+    name = file_path.lower()
+    for suffix in _COMPRESSION_SUFFIXES:
+        if name.endswith(suffix) and name[:-len(suffix)].endswith(CSV_EXTENSIONS):
+            return CSV
+    if name.endswith(EXCEL_EXTENSIONS):
+        return EXCEL
+    if name.endswith(CSV_EXTENSIONS):
+        return CSV
+    if name.endswith(PARQUET_EXTENSIONS):
+        return PARQUET
+
+    with open(file_path, 'rb') as f:
+        magic = f.read(4)
+    if magic == _PARQUET_MAGIC:
+        return PARQUET
+    if magic in (_ZIP_MAGIC, _OLE_MAGIC):
+        return EXCEL
+    return CSV
+
+
+class _ProjectingReader:
+    """Column projection and typing shared by the CSV and Parquet readers."""
+
+    def __init__(self, file_path, date_columns=(), text_columns=(), numeric_columns=(),
+                 optional_columns=(), date_range=None):
+        """
+        Initialize the reader.
+
+        Only the listed columns are read: dates become datetime64, text
+        columns str and numeric columns float64. Columns named in
+        optional_columns are left out when the file lacks them instead of
+        raising. date_range ((start, end), either may be None) lets a reader
+        skip blocks that hold no dates in range; rows are not trimmed.
+        """
+        self.file_path = file_path
+        self.date_columns = list(date_columns)
+        self.text_columns = list(text_columns)
+        self.numeric_columns = list(numeric_columns)
+        self.optional_columns = set(optional_columns)
+        self.date_range = date_range
+
+    @property
+    def columns(self):
+        """Projected column names, in the order they were requested."""
+        return self.date_columns + self.text_columns + self.numeric_columns
+
+    def _project(self, available):
+        """The projected columns present in available; raise ValueError if a required one is missing."""
+        available = set(available)
+        missing = [col for col in self.columns if col not in available and col not in self.optional_columns]
+        if missing:
+            raise ValueError(f"{os.path.basename(self.file_path)} is missing required columns: {missing}")
+        return [col for col in self.columns if col in available]
+
+    def _typed(self, df):
+        """Put df's columns in projection order and give each its standard type."""
+        df = df[[col for col in self.columns if col in df.columns]]
+        types = {}
+        for col in df.columns:
+            if col in self.date_columns:
+                types[col] = 'datetime64[us]'
+            elif col in self.text_columns:
+                types[col] = 'str'
+            else:
+                types[col] = 'float64'
+        for col in self.date_columns:
+            if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col])
+        return df.astype(types)
+
+
+class CsvReader(_ProjectingReader):
+    """Read selected columns of a CSV file with declared column types."""
+
+    def read(self):
+        """Parse the file and return a DataFrame of the projected columns."""
+        options = self._options()
+        # pyarrow parses blocks of the file on every core (it cannot open .zip archives)
+        if pa_csv is not None and not self.file_path.lower().endswith('.zip'):
+            try:
+                return self._typed(self._read_arrow(options))
+            except pa.ArrowInvalid:
+                # A value the declared types reject, e.g. dates not in ISO format: let pandas parse it
+                pass
+        return self._typed(pd.read_csv(self.file_path, engine='c', **options))
+
+    def iter_chunks(self, chunk_rows):
+        """Parse the file as DataFrames of at most chunk_rows rows each."""
+        # Only the C parser can stop after chunk_rows rows
+        with pd.read_csv(self.file_path, engine='c', chunksize=chunk_rows, **self._options()) as chunks:
+            for chunk in chunks:
+                yield self._typed(chunk)
+
+    def _options(self):
+        """read_csv options projecting and typing the columns named in the header."""
+        sep = self._separator()
+        columns = self._project(pd.read_csv(self.file_path, nrows=0, sep=sep).columns)
+        dtype = {col: 'str' for col in columns if col in self.text_columns}
+        dtype.update({col: 'float64' for col in columns if col in self.numeric_columns})
+        return {
+            'sep': sep,
+            'usecols': columns,
+            'dtype': dtype,
+            'parse_dates': [col for col in columns if col in self.date_columns]
+        }
+
+    def _read_arrow(self, options):
+        """Parse the file with pyarrow, converting every column straight to its declared type."""
+        types = {}
+        for col in options['usecols']:
+            if col in self.date_columns:
+                types[col] = pa.timestamp('us')
+            elif col in self.text_columns:
+                types[col] = pa.string()
+            else:
+                types[col] = pa.float64()
+        table = pa_csv.read_csv(
+            self.file_path,
+            parse_options=pa_csv.ParseOptions(delimiter=options['sep']),
+            convert_options=pa_csv.ConvertOptions(column_types=types, include_columns=options['usecols'],
+                                                  strings_can_be_null=True)
+        )
+        return table.to_pandas()
+
+    def _separator(self):
+        """Tab for .tsv files, comma otherwise."""
+        name = self.file_path.lower()
+        for suffix in _COMPRESSION_SUFFIXES:
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+        return '\t' if name.endswith('.tsv') else ','
+
+
+class ParquetReader(_ProjectingReader):
+    """Read selected columns of a Parquet file, skipping row groups outside date_range."""
+
+    def read(self):
+        """Decode the kept row groups and return a DataFrame of the projected columns."""
+        parquet_file = self._open()
+        columns = self._project(parquet_file.schema_arrow.names)
+        table = parquet_file.read_row_groups(self._row_groups(parquet_file), columns=columns, use_threads=True)
+        return self._typed(table.to_pandas())
+
+    def iter_chunks(self, chunk_rows):
+        """Decode the kept row groups as DataFrames of at most chunk_rows rows each."""
+        parquet_file = self._open()
+        columns = self._project(parquet_file.schema_arrow.names)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, row_groups=self._row_groups(parquet_file),
+                                               columns=columns, use_threads=True):
+            yield self._typed(batch.to_pandas())
+
+    def _open(self):
+        """Open the file (its footer only; no data is decoded yet)."""
+        if pq is None:
+            raise ImportError("Reading Parquet files requires pyarrow (pip install pyarrow)")
+        return pq.ParquetFile(self.file_path)
+
+    def _row_groups(self, parquet_file):
+        """
+        Indices of the row groups that may hold dates inside date_range.
+
+        A group is skipped only when its min / max statistics for the first
+        date column lie wholly outside the range; groups without statistics
+        are kept.
+        """
+        metadata = parquet_file.metadata
+        groups = list(range(metadata.num_row_groups))
+        names = list(metadata.schema.names)
+        if not self.date_range or not self.date_columns or self.date_columns[0] not in names:
+            return groups
+        start, end = (pd.Timestamp(bound) if bound is not None else None for bound in self.date_range)
+        column = names.index(self.date_columns[0])
+
+        kept = []
+        for group in groups:
+            statistics = metadata.row_group(group).column(column).statistics
+            if statistics is None or not statistics.has_min_max:
+                kept.append(group)
+                continue
+            try:
+                low, high = pd.Timestamp(statistics.min), pd.Timestamp(statistics.max)
+            except (TypeError, ValueError):
+                kept.append(group)
+                continue
+            if (start is None or high >= start) and (end is None or low <= end):
+                kept.append(group)
+        return kept
@@ -0,0 +1,148 @@
+"""
+Asset Taxonomy
+
+This module maps asset classes onto a configurable, multi-level classification tree.
+
+The tree is read from a JSON mapping file (taxonomy.json by default), e.g.
+Alternatives -> Private Markets -> Private Equity or Fixed Income -> Structured -> CLOs.
+Every asset class is a leaf with one path of ancestors, and the top-level segments listed
+under "alternatives" define what counts as an Alternatives investment. Rows are classified
+with a vectorized code lookup (each distinct asset class is looked up once), and
+aggregates can be rolled up to every level of the tree in one pass over the cube.
+Asset classes missing from the mapping are reported as unclassified.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'taxonomy.json')
+
+# Name of the leaf level and the label of asset classes missing from the mapping
+LEAF_LEVEL = 'Asset_Class'
+UNCLASSIFIED = 'Unclassified'
+
+
+class AssetTaxonomy:
+    """A classification tree whose leaves are asset classes."""
+
+    def __init__(self, levels, paths, alternatives, source=None):
+        """
+        Initialize from the ancestor level names, {asset_class: ancestor path}
+        and the top-level segments that count as Alternatives.
+        """
+        if not levels:
+            raise ValueError("A taxonomy needs at least one level above the asset class")
+        self.levels = list(levels)
+        self.alternatives = set(alternatives)
+        self.source = source
+        for asset_class, path in paths.items():
+            if len(path) != len(self.levels):
+                raise ValueError(f"Taxonomy path of '{asset_class}' has {len(path)} levels, "
+                                 f"expected {len(self.levels)} ({', '.join(self.levels)})")
+        self.leaves = pd.Index(sorted(paths), name=LEAF_LEVEL)
+        self.paths = np.array([paths[leaf] for leaf in self.leaves], dtype=object).reshape(len(self.leaves), -1)
+        self.is_alternative = np.array([paths[leaf][0] in self.alternatives for leaf in self.leaves], dtype=bool)
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        Read a mapping file.
+
+        The file holds "levels" (the ancestor level names, top first),
+        "alternatives" (the top-level segments that are Alternatives) and
+        "tree", nested objects whose innermost values are lists of asset classes.
+        A file that does not follow this layout raises ValueError naming the problem.
+        """
+        path = path or DEFAULT_TAXONOMY_PATH
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                spec = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Taxonomy {path} is not valid JSON: {e}") from e
+        levels, tree = (spec.get('levels'), spec.get('tree')) if isinstance(spec, dict) else (None, None)
+        if not isinstance(levels, list) or not isinstance(tree, dict):
+            raise ValueError(f"Taxonomy {path} needs a \"levels\" list and a \"tree\" object")
+        paths = {}
+
+        def walk(node, ancestors):
+            if isinstance(node, dict):
+                for name, child in node.items():
+                    walk(child, ancestors + (name,))
+                return
+            if not isinstance(node, list) or not all(isinstance(asset_class, str) for asset_class in node):
+                raise ValueError(f"Taxonomy {path}: '{' / '.join(ancestors)}' must be an object or "
+                                 f"a list of asset class names, got {json.dumps(node)}")
+            for asset_class in node:
+                if asset_class in paths:
+                    raise ValueError(f"Asset class '{asset_class}' appears twice in taxonomy {path}")
+                paths[asset_class] = ancestors
+
+        walk(tree, ())
+        alternatives = spec.get('alternatives', [])
+        unknown = sorted(set(alternatives) - set(tree))
+        if unknown:
+            raise ValueError(f"Taxonomy {path} lists alternatives segments missing from its tree: {unknown}")
+        return cls(levels, paths, alternatives, source=path)
+
+    @property
+    def alternatives_classes(self):
+        """The asset classes under an Alternatives segment."""
+        return set(self.leaves[self.is_alternative])
+
+    @property
+    def all_levels(self):
+        """Every level name, top first, ending with the asset class leaf."""
+        return self.levels + [LEAF_LEVEL]
+
+    def codes(self, asset_class):
+        """
+        Leaf code of every value of asset_class (-1 when unclassified).
+
+        Categorical columns are classified through their dictionary, other
+        columns through one hash lookup per distinct value.
+        """
+        if isinstance(asset_class.dtype, pd.CategoricalDtype):
+            category_codes = self.leaves.get_indexer(asset_class.cat.categories)
+            codes = asset_class.cat.codes.to_numpy()
+            return np.where(codes >= 0, category_codes[codes], -1)
+        values, uniques = pd.factorize(asset_class)
+        unique_codes = self.leaves.get_indexer(uniques)
+        return np.where(values >= 0, unique_codes[values], -1)
+
+    def classify(self, asset_class):
+        """Return a frame with one column per ancestor level for asset_class (Unclassified if unknown)."""
+        codes = self.codes(asset_class)
+        known = codes >= 0
+        frame = {}
+        for depth, level in enumerate(self.levels):
+            column = np.full(len(codes), UNCLASSIFIED, dtype=object)
+            column[known] = self.paths[codes[known], depth]
+            frame[level] = column
+        return pd.DataFrame(frame, index=asset_class.index)
+
+    def rollup(self, cube, keys, measures):
+        """
+        Aggregate cube (one row per keys + Asset_Class) to every level of the tree.
+
+        Returns one row per keys, level and node, with the node's Parent and
+        the summed measures; Asset_Class rows are included as the leaf level.
+        """
+        levels = self.classify(cube[LEAF_LEVEL])
+        frame = pd.concat([cube[keys + measures].reset_index(drop=True),
+                           levels.reset_index(drop=True),
+                           cube[LEAF_LEVEL].astype(object).rename(LEAF_LEVEL).reset_index(drop=True)], axis=1)
+        rollups = []
+        path = []
+        for level in self.all_levels:
+            parent = path[-1] if path else None
+            path.append(level)
+            grouped = frame.groupby(keys + path, sort=True)[measures].sum().reset_index()
+            grouped.insert(len(keys), 'Level', level)
+            grouped.insert(len(keys) + 1, 'Node', grouped[level])
+            grouped.insert(len(keys) + 2, 'Parent', grouped[parent] if parent else None)
+            rollups.append(grouped.drop(columns=path))
+        return pd.concat(rollups, ignore_index=True)
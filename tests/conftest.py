@@ -0,0 +1,71 @@
+"""Shared fixtures: the baseline full load of example.xlsx that the fast paths are compared against."""
+
+import math
+import os
+
+import pandas as pd
+import pytest
+
+from data_processor import PortfolioDataProcessor
+
+
+EXAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example.xlsx')
+
+
+def load_example(path=EXAMPLE_PATH, **options):
+    """Load and classify a portfolio quietly, without touching the on-disk cache."""
+    processor = PortfolioDataProcessor(path, use_cache=False, **options)
+    processor.metrics.echo = False
+    processor.load_data()
+    processor.classify_investments()
+    return processor
+
+
+def export(processor):
+    """export_to_json() without the generation timestamp."""
+    data = processor.export_to_json()
+    data['metadata'].pop('generated_date')
+    return data
+
+
+def assert_close(actual, expected, path='', rel_tol=1e-9, abs_tol=1e-6):
+    """Assert two exported values are equal, floats within tolerance."""
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict) and set(actual) == set(expected), path
+        for key in expected:
+            assert_close(actual[key], expected[key], f"{path}.{key}", rel_tol, abs_tol)
+    elif isinstance(expected, list):
+        assert isinstance(actual, list) and len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            assert_close(a, e, f"{path}[{i}]", rel_tol, abs_tol)
+    elif isinstance(expected, float) or isinstance(actual, float):
+        assert actual is not None and expected is not None, f"{path}: {actual!r} != {expected!r}"
+        assert math.isclose(actual, expected, rel_tol=rel_tol, abs_tol=abs_tol), f"{path}: {actual} != {expected}"
+    else:
+        assert actual == expected, f"{path}: {actual!r} != {expected!r}"
+
+
+@pytest.fixture(scope='session')
+def example_frame():
+    """example.xlsx as pandas reads it (the baseline reader)."""
+    df = pd.read_excel(EXAMPLE_PATH, sheet_name=PortfolioDataProcessor.SHEET_NAME, engine='openpyxl')
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+@pytest.fixture(scope='session')
+def baseline():
+    """The full openpyxl load of example.xlsx."""
+    return load_example(engine='openpyxl')
+
+
+@pytest.fixture(scope='session')
+def baseline_export(baseline):
+    """export_to_json() of the baseline load."""
+    return export(baseline)
+
+
+@pytest.fixture(scope='session')
+def baseline_drilldown(baseline):
+    """export_security_drilldown() of the baseline load."""
+    return baseline.export_security_drilldown()
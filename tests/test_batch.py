@@ -0,0 +1,36 @@
+"""Tests that a failing workbook in a batch is reported without stopping the others."""
+
+import json
+import os
+
+import pytest
+
+from dashboard_generator import generate_batch
+
+from .conftest import EXAMPLE_PATH
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_bad_workbooks_are_isolated(tmp_path, workers):
+    corrupt = tmp_path / 'corrupt.xlsx'
+    corrupt.write_bytes(b'this is not a zip archive')
+    manifest = tmp_path / 'batch.txt'
+    manifest.write_text(f"{EXAMPLE_PATH},good.html\nmissing.xlsx,missing.html\ncorrupt.xlsx,corrupt.html\n",
+                        encoding='utf-8')
+    output_dir = tmp_path / 'out'
+
+    summary = generate_batch(str(manifest), output_dir=str(output_dir), workers=workers)
+
+    assert (summary['succeeded'], summary['failed']) == (1, 2)
+    good, missing, bad = summary['results']
+    assert good['status'] == 'ok' and good['records'] > 0
+    assert os.path.getsize(output_dir / 'good.html') > 0
+    assert os.path.isdir(output_dir / 'good_files')
+    for result in (missing, bad):
+        assert result['status'] == 'failed' and result['error']
+        assert not os.path.exists(result['output'])
+    assert missing['input'].endswith('missing.xlsx') and 'missing.xlsx' in missing['error']
+    assert bad['input'].endswith('corrupt.xlsx')
+
+    with open(output_dir / 'batch_summary.json', encoding='utf-8') as f:
+        assert json.load(f)['failed'] == 2
@@ -0,0 +1,66 @@
+"""Tests for the dashboard server's revalidation and its guarded reload endpoint."""
+
+import http.client
+import threading
+
+import pytest
+
+from dashboard_server import RELOAD_TOKEN_HEADER, DashboardApp, create_server
+from run_metrics import RunMetrics
+
+from .conftest import EXAMPLE_PATH
+
+
+@pytest.fixture(scope='module')
+def server():
+    """A server for example.xlsx on a free port, running in a background thread."""
+    app = DashboardApp(EXAMPLE_PATH, {'use_cache': False}, metrics=RunMetrics(echo=False)).load()
+    server = create_server(app, '127.0.0.1', 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, headers=None):
+    """Send one request and return (status, headers, body)."""
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=60)
+    try:
+        connection.request(method, path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.headers, response.read()
+    finally:
+        connection.close()
+
+
+def test_etag_revalidation_answers_304(server):
+    status, headers, body = _request(server, 'GET', '/api/metadata')
+    assert status == 200 and body
+    etag = headers['ETag']
+    assert etag
+
+    status, headers, body = _request(server, 'GET', '/api/metadata', {'If-None-Match': etag})
+    assert status == 304 and body == b''
+    assert headers['ETag'] == etag
+
+
+def test_reload_without_token_is_refused(server):
+    status, _, _ = _request(server, 'POST', '/api/reload')
+    assert status == 403
+
+
+def test_reload_from_another_origin_is_refused(server):
+    headers = {RELOAD_TOKEN_HEADER: server.app.reload_token, 'Origin': 'http://attacker.example'}
+    status, _, _ = _request(server, 'POST', '/api/reload', headers)
+    assert status == 403
+
+
+def test_reload_clears_cached_responses(server):
+    app = server.app
+    assert _request(server, 'GET', '/api/composition')[0] == 200
+    assert '/api/composition' in app._responses
+
+    status, _, _ = _request(server, 'POST', '/api/reload', {RELOAD_TOKEN_HEADER: app.reload_token})
+    assert status == 200
+    assert app._responses == {}
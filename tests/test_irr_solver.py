@@ -0,0 +1,63 @@
+"""Tests for the batched IRR solver against closed forms and a per-series reference solver."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from irr_solver import NO_SOLUTION, solve_irr, year_fractions
+
+
+def _reference_irr(amounts, times, low=-0.9999, high=100.0):
+    """IRR of one cash-flow series by plain bisection on its NPV."""
+    def npv(rate):
+        return float(np.sum(amounts / (1 + rate) ** times))
+    low_value = npv(low)
+    for _ in range(200):
+        mid = (low + high) / 2
+        mid_value = npv(mid)
+        if np.sign(mid_value) == np.sign(low_value):
+            low, low_value = mid, mid_value
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def test_closed_form_rates():
+    times = np.array([0.0, 1.0, 2.0])
+    amounts = np.array([
+        [-100.0, 110.0, 0.0],
+        [-100.0, 0.0, 121.0],
+        [-100.0, 50.0, 50.0],
+        [100.0, 10.0, 0.0]
+    ])
+    result = solve_irr(amounts, times)
+    assert result['irr'][:3] == pytest.approx([0.10, 0.10, 0.0], abs=1e-9)
+    assert result['converged'][:3].all()
+    # No money paid in: nothing to solve
+    assert np.isnan(result['irr'][3]) and result['method'][3] == NO_SOLUTION
+
+
+def test_pooled_returns_match_reference_solver(baseline):
+    history = baseline.get_security_history()
+    returns = baseline.get_money_weighted_returns()
+
+    # Rebuild every asset class's pooled cash flows row by row from the security history
+    quarters = history['Date'].dt.to_period('Q')
+    calendar = pd.period_range(quarters.min() - 1, quarters.max(), freq='Q')
+    times = year_fractions(calendar.end_time.normalize())
+    position = {period: i for i, period in enumerate(calendar)}
+    pooled = {}
+    for (asset_class, _), rows in history.assign(Quarter=quarters).groupby(['Asset_Class', 'Security'],
+                                                                            observed=True):
+        flows = pooled.setdefault(str(asset_class), np.zeros(len(calendar)))
+        rows = rows.sort_values('Date')
+        for row in rows.itertuples():
+            flows[position[row.Quarter]] += row.Distributions - row.Contributions
+        flows[position[rows['Quarter'].iloc[0]] - 1] -= rows['Beg_NAV'].iloc[0]
+        flows[position[rows['Quarter'].iloc[-1]]] += rows['End_NAV'].iloc[-1]
+
+    solved = returns[returns['Level'] == 'asset_class'].set_index('Asset_Class')['IRR']
+    for asset_class, flows in pooled.items():
+        assert solved[asset_class] == pytest.approx(_reference_irr(flows, times) * 100, abs=1e-6)
+    total = returns.loc[returns['Level'] == 'total', 'IRR'].iloc[0]
+    assert total == pytest.approx(_reference_irr(sum(pooled.values()), times) * 100, abs=1e-6)
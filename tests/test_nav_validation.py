@@ -0,0 +1,54 @@
+"""Tests for the vectorized NAV checks against a row-by-row pandas baseline."""
+
+import numpy as np
+import pandas as pd
+
+from nav_validation import (ABS_TOLERANCE, CONTINUITY, OPENING_BALANCE, QUARTER_GAP, REL_TOLERANCE,
+                            ROLL_FORWARD, validate_nav)
+
+
+def _breaks(expected, actual):
+    """Rows where actual differs from expected beyond the default tolerance (NaN breaks)."""
+    limit = ABS_TOLERANCE + REL_TOLERANCE * np.maximum(expected.abs(), actual.abs())
+    return ~((actual - expected).abs() <= limit)
+
+
+def _reference_counts(df):
+    """Exception counts of the roll-forward, continuity, gap and opening checks via groupby().shift()."""
+    df = df.sort_values(['Entity', 'Security', 'Date'], kind='stable')
+    expected_end = df['Beg_NAV'] + df['Contributions'] - df['Distributions'] + df['Net_Investment_Income']
+    if 'FX_Gain_Loss' in df.columns:
+        expected_end = expected_end + df['FX_Gain_Loss'].fillna(0)
+    positions = df.groupby(['Entity', 'Security'], sort=False)
+    prior_end = positions['End_NAV'].shift()
+    prior_quarter = positions['Date'].shift().dt.to_period('Q')
+    step = (df['Date'].dt.to_period('Q') - prior_quarter).map(lambda offset: offset.n if pd.notna(offset) else 0)
+    opening = prior_quarter.isna() & (df['Date'] > df['Date'].min())
+    return {
+        ROLL_FORWARD: int(_breaks(expected_end, df['End_NAV']).sum()),
+        CONTINUITY: int((_breaks(prior_end, df['Beg_NAV']) & (step == 1)).sum()),
+        QUARTER_GAP: int((step > 1).sum()),
+        OPENING_BALANCE: int((_breaks(pd.Series(0.0, index=df.index), df['Beg_NAV']) & opening).sum())
+    }
+
+
+def test_counts_match_groupby_baseline(example_frame, baseline):
+    _, summary = baseline.validate_nav()
+    counts = summary.set_index('Check')['Exceptions']
+    for check, expected in _reference_counts(example_frame).items():
+        assert counts[check] == expected, check
+
+
+def test_prior_quarters_continue_checks(example_frame):
+    """Checking only the last quarter, continuing from saved End_NAVs, flags the same rows as a full run."""
+    last = example_frame['Date'].max()
+    full, _ = validate_nav(example_frame, max_exceptions=len(example_frame))
+    prior = example_frame.loc[example_frame['Date'] < last, ['Entity', 'Security', 'Date', 'End_NAV']]
+    partial, summary = validate_nav(example_frame[example_frame['Date'] == last], prior=prior,
+                                    start_date=example_frame['Date'].min(), max_exceptions=len(example_frame))
+
+    keys = ['Check', 'Entity', 'Security']
+    expected = full[full['Date'] == last].sort_values(keys).reset_index(drop=True)
+    actual = partial.sort_values(keys).reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual[keys + ['Difference']], expected[keys + ['Difference']])
+    assert summary.set_index('Check').loc[ROLL_FORWARD, 'Checked'] == int((example_frame['Date'] == last).sum())
@@ -0,0 +1,100 @@
+"""Tests for the chunked engine: bounded-memory aggregation and agreement with a full load."""
+
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processor import PortfolioDataProcessor
+from out_of_core import ChunkedAggregator
+
+from .conftest import EXAMPLE_PATH, assert_close, export, load_example
+
+
+MEMORY_LIMIT = 4_000_000
+
+
+def _write_portfolio(path, entities, quarters=8, securities=250):
+    """Write a CSV portfolio in which every entity holds the same securities."""
+    dates = pd.date_range('2020-03-31', periods=quarters, freq='QE')
+    asset_classes = np.array(['Private Equity', 'Public Equity'])
+    grid = pd.MultiIndex.from_product([dates, range(entities), range(securities)],
+                                      names=['Date', 'Entity', 'Security']).to_frame(index=False)
+    rng = np.random.default_rng(7)
+    beg_nav = rng.uniform(1e5, 1e6, len(grid))
+    frame = pd.DataFrame({
+        'Date': grid['Date'].dt.strftime('%Y-%m-%d'),
+        'Entity': 'Entity_' + grid['Entity'].astype(str),
+        'Security': 'SEC' + grid['Security'].astype(str),
+        'Asset_Class': asset_classes[grid['Security'] % 2],
+        'Beg_NAV': beg_nav,
+        'Contributions': 0.0,
+        'Distributions': 0.0,
+        'Net_Investment_Income': beg_nav * 0.01,
+        'End_NAV': beg_nav * 1.02
+    })
+    frame.to_csv(path, index=False)
+    return path
+
+
+def _chunked_peak(path):
+    """tracemalloc peak (bytes) of loading path with the chunked engine, and the processor."""
+    processor = PortfolioDataProcessor(str(path), engine='chunked', memory_limit=MEMORY_LIMIT,
+                                       use_cache=False, metrics=None)
+    processor.metrics.echo = False
+    tracemalloc.start()
+    try:
+        processor.load_data()
+        processor.classify_investments()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak, processor
+
+
+def test_peak_memory_stays_flat_as_rows_double(tmp_path):
+    small_peak, small = _chunked_peak(_write_portfolio(tmp_path / 'small.csv', entities=20))
+    large_peak, large = _chunked_peak(_write_portfolio(tmp_path / 'large.csv', entities=40))
+
+    assert large.metrics.stages[0]['raw_records'] == 2 * small.metrics.stages[0]['raw_records']
+    assert len(large.security_pairs) == len(small.security_pairs)
+    # Rows double; the aggregate depends only on quarters, classes and securities
+    assert large_peak < small_peak * 1.15
+    assert large_peak < MEMORY_LIMIT
+
+
+def test_security_counts_are_exact(tmp_path):
+    _, processor = _chunked_peak(_write_portfolio(tmp_path / 'portfolio.csv', entities=3))
+    assert processor.cube['Num_Securities'].tolist() == [125] * len(processor.cube)
+    assert processor.cube['Records'].tolist() == [375] * len(processor.cube)
+
+
+def test_position_sections_are_unavailable(tmp_path):
+    _, processor = _chunked_peak(_write_portfolio(tmp_path / 'portfolio.csv', entities=2))
+    data = processor.export_to_json()
+    assert set(data['metadata']['unavailable_sections']) == set(PortfolioDataProcessor.POSITION_SECTIONS)
+    assert data['money_weighted_returns']['data'] == [] and data['nav_validation']['data'] == []
+    assert processor.export_security_drilldown() == {}
+    with pytest.raises(ValueError):
+        processor.get_security_history()
+
+
+def test_aggregate_over_limit_raises_memory_error():
+    aggregator = ChunkedAggregator(['Key'], ['Value'], distinct='Item', memory_limit=100_000)
+    chunk = pd.DataFrame({'Key': np.arange(20_000), 'Value': 1.0, 'Item': 'a'})
+    with pytest.raises(MemoryError):
+        aggregator.add(chunk)
+        aggregator.result()
+
+
+def test_chunked_engine_matches_full_load(baseline_export):
+    processor = load_example(EXAMPLE_PATH, engine='chunked', memory_limit=8_000_000)
+    data = export(processor)
+    position_sections = ('money_weighted_returns', 'nav_validation', 'nav_exceptions')
+    assert set(data['metadata'].pop('unavailable_sections')) == set(PortfolioDataProcessor.POSITION_SECTIONS)
+    expected = dict(baseline_export, metadata=dict(baseline_export['metadata']))
+    expected['metadata'].pop('unavailable_sections')
+    data = {key: value for key, value in data.items() if key not in position_sections}
+    expected = {key: value for key, value in expected.items() if key not in position_sections}
+    assert_close(data, expected)
@@ -0,0 +1,35 @@
+"""Tests for the columnar payload encoding round trip."""
+
+import json
+
+import pytest
+
+from payload_codec import (decode_payload, encode_payload, is_column_table, payload_script_literal, table_length,
+                           table_records)
+
+
+@pytest.mark.parametrize('compression', ['on', 'off'])
+def test_export_round_trips(baseline_export, compression):
+    payload = json.loads(json.dumps(encode_payload(baseline_export, compression)))
+    assert decode_payload(payload) == baseline_export
+
+
+@pytest.mark.parametrize('compression', ['on', 'off'])
+def test_drilldown_shards_round_trip(baseline_drilldown, compression):
+    for shard in baseline_drilldown.values():
+        assert decode_payload(encode_payload(shard, compression)) == shard
+
+
+def test_record_view_matches_columns(baseline_export):
+    table = baseline_export['composition']
+    assert is_column_table(table)
+    records = table_records(table)
+    assert len(records) == table_length(table)
+    for i, name in enumerate(table['columns']):
+        assert [record[name] for record in records] == table['data'][i]
+
+
+def test_script_literal_cannot_close_the_script_element():
+    literal = payload_script_literal({'objects': {'note': '</script><script>alert(1)</script>'}})
+    assert '</' not in literal
+    assert json.loads(literal)['objects']['note'] == '</script><script>alert(1)</script>'
@@ -0,0 +1,78 @@
+"""Tests that refresh() over saved state reproduces a full load."""
+
+import pandas as pd
+
+from data_processor import PortfolioDataProcessor
+from nav_validation import validate_nav
+
+from .conftest import assert_close, export, load_example
+
+
+# Sections that describe the validation scope rather than the portfolio
+VALIDATION_SECTIONS = ('nav_validation', 'nav_exceptions')
+
+
+def _without(data, sections):
+    """data without the given top-level sections."""
+    return {key: value for key, value in data.items() if key not in sections}
+
+
+def test_refresh_matches_full_load(example_frame, baseline, baseline_export, baseline_drilldown, tmp_path):
+    last = example_frame['Date'].max()
+    state_path = str(tmp_path / 'state.npz')
+    load_example(engine='stream', date_range=(None, last - pd.offsets.QuarterEnd())).save_state(state_path)
+
+    new_quarter = tmp_path / 'new_quarter.csv'
+    example_frame[example_frame['Date'] == last].to_csv(new_quarter, index=False)
+    processor = PortfolioDataProcessor(str(new_quarter), use_cache=False)
+    processor.metrics.echo = False
+    processor.load_data()
+    processor.refresh(state_path)
+
+    data = export(processor)
+    assert set(data['metadata'].pop('partial_sections')) == {'nav_validation'}
+    expected = dict(baseline_export, metadata=dict(baseline_export['metadata']))
+    expected['metadata'].pop('partial_sections')
+    assert_close(_without(data, VALIDATION_SECTIONS), _without(expected, VALIDATION_SECTIONS))
+    assert_close(processor.export_security_drilldown(), baseline_drilldown)
+
+    # The refreshed quarter is checked exactly as a full run checks it
+    full, _ = validate_nav(baseline.df, max_exceptions=len(baseline.df))
+    expected_counts = full[full['Date'] == last]['Check'].value_counts()
+    _, summary = processor.validate_nav()
+    for row in summary.itertuples():
+        assert row.Exceptions == expected_counts.get(row.Check, 0), row.Check
+
+
+def test_refresh_picks_up_fx_and_entity_corrections(example_frame, tmp_path):
+    """A quarter re-sent with only FX_Gain_Loss and Entity corrected is re-checked and re-saved."""
+    last = example_frame['Date'].max()
+    state_path = str(tmp_path / 'state.npz')
+    # Save the state from the same CSV reader the corrected quarter comes through, so no other column differs
+    full_csv = tmp_path / 'portfolio.csv'
+    example_frame.to_csv(full_csv, index=False)
+    load_example(str(full_csv)).save_state(state_path)
+
+    corrected = pd.read_csv(full_csv, parse_dates=['Date'])
+    in_last = corrected['Date'] == last
+    corrected.loc[in_last, 'FX_Gain_Loss'] += 1_000.0
+    moved = corrected.index[in_last][0]
+    corrected.loc[moved, 'Entity'] = 'Entity_Corrected'
+    new_quarter = tmp_path / 'corrected_quarter.csv'
+    corrected[in_last].to_csv(new_quarter, index=False)
+
+    processor = PortfolioDataProcessor(str(new_quarter), use_cache=False)
+    processor.metrics.echo = False
+    processor.load_data()
+    processor.refresh(state_path)
+    assert processor.metrics.get_stage('refresh')['changed_quarters'] == 1
+
+    full, _ = validate_nav(corrected, max_exceptions=len(corrected))
+    expected_counts = full[full['Date'] == last]['Check'].value_counts()
+    _, summary = processor.validate_nav()
+    for row in summary.itertuples():
+        assert row.Exceptions == expected_counts.get(row.Check, 0), row.Check
+
+    # The saved positions carry the corrected entity for the next refresh to continue from
+    positions = processor._load_state(state_path)[4]
+    assert 'Entity_Corrected' in set(positions.loc[positions['Date'] == last, 'Entity'])
@@ -0,0 +1,54 @@
+"""Tests for the vectorized rolling risk kernels against pandas rolling windows."""
+
+import numpy as np
+import pandas as pd
+
+from rolling_risk import rolling_risk
+
+
+def _reference(returns, window, risk_free_rate=0.0):
+    """The same statistics computed window by window with pandas."""
+    frame = pd.DataFrame(returns)
+    target = risk_free_rate / 4
+    rolling = frame.rolling(window)
+    volatility = rolling.std() * np.sqrt(4)
+    downside = frame.sub(target).clip(upper=0).pow(2).rolling(window).mean().pow(0.5) * np.sqrt(4)
+    excess = (rolling.mean() - target) * 4
+
+    def drawdown(values):
+        wealth = np.concatenate([[1.0], np.cumprod(1 + values)])
+        return (wealth / np.maximum.accumulate(wealth) - 1).min()
+
+    return {
+        'Return': (1 + frame).rolling(window).apply(np.prod, raw=True) - 1,
+        'Volatility': volatility,
+        'Downside_Deviation': downside,
+        'Max_Drawdown': rolling.apply(drawdown, raw=True),
+        # Ratios are undefined (NaN) for a window without volatility or downside
+        'Sharpe': (excess / volatility).where(volatility > 0),
+        'Sortino': (excess / downside).where(downside > 0)
+    }
+
+
+def test_statistics_match_pandas_rolling_windows():
+    rng = np.random.default_rng(3)
+    returns = rng.normal(0.02, 0.05, (40, 6))
+    # A missing quarter blanks every window that contains it
+    returns[17, 2] = np.nan
+    for window in (4, 8, 12):
+        statistics = rolling_risk(returns, window, risk_free_rate=0.01)
+        reference = _reference(returns, window, risk_free_rate=0.01)
+        for name, expected in reference.items():
+            np.testing.assert_allclose(statistics[name], expected.to_numpy(), rtol=1e-9, atol=1e-12,
+                                       equal_nan=True, err_msg=f"{name}, window {window}")
+
+
+def test_asset_class_risk_matches_pandas(baseline):
+    calendar, labels, returns = baseline._class_return_matrix()
+    risk = baseline.get_rolling_risk(windows=(4,))
+    for column, label in enumerate(labels):
+        series = pd.Series(returns[:, column], index=calendar.end_time.normalize())
+        expected = (series.rolling(4).std() * np.sqrt(4) * 100).dropna()
+        rows = risk[risk['Asset_Class'] == label].set_index('Date')['Volatility']
+        rows.index = pd.to_datetime(rows.index)
+        np.testing.assert_allclose(rows.loc[expected.index].to_numpy(), expected.to_numpy(), rtol=1e-9)
@@ -0,0 +1,93 @@
+"""Tests for the run report in Prometheus text format and for RunMetrics.reset()."""
+
+import re
+
+import pytest
+
+from run_metrics import RunMetrics
+
+from .conftest import load_example
+
+
+_SAMPLE = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$')
+_LABEL = re.compile(r'(?P<key>[a-zA-Z_][a-zA-Z0-9_]*)="(?P<value>(?:[^"\\]|\\.)*)"(?:,|$)')
+
+
+def _parse(text):
+    """
+    Parse Prometheus text exposition into {metric: {stage or None: value}}.
+
+    Every sample's family must have been declared by a HELP and a TYPE line.
+    """
+    declared, samples = set(), {}
+    for line in text.splitlines():
+        if line.startswith('# HELP ') or line.startswith('# TYPE '):
+            declared.add((line[2:6], line.split(' ')[2]))
+            continue
+        match = _SAMPLE.match(line)
+        assert match, f"not a sample line: {line!r}"
+        name = match['name']
+        assert ('HELP', name) in declared and ('TYPE', name) in declared, name
+        labels = {m['key']: re.sub(r'\\(.)', lambda e: {'n': '\n'}.get(e[1], e[1]), m['value'])
+                  for m in _LABEL.finditer(match['labels'] or '')}
+        series = samples.setdefault(name, {})
+        stage = labels.get('stage')
+        assert stage not in series, f"duplicate series {name} {stage}"
+        series[stage] = (float(match['value']), labels)
+    return samples
+
+
+def _run():
+    """A run with nested, repeated and failed stages."""
+    metrics = RunMetrics(name='nightly "batch"', echo=False)
+    with metrics.stage('load', rows=100):
+        for rows in (5, 7):
+            with metrics.stage('aggregate', rows=rows):
+                pass
+    with pytest.raises(ValueError):
+        with metrics.stage('export'):
+            raise ValueError('broken')
+    return metrics.finish(success=False)
+
+
+def test_prometheus_text_parses_with_stage_values():
+    metrics = _run()
+    samples = _parse(metrics.to_prometheus(labels={'portfolio': 'line\nbreak'}))
+
+    calls = {stage: value for stage, (value, _) in samples['dashboard_stage_calls'].items()}
+    assert calls == {'load': 1, 'aggregate': 2, 'export': 1}
+    assert samples['dashboard_stage_failures']['export'][0] == 1
+    assert samples['dashboard_stage_failures']['load'][0] == 0
+    # Repeated stages report their largest row count and their summed time
+    assert samples['dashboard_stage_rows']['aggregate'][0] == 7
+    assert samples['dashboard_stage_rows']['load'][0] == 100
+    assert 'export' not in samples['dashboard_stage_rows']
+    wall = sum(r['wall_seconds'] for r in metrics.stages if r['stage'] == 'aggregate')
+    assert samples['dashboard_stage_wall_seconds']['aggregate'][0] == pytest.approx(wall, abs=1e-6)
+    assert samples['dashboard_run_success'][None][0] == 0
+
+    # Label values survive escaping
+    _, labels = samples['dashboard_stage_calls']['load']
+    assert labels['run'] == 'nightly "batch"' and labels['portfolio'] == 'line\nbreak'
+
+
+def test_pipeline_stages_are_exported():
+    metrics = load_example().metrics.finish(success=True)
+    samples = _parse(metrics.to_prometheus())
+    assert set(samples['dashboard_stage_calls']) == {record['stage'] for record in metrics.stages}
+    assert {'load_data', 'classify_investments'} <= set(samples['dashboard_stage_wall_seconds'])
+    assert samples['dashboard_run_success'][None][0] == 1
+
+
+def test_reset_clears_stages():
+    metrics = _run()
+    metrics.log('before reset')
+    metrics.reset()
+    assert metrics.stages == [] and metrics.messages == []
+    samples = _parse(metrics.to_prometheus())
+    assert not any(name.startswith('dashboard_stage_') for name in samples)
+    assert metrics.success is None and samples['dashboard_run_success'][None][0] == 0
+
+    with metrics.stage('load', rows=3):
+        pass
+    assert set(_parse(metrics.to_prometheus())['dashboard_stage_calls']) == {'load'}
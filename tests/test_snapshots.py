@@ -0,0 +1,49 @@
+"""Tests that the precomputed quarterly snapshots match a direct groupby on that quarter."""
+
+import pandas as pd
+import pytest
+
+from payload_codec import table_records
+
+
+def _quarter(example_frame, baseline, date):
+    """Alternatives rows of example.xlsx for one quarter."""
+    alternatives = example_frame['Asset_Class'].isin(baseline.taxonomy.alternatives_classes)
+    return example_frame[alternatives & (example_frame['Date'] == date)]
+
+
+@pytest.mark.parametrize('position', [0, 13, -1])
+def test_snapshot_matches_groupby(example_frame, baseline, baseline_export, position):
+    date = sorted(example_frame['Date'].unique())[position]
+    rows = _quarter(example_frame, baseline, date)
+    label = pd.Timestamp(date).strftime('%Y-%m-%d')
+
+    grouped = rows.groupby('Asset_Class').agg(
+        End_NAV=('End_NAV', 'sum'), Beg_NAV=('Beg_NAV', 'sum'), Contributions=('Contributions', 'sum'),
+        Distributions=('Distributions', 'sum'), Net_Investment_Income=('Net_Investment_Income', 'sum'),
+        Num_Securities=('Security', 'nunique'))
+    grouped['Total_Return'] = (grouped['End_NAV'] - grouped['Beg_NAV']
+                               - grouped['Contributions'] + grouped['Distributions'])
+    grouped['Return_Pct'] = (grouped['Total_Return'] / grouped['Beg_NAV'] * 100).where(grouped['Beg_NAV'] > 0, 0)
+    grouped['Percentage'] = grouped['End_NAV'] / grouped['End_NAV'].sum() * 100
+
+    snapshot = {row['Asset_Class']: row for row in table_records(baseline_export['snapshots']) if row['Date'] == label}
+    assert set(snapshot) == set(grouped.index)
+    for asset_class, expected in grouped.iterrows():
+        for column, value in expected.items():
+            assert snapshot[asset_class][column] == pytest.approx(value, rel=1e-9, abs=1e-6), (asset_class, column)
+
+    metrics = [row for row in table_records(baseline_export['snapshot_metrics']) if row['Date'] == label]
+    assert len(metrics) == 1
+    total_return = grouped['Total_Return'].sum()
+    expected = {
+        'total_nav': rows['End_NAV'].sum(),
+        'total_income': rows['Net_Investment_Income'].sum(),
+        'total_contributions': rows['Contributions'].sum(),
+        'total_distributions': rows['Distributions'].sum(),
+        'weighted_return_pct': total_return / rows['Beg_NAV'].sum() * 100,
+        'num_securities': rows[['Asset_Class', 'Security']].drop_duplicates().shape[0],
+        'num_asset_classes': rows['Asset_Class'].nunique()
+    }
+    for name, value in expected.items():
+        assert metrics[0][name] == pytest.approx(value, rel=1e-9, abs=1e-6), name
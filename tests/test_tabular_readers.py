@@ -0,0 +1,35 @@
+"""Tests that the CSV reader matches the streaming Excel reader and the baseline export."""
+
+import pandas as pd
+
+from data_processor import PortfolioDataProcessor
+from tabular_readers import CSV, EXCEL, CsvReader, detect_format
+from xlsx_reader import StreamingXlsxReader
+
+from .conftest import EXAMPLE_PATH, assert_close, export, load_example
+
+
+COLUMNS = {
+    'date_columns': PortfolioDataProcessor.DATE_COLUMNS,
+    'text_columns': PortfolioDataProcessor.TEXT_COLUMNS + PortfolioDataProcessor.OPTIONAL_TEXT_COLUMNS,
+    'numeric_columns': PortfolioDataProcessor.NUMERIC_COLUMNS + PortfolioDataProcessor.OPTIONAL_NUMERIC_COLUMNS,
+    'optional_columns': PortfolioDataProcessor.OPTIONAL_TEXT_COLUMNS + PortfolioDataProcessor.OPTIONAL_NUMERIC_COLUMNS
+}
+
+
+def test_csv_reader_matches_streaming_reader(example_frame, tmp_path):
+    path = tmp_path / 'portfolio.csv'
+    example_frame.to_csv(path, index=False)
+    assert detect_format(str(path)) == CSV and detect_format(EXAMPLE_PATH) == EXCEL
+
+    streamed = StreamingXlsxReader(EXAMPLE_PATH, PortfolioDataProcessor.SHEET_NAME, **COLUMNS).read()
+    parsed = CsvReader(str(path), **COLUMNS).read()
+    assert list(parsed.columns) == list(streamed.columns)
+    pd.testing.assert_frame_equal(parsed.astype({'Date': 'datetime64[ns]'}),
+                                  streamed.astype({'Date': 'datetime64[ns]'}), check_dtype=False)
+
+
+def test_csv_input_exports_like_baseline(example_frame, baseline_export, tmp_path):
+    path = tmp_path / 'portfolio.csv'
+    example_frame.to_csv(path, index=False)
+    assert_close(export(load_example(str(path))), baseline_export)
@@ -0,0 +1,86 @@
+"""Tests for the asset taxonomy: unclassified reporting, rollup totals and mapping file errors."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_generator import DEFERRED_SECTIONS, DashboardGenerator
+from payload_codec import decode_payload, encode_payload
+from taxonomy import DEFAULT_TAXONOMY_PATH, LEAF_LEVEL, UNCLASSIFIED, AssetTaxonomy
+
+from .conftest import load_example
+
+
+def _write(tmp_path, spec, name='taxonomy.json'):
+    """Write a mapping file (a dict as JSON, a string as is) and return its path."""
+    path = tmp_path / name
+    path.write_text(spec if isinstance(spec, str) else json.dumps(spec), encoding='utf-8')
+    return str(path)
+
+
+def _default_spec():
+    """The shipped taxonomy.json as a dict."""
+    with open(DEFAULT_TAXONOMY_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_missing_asset_class_is_reported(example_frame, tmp_path):
+    spec = _default_spec()
+    spec['tree']['Alternatives']['Hedge Funds'] = []
+    processor = load_example(taxonomy=_write(tmp_path, spec))
+
+    expected = int((example_frame['Asset_Class'] == 'Hedge Funds').sum())
+    assert processor.unclassified == {'Hedge Funds': expected}
+    data = processor.export_to_json()
+    assert data['metadata']['unclassified_asset_classes'] == {'Hedge Funds': expected}
+    assert 'Hedge Funds' not in processor.get_composition_by_asset_class()['Asset_Class'].astype(str).tolist()
+    assert 'Hedge Funds' in DashboardGenerator(data)._generate_unclassified_notice()
+
+    rollups = processor.get_taxonomy_rollups()
+    segments = set(rollups.loc[rollups['Level'] == processor.taxonomy.levels[0], 'Node'])
+    assert UNCLASSIFIED in segments
+
+
+def test_every_level_adds_up_to_the_cube(baseline):
+    rollups = baseline.get_taxonomy_rollups()
+    measures = baseline.CUBE_MEASURES
+    totals = baseline.cube.groupby('Date')[measures].sum()
+    for level in baseline.taxonomy.all_levels:
+        by_date = rollups[rollups['Level'] == level].groupby('Date')[measures].sum()
+        np.testing.assert_allclose(by_date.to_numpy(), totals.loc[by_date.index].to_numpy(), rtol=1e-12,
+                                   err_msg=level)
+
+    # The leaf level is the cube itself, and every other node is the sum of its children
+    leaves = rollups[rollups['Level'] == LEAF_LEVEL].set_index(['Date', 'Node'])['End_NAV']
+    cube = baseline.cube.groupby(['Date', 'Asset_Class'], observed=True)['End_NAV'].sum()
+    cube.index = cube.index.set_levels(cube.index.levels[1].astype(str), level=1)
+    pd.testing.assert_series_equal(leaves.sort_index(), cube.sort_index(), check_names=False, rtol=1e-12)
+    children = rollups[rollups['Parent'].notna()].groupby(['Date', 'Parent'])['End_NAV'].sum()
+    parents = rollups[rollups['Level'] != LEAF_LEVEL].set_index(['Date', 'Node'])['End_NAV']
+    np.testing.assert_allclose(children.loc[parents.index].to_numpy(), parents.to_numpy(), rtol=1e-12)
+
+
+def test_rollups_ship_outside_the_main_payload(baseline_export):
+    generator = DashboardGenerator(baseline_export)
+    page = decode_payload(encode_payload(generator.page_data()))
+    assert 'taxonomy_rollups' not in page
+    key = DEFERRED_SECTIONS['taxonomy_rollups']
+    assert generator._shards()[key] == {'taxonomy_rollups': baseline_export['taxonomy_rollups']}
+    assert key in generator.drilldown_scripts()
+
+
+@pytest.mark.parametrize('content, message', [
+    ('{"levels": ["Segment"], "tree": {', 'not valid JSON'),
+    ({'levels': ['Segment']}, 'needs a "levels" list and a "tree" object'),
+    ({'levels': ['Segment'], 'tree': {'Alternatives': 'Private Equity'}}, "'Alternatives' must be"),
+    ({'levels': ['Segment'], 'tree': {'Alternatives': ['Private Equity']}, 'alternatives': ['Alts']},
+     'missing from its tree'),
+    ({'levels': ['Segment', 'Category'], 'tree': {'Alternatives': ['Private Equity']}}, 'has 1 levels'),
+    ({'levels': ['Segment'], 'tree': {'Alternatives': ['Hedge Funds'], 'Other': ['Hedge Funds']}},
+     'appears twice')
+])
+def test_malformed_file_raises_a_clear_error(tmp_path, content, message):
+    with pytest.raises(ValueError, match=message):
+        AssetTaxonomy.load(_write(tmp_path, content))
@@ -0,0 +1,71 @@
+"""Tests for the chain-linked time-weighted returns on a small hand-built portfolio."""
+
+import pandas as pd
+import pytest
+
+from data_processor import PortfolioDataProcessor
+
+from .conftest import load_example
+
+
+QUARTERS = pd.date_range('2023-03-31', periods=6, freq='QE')
+
+# Private Equity: one fund with a large contribution and then a large distribution.
+# Hedge Funds: fully distributed, then re-funded from zero Beg_NAV.
+# (Beg_NAV, Contributions, Distributions, quarterly return); End_NAV follows from them.
+PRIVATE_EQUITY = [(100.0, 0, 0, 0.05), (None, 0, 0, 0.05), (None, 0, 0, -0.02),
+                  (None, 1_000.0, 0, 0.01), (None, 0, 1_000.0, 0.03), (None, 0, 0, 0.04)]
+HEDGE_FUNDS = [(200.0, 0, 0, 0.05), (None, 0, 210.0, 0.0), (0.0, 100.0, 0, 0.04),
+               (None, 0, 0, 0.02), (None, 0, 0, 0.01), (None, 0, 0, -0.01)]
+
+
+def _rows(asset_class, security, quarters):
+    """Portfolio rows for one security; Beg_NAV None continues from the prior End_NAV."""
+    rows, end = [], None
+    for date, (beg, contributions, distributions, rate) in zip(QUARTERS, quarters):
+        beg = end if beg is None else beg
+        end = beg + contributions - distributions + rate * (beg if beg > 0 else contributions)
+        rows.append({'Date': date, 'Entity': 'Entity_01', 'Security': security, 'Asset_Class': asset_class,
+                     'Beg_NAV': beg, 'Contributions': contributions, 'Distributions': distributions,
+                     'Net_Investment_Income': end - beg - contributions + distributions, 'End_NAV': end})
+    return rows
+
+
+@pytest.fixture(scope='module')
+def twr(tmp_path_factory):
+    """get_time_weighted_returns() of the hand-built portfolio, indexed by asset class."""
+    frame = pd.DataFrame(_rows('Private Equity', 'PE_Fund', PRIVATE_EQUITY)
+                         + _rows('Hedge Funds', 'HF_Fund', HEDGE_FUNDS)
+                         + _rows('Equities', 'Stock', [(50.0, 0, 0, 0.1)] + [(None, 0, 0, 0.1)] * 5))
+    path = tmp_path_factory.mktemp('twr') / 'portfolio.csv'
+    frame.to_csv(path, index=False)
+    processor = load_example(str(path))
+    return processor.get_time_weighted_returns().set_index('Asset_Class'), frame
+
+
+def test_chained_returns_match_hand_computed_values(twr):
+    returns, _ = twr
+    assert set(returns.index) == {'Private Equity', 'Hedge Funds', PortfolioDataProcessor.TOTAL_LABEL}
+    pe = returns.loc['Private Equity']
+    assert pe['Return_ITD'] == pytest.approx((1.05 * 1.05 * 0.98 * 1.01 * 1.03 * 1.04 - 1) * 100)
+    assert pe['Return_1Y'] == pytest.approx((0.98 * 1.01 * 1.03 * 1.04 - 1) * 100)
+    assert pe['Return_YTD'] == pytest.approx((1.03 * 1.04 - 1) * 100)
+    assert pe['Annualized_ITD'] == pytest.approx(((1.05 * 1.05 * 0.98 * 1.01 * 1.03 * 1.04) ** (4 / 6) - 1) * 100)
+    assert pe['Quarters'] == 6
+    assert pd.isna(pe['Return_3Y']) and pd.isna(pe['Annualized_3Y'])
+
+    # The quarter that starts from zero Beg_NAV counts as a 0% return
+    hf = returns.loc['Hedge Funds']
+    assert hf['Return_ITD'] == pytest.approx((1.05 * 1.0 * 1.0 * 1.02 * 1.01 * 0.99 - 1) * 100)
+    assert hf['Return_1Y'] == pytest.approx((1.0 * 1.02 * 1.01 * 0.99 - 1) * 100)
+
+
+def test_total_chains_pooled_quarterly_returns(twr):
+    returns, frame = twr
+    alternatives = frame[frame['Asset_Class'] != 'Equities']
+    gain = (alternatives['End_NAV'] - alternatives['Beg_NAV']
+            - alternatives['Contributions'] + alternatives['Distributions'])
+    pooled = gain.groupby(alternatives['Date']).sum() / alternatives.groupby('Date')['Beg_NAV'].sum()
+    total = returns.loc[PortfolioDataProcessor.TOTAL_LABEL]
+    assert total['Return_ITD'] == pytest.approx(((1 + pooled).prod() - 1) * 100)
+    assert total['Return_1Y'] == pytest.approx(((1 + pooled.iloc[-4:]).prod() - 1) * 100)
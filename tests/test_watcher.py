@@ -0,0 +1,53 @@
+"""Tests that watch-mode rebuilds merge changed quarters into the previous build exactly."""
+
+from dashboard_watcher import DashboardWatcher
+from data_processor import PortfolioDataProcessor
+from nav_validation import ROLL_FORWARD
+
+from .conftest import assert_close, export, load_example
+
+
+def test_update_quarters_matches_full_load(example_frame, tmp_path):
+    path = tmp_path / 'portfolio.csv'
+    example_frame.to_csv(path, index=False)
+    previous = load_example(str(path))
+    previous_drilldown = previous.export_security_drilldown()
+
+    edited = example_frame.copy()
+    row = edited.index[edited['Date'] == edited['Date'].max()][0]
+    edited.loc[row, 'End_NAV'] += 12_345.0
+    edited[edited['Date'] != edited['Date'].min()].to_csv(path, index=False)
+
+    processor = PortfolioDataProcessor(str(path), use_cache=False)
+    processor.metrics.echo = False
+    processor.load_data()
+    _, changed, removed = processor.update_quarters(previous.cube, previous.security_counts,
+                                                    previous.quarter_fingerprints(), previous.get_security_history())
+    assert len(changed) == 1 and len(removed) == 1
+
+    full = load_example(str(path))
+    assert_close(export(processor), export(full))
+    assert_close(processor.export_security_drilldown(previous_drilldown), full.export_security_drilldown())
+
+
+def test_fx_only_edit_rebuilds_the_page(example_frame, tmp_path):
+    path = tmp_path / 'portfolio.csv'
+    output = tmp_path / 'dashboard.html'
+    example_frame.to_csv(path, index=False)
+    watcher = DashboardWatcher(str(path), str(output), processor_options={'use_cache': False})
+    assert watcher.rebuild(str(path)) == 'built'
+    before = output.read_bytes()
+
+    # FX_Gain_Loss feeds only the NAV roll-forward, not the cube
+    edited = example_frame.copy()
+    last = edited['Date'] == edited['Date'].max()
+    edited.loc[last, 'FX_Gain_Loss'] += 1_000.0
+    edited.to_csv(path, index=False)
+    assert watcher.rebuild(str(path)) == 'updated'
+    assert output.read_bytes() != before
+
+    # The page now carries the edited quarter's roll-forward breaks
+    fresh = load_example(str(path))
+    _, summary = fresh.validate_nav()
+    assert summary.set_index('Check').loc[ROLL_FORWARD, 'Exceptions'] > 5_344
+    assert watcher.workbooks[str(path)].fingerprints.equals(fresh.quarter_fingerprints())
@@ -0,0 +1,57 @@
+"""Tests that the streaming Excel reader matches the openpyxl baseline."""
+
+import re
+import zipfile
+from xml.sax.saxutils import escape as xml_escape
+
+import pandas as pd
+
+from data_processor import PortfolioDataProcessor
+from xlsx_reader import StreamingXlsxReader, cross_check_engines
+
+from .conftest import EXAMPLE_PATH, assert_close, export, load_example
+from .test_tabular_readers import COLUMNS
+
+
+def test_streaming_reader_matches_openpyxl():
+    columns = PortfolioDataProcessor.REQUIRED_COLUMNS + ['Entity']
+    assert cross_check_engines(EXAMPLE_PATH, PortfolioDataProcessor.SHEET_NAME, columns) == []
+
+
+def test_stream_engine_exports_like_baseline(baseline_export):
+    assert_close(export(load_example(engine='stream')), baseline_export)
+
+
+def _rewrite_sheet(source, target, rewrite):
+    """Copy a workbook, passing its worksheet XML through rewrite()."""
+    with zipfile.ZipFile(source) as src, zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == 'xl/worksheets/sheet1.xml':
+                data = rewrite(data.decode('utf-8')).encode('utf-8')
+            dst.writestr(item, data)
+
+
+def test_blocks_outside_excel_markup_read_the_same(tmp_path):
+    with zipfile.ZipFile(EXAMPLE_PATH) as archive:
+        shared = StreamingXlsxReader(EXAMPLE_PATH, PortfolioDataProcessor.SHEET_NAME)._read_shared_strings(archive)
+
+    def inline(match):
+        # Shared strings become inline strings whose first character is a character reference
+        text = shared[int(match['index'])]
+        return (f'<c r="{match["ref"]}" t="inlineStr"><is><t>&#{ord(text[0])};'
+                f'{xml_escape(text[1:])}</t></is></c>')
+
+    def rewrite(xml):
+        start, middle, end = xml.index('<row r="5000"'), xml.index('<row r="5200"'), xml.index('<row r="5400"')
+        styled = re.sub(r'<c r="(?P<ref>[A-Z]+\d+)" t="s"><v>(?P<index>\d+)</v></c>', inline, xml[start:middle])
+        positional = re.sub(r'<c r="[A-Z]+\d+"', '<c', xml[middle:end])
+        return xml[:start] + styled + positional + xml[end:]
+
+    path = tmp_path / 'mixed.xlsx'
+    _rewrite_sheet(EXAMPLE_PATH, path, rewrite)
+    expected = StreamingXlsxReader(EXAMPLE_PATH, PortfolioDataProcessor.SHEET_NAME, **COLUMNS).read()
+    reader = StreamingXlsxReader(str(path), PortfolioDataProcessor.SHEET_NAME, **COLUMNS)
+    reader.BLOCK_BYTES = 1 << 14
+    pd.testing.assert_frame_equal(reader.read(), expected)
+    pd.testing.assert_frame_equal(pd.concat(reader.iter_chunks(3000), ignore_index=True), expected)
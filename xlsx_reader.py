@@ -0,0 +1,460 @@
+"""
+Streaming XLSX Reader
+
+This module reads a single worksheet straight from the .xlsx zip archive.
+
+Instead of building openpyxl's full workbook object model, the worksheet XML and the
+shared-strings table are parsed as a stream. Only the projected columns are decoded
+and their values are written directly into typed NumPy arrays, so parse time and peak
+memory scale with the columns the pipeline actually uses.
+"""
+
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+_CELL = f'{{{_MAIN_NS}}}c'
+_ROW = f'{{{_MAIN_NS}}}row'
+_VALUE = f'{{{_MAIN_NS}}}v'
+_INLINE = f'{{{_MAIN_NS}}}is'
+_TEXT = f'{{{_MAIN_NS}}}t'
+_SHARED_ITEM = f'{{{_MAIN_NS}}}si'
+_DIMENSION = f'{{{_MAIN_NS}}}dimension'
+_SHEET_DATA = f'{{{_MAIN_NS}}}sheetData'
+
+_CELL_REF = re.compile(r'([A-Z]+)(\d*)')
+_DIMENSION_REF = re.compile(r'[A-Z]+\d+:[A-Z]+(\d+)')
+
+# The sheetData start tag (with its namespace prefix, if any), the document's root
+# tag and a declared encoding other than UTF-8, located in the raw worksheet bytes
+_SHEET_DATA_START = re.compile(rb'<((?:[A-Za-z_][\w.-]*:)?)sheetData\b[^>]*?(/?)>')
+_ROOT_TAG = re.compile(rb'<([A-Za-z_][\w.:-]*)')
+_OTHER_ENCODING = re.compile(rb'^<\?xml[^>]*encoding=["\'](?!utf-?8["\'])', re.IGNORECASE)
+
+# Serial-date epochs for the 1900 and 1904 workbook date systems
+_EPOCH_1900 = np.datetime64('1899-12-30', 'us')
+_EPOCH_1904 = np.datetime64('1904-01-01', 'us')
+
+
+def _cell_pattern(prefix):
+    """
+    Match one cell in the markup Excel writes, capturing (letters, row, type, value).
+
+    Attributes must come in Excel's order (r first, then s and t before any others),
+    an optional formula may precede the value and the value may not contain markup or
+    entity references. Cells written any other way (inline strings, escaped text, no
+    r attribute, t after other attributes) do not match at all.
+    """
+    p = re.escape(prefix)
+    return re.compile(
+        rf'<{p}c r="([A-Z]+)(\d+)"(?:\s+s="\d+")?(?:\s+t="(\w*)")?(?:\s+(?!t=)[\w:.-]+="[^"]*")*\s*'
+        rf'(?:/>|>(?:<{p}f\b[^>]*?(?:/>|>[^<]*</{p}f>))?(?:<{p}v>([^<&]*)</{p}v>)?</{p}c>)')
+
+
+def _scanned_rows(cells):
+    """Group scanned cells into rows of (letters, type, text), leaving out empty cells and rows."""
+    row, current = [], None
+    for letters, number, cell_type, text in cells:
+        if number != current:
+            if row:
+                yield row
+            row, current = [], number
+        if text:
+            row.append((letters, cell_type or None, text))
+    if row:
+        yield row
+
+
+def _element_rows(sheet_data):
+    """Yield every <row> of a parsed block as a list of (letters, type, text) cells."""
+    for elem in sheet_data:
+        if elem.tag != _ROW:
+            continue
+        row = []
+        for i, cell in enumerate(elem.iter(_CELL)):
+            # The r attribute is optional; without it cells are positional
+            ref = cell.get('r')
+            letters = _CELL_REF.match(ref).group(1) if ref else _column_letters(i)
+            cell_type = cell.get('t')
+            if cell_type == 'inlineStr':
+                node = cell.find(_INLINE)
+                text = ''.join(t.text or '' for t in node.iter(_TEXT)) if node is not None else None
+            else:
+                v = cell.find(_VALUE)
+                text = v.text if v is not None else None
+            row.append((letters, cell_type, text))
+        yield row
+
+
+class _RowBlocks:
+    """
+    Split a worksheet part into blocks of whole <row> elements.
+
+    head is the document up to and including the sheetData start tag; wrapped in it
+    and the matching end tags every block parses on its own, so only one block of
+    the decompressed XML is held at a time. Iterating yields the raw blocks.
+    """
+
+    def __init__(self, stream, block_bytes):
+        """Read up to the sheetData start tag; head stays None when there is none."""
+        self.stream = stream
+        self.block_bytes = block_bytes
+        self.head = None
+        self.rest = b''
+        match = None
+        while match is None:
+            chunk = stream.read(block_bytes)
+            self.rest += chunk
+            match = _SHEET_DATA_START.search(self.rest)
+            if not chunk:
+                break
+        if match is None:
+            return
+
+        prefix, self.empty = match.group(1), bool(match.group(2))
+        root = _ROOT_TAG.search(self.rest).group(1)
+        self.head = self.rest[:match.start()] + b'<' + prefix + b'sheetData>'
+        self.tail = b'</' + prefix + b'sheetData></' + root + b'>'
+        self.row_end = b'</' + prefix + b'row>'
+        self.rest = self.rest[match.end():]
+        self.cell_start = '<' + prefix.decode() + 'c'
+        self.cells = None if _OTHER_ENCODING.match(self.head) else _cell_pattern(prefix.decode())
+
+    def __iter__(self):
+        """Yield blocks of roughly block_bytes that end on a row boundary."""
+        if self.empty:
+            return
+        buffer, self.rest = self.rest, b''
+        while True:
+            chunk = self.stream.read(self.block_bytes)
+            buffer += chunk
+            cut = buffer.rfind(self.row_end)
+            if cut >= 0:
+                cut += len(self.row_end)
+                yield buffer[:cut]
+                buffer = buffer[cut:]
+            if not chunk:
+                return
+
+    def parse(self, block):
+        """Parse a block into the worksheet root element."""
+        return ET.fromstring(self.head + block + self.tail)
+
+    def scan(self, block):
+        """Match every cell of a block with the cell pattern, or return None if any cell does not match."""
+        if self.cells is None:
+            return None
+        text = block.decode('utf-8')
+        cells = self.cells.findall(text)
+        return cells if len(cells) == text.count(self.cell_start) else None
+
+
+def _column_letters(index):
+    """Convert a zero-based column index into a reference like 'AB'."""
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+class StreamingXlsxReader:
+    """Read selected columns of one worksheet into typed NumPy arrays."""
+
+    # Decompressed worksheet XML parsed at a time
+    BLOCK_BYTES = 1 << 18
+
+    def __init__(self, file_path, sheet_name, date_columns=(), text_columns=(), numeric_columns=(),
+                 optional_columns=()):
+        """
+        Initialize the reader.
+
+        Only the listed columns are materialised: dates become datetime64,
+        text columns become object arrays of str and numeric columns float64.
+        Columns named in optional_columns are left out when the sheet lacks
+        them instead of raising.
+        """
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.date_columns = list(date_columns)
+        self.text_columns = list(text_columns)
+        self.numeric_columns = list(numeric_columns)
+        self.optional_columns = set(optional_columns)
+
+    @property
+    def columns(self):
+        """Projected column names, in the order they were requested."""
+        return self.date_columns + self.text_columns + self.numeric_columns
+
+    def read(self):
+        """Stream the worksheet and return a DataFrame of the projected columns."""
+        with zipfile.ZipFile(self.file_path) as archive:
+            sheet_path, date1904 = self._locate_sheet(archive)
+            shared_strings = self._read_shared_strings(archive)
+            with archive.open(sheet_path) as sheet:
+                return self._read_sheet(sheet, shared_strings, date1904)
+
+    def iter_chunks(self, chunk_rows):
+        """Stream the worksheet as DataFrames of at most chunk_rows rows each."""
+        with zipfile.ZipFile(self.file_path) as archive:
+            sheet_path, date1904 = self._locate_sheet(archive)
+            shared_strings = self._read_shared_strings(archive)
+            with archive.open(sheet_path) as sheet:
+                yield from self._iter_sheet(sheet, shared_strings, date1904, chunk_rows)
+
+    def _locate_sheet(self, archive):
+        """Resolve the worksheet part for self.sheet_name and the workbook date system."""
+        workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+        pr = workbook.find(f'{{{_MAIN_NS}}}workbookPr')
+        date1904 = pr is not None and pr.get('date1904') in ('1', 'true')
+
+        rel_id = None
+        for sheet in workbook.iter(f'{{{_MAIN_NS}}}sheet'):
+            if sheet.get('name') == self.sheet_name:
+                rel_id = sheet.get(f'{{{_REL_NS}}}id')
+                break
+        if rel_id is None:
+            raise ValueError(f"Worksheet named '{self.sheet_name}' not found in {self.file_path}")
+
+        rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+        for rel in rels.iter(f'{{{_PKG_REL_NS}}}Relationship'):
+            if rel.get('Id') == rel_id:
+                target = rel.get('Target')
+                if target.startswith('/'):
+                    return target.lstrip('/'), date1904
+                return posixpath.normpath(posixpath.join('xl', target)), date1904
+        raise ValueError(f"Worksheet part for '{self.sheet_name}' is missing from {self.file_path}")
+
+    def _read_shared_strings(self, archive):
+        """Stream the shared-strings table into a list (rich-text runs are concatenated)."""
+        try:
+            part = archive.open('xl/sharedStrings.xml')
+        except KeyError:
+            return []
+
+        strings = []
+        root = None
+        with part:
+            for event, elem in ET.iterparse(part, events=('start', 'end')):
+                if root is None:
+                    root = elem
+                elif event == 'end' and elem.tag == _SHARED_ITEM:
+                    strings.append(''.join(t.text or '' for t in elem.iter(_TEXT)))
+                    # Detach the item so the tree does not grow with the table
+                    root.clear()
+        return strings
+
+    def _read_sheet(self, sheet, shared_strings, date1904):
+        """Stream worksheet rows, decoding only the projected cells."""
+        return next(self._iter_sheet(sheet, shared_strings, date1904))
+
+    def _iter_sheet(self, sheet, shared_strings, date1904, chunk_rows=None):
+        """
+        Stream worksheet rows into DataFrames of at most chunk_rows rows.
+
+        With chunk_rows=None the whole sheet is one frame. Otherwise the typed
+        arrays are reused for every chunk, so memory stays bounded by the
+        chunk size (plus the shared-strings table) however long the sheet is.
+        Either way the XML is parsed one block of rows at a time and nothing
+        of a block outlives it.
+        """
+        wanted = set(self.columns)
+        kinds = {}
+        for col in self.date_columns:
+            kinds[col] = 'date'
+        for col in self.text_columns:
+            kinds[col] = 'text'
+        for col in self.numeric_columns:
+            kinds[col] = 'numeric'
+
+        blocks = _RowBlocks(sheet, self.BLOCK_BYTES)
+        if blocks.head is None:
+            raise ValueError(f"Worksheet '{self.sheet_name}' is empty")
+
+        # Text cells are stored as indices into a string table (shared strings
+        # first, inline strings appended) and resolved in one vectorized take
+        strings = list(shared_strings)
+
+        capacity = chunk_rows or 1024
+        dimension = blocks.parse(b'').find(_DIMENSION)
+        if dimension is not None:
+            # The declared used range lets the arrays be sized once up front
+            match = _DIMENSION_REF.fullmatch(dimension.get('ref', ''))
+            if match:
+                capacity = max(min(int(match.group(1)), chunk_rows or np.inf), 1)
+
+        arrays = {}
+        date_text = {}
+        positions = None
+        n_rows = 0
+
+        for block in blocks:
+            cells = blocks.scan(block) if positions is not None else None
+            if cells is not None:
+                rows = _scanned_rows(cells)
+            else:
+                rows = _element_rows(blocks.parse(block).find(_SHEET_DATA))
+
+            for row in rows:
+                if positions is None:
+                    # Header row: map projected column names to cell positions
+                    header = {}
+                    for letters, cell_type, text in row:
+                        name = shared_strings[int(text)] if cell_type == 's' and text is not None else text
+                        if name in wanted:
+                            header[name] = letters
+                    missing = [c for c in self.columns if c not in header and c not in self.optional_columns]
+                    if missing:
+                        raise ValueError(f"Worksheet '{self.sheet_name}' is missing required columns: {missing}")
+                    kinds = {name: kind for name, kind in kinds.items() if name in header}
+                    positions = {letters: name for name, letters in header.items()}
+                    arrays = self._allocate(kinds, capacity)
+                    continue
+
+                if n_rows >= len(next(iter(arrays.values()))):
+                    arrays = {name: self._grow(values) for name, values in arrays.items()}
+
+                has_value = False
+                for letters, cell_type, text in row:
+                    name = positions.get(letters)
+                    if name is None or text is None:
+                        continue
+                    has_value = True
+                    kind = kinds[name]
+
+                    if kind == 'text':
+                        if cell_type == 's':
+                            arrays[name][n_rows] = int(text)
+                        else:
+                            strings.append(text)
+                            arrays[name][n_rows] = len(strings) - 1
+                    elif cell_type is None or cell_type == 'n':
+                        arrays[name][n_rows] = float(text)
+                    elif cell_type == 's':
+                        self._store_text_value(arrays, date_text, name, kind, n_rows, shared_strings[int(text)])
+                    elif cell_type in ('str', 'inlineStr', 'd'):
+                        self._store_text_value(arrays, date_text, name, kind, n_rows, text)
+                    elif cell_type == 'b' and kind == 'numeric':
+                        arrays[name][n_rows] = float(text)
+
+                if has_value:
+                    n_rows += 1
+                    if chunk_rows and n_rows == chunk_rows:
+                        yield self._build_frame(arrays, kinds, n_rows, strings, date_text, date1904)
+                        # Reset the arrays in place and drop this chunk's inline strings
+                        for values in arrays.values():
+                            values.fill(-1 if values.dtype.kind == 'i' else np.nan)
+                        del strings[len(shared_strings):]
+                        date_text = {}
+                        n_rows = 0
+
+        if positions is None:
+            raise ValueError(f"Worksheet '{self.sheet_name}' is empty")
+        if n_rows or not chunk_rows:
+            yield self._build_frame(arrays, kinds, n_rows, strings, date_text, date1904)
+
+    def _build_frame(self, arrays, kinds, n_rows, strings, date_text, date1904):
+        """Resolve the first n_rows of the typed arrays into a DataFrame (which copies them)."""
+        lookup = np.array(strings, dtype=object) if strings else np.array([], dtype=object)
+        data = {}
+        columns = [name for name in self.columns if name in kinds]
+        for name in columns:
+            values = arrays[name][:n_rows]
+            kind = kinds[name]
+            if kind == 'text':
+                resolved = np.full(n_rows, None, dtype=object)
+                present = values >= 0
+                resolved[present] = lookup[values[present]]
+                data[name] = resolved
+            elif kind == 'date':
+                data[name] = self._serial_to_datetime(values, date1904, date_text.get(name))
+            else:
+                data[name] = values
+        return pd.DataFrame(data, columns=columns)
+
+    @staticmethod
+    def _allocate(kinds, capacity):
+        """Preallocate one typed array per projected column."""
+        arrays = {}
+        for name, kind in kinds.items():
+            if kind == 'text':
+                arrays[name] = np.full(capacity, -1, dtype=np.int64)
+            else:
+                arrays[name] = np.full(capacity, np.nan, dtype=np.float64)
+        return arrays
+
+    @staticmethod
+    def _grow(values):
+        """Double an array's capacity, padding with its missing-value marker."""
+        fill = -1 if values.dtype.kind == 'i' else np.nan
+        grown = np.full(len(values) * 2, fill, dtype=values.dtype)
+        grown[:len(values)] = values
+        return grown
+
+    @staticmethod
+    def _store_text_value(arrays, date_text, name, kind, row, text):
+        """Store a text cell found in a date or numeric column."""
+        if kind == 'date':
+            date_text.setdefault(name, {})[row] = text
+            return
+        try:
+            arrays[name][row] = float(text)
+        except ValueError:
+            pass
+
+    @staticmethod
+    def _serial_to_datetime(serials, date1904, text_values=None):
+        """Convert Excel serial dates (plus any text dates) to datetime64 values."""
+        epoch = _EPOCH_1904 if date1904 else _EPOCH_1900
+        missing = np.isnan(serials)
+        micros = np.round(np.where(missing, 0, serials) * 86_400_000_000).astype(np.int64)
+        dates = epoch + micros.astype('timedelta64[us]')
+        dates[missing] = np.datetime64('NaT')
+        if text_values:
+            rows = np.fromiter(text_values.keys(), dtype=np.int64, count=len(text_values))
+            parsed = pd.to_datetime(pd.Series(list(text_values.values())), errors='coerce')
+            dates[rows] = parsed.to_numpy(dtype='datetime64[us]')
+        return dates
+
+
+def cross_check_engines(file_path, sheet_name, columns, rtol=1e-12):
+    """
+    Compare the streaming reader against pandas/openpyxl for the given columns.
+
+    Returns a list of human-readable mismatch descriptions (empty when they agree).
+    """
+    reference = pd.read_excel(file_path, sheet_name=sheet_name, engine='openpyxl', usecols=list(columns))
+    reference['Date'] = pd.to_datetime(reference['Date'])
+    reader = StreamingXlsxReader(
+        file_path, sheet_name,
+        date_columns=[c for c in columns if c == 'Date'],
+        text_columns=[c for c in columns if reference[c].dtype.kind not in 'biufcmM'],
+        numeric_columns=[c for c in columns if c != 'Date' and reference[c].dtype.kind in 'biufc'],
+    )
+    streamed = reader.read()
+
+    problems = []
+    if len(reference) != len(streamed):
+        problems.append(f"row count differs: openpyxl={len(reference)} stream={len(streamed)}")
+        return problems
+    for col in columns:
+        expected, actual = reference[col], streamed[col]
+        if expected.dtype.kind in 'fc':
+            same = np.isclose(expected.to_numpy(), actual.to_numpy(dtype=float), rtol=rtol, equal_nan=True)
+        elif expected.dtype.kind == 'M':
+            same = (pd.to_datetime(expected).to_numpy() == pd.to_datetime(actual).to_numpy())
+        else:
+            same = (expected.astype(object).to_numpy() == actual.astype(object).to_numpy())
+        if not same.all():
+            problems.append(f"{col}: {int((~same).sum())} values differ")
+    return problems